@@ -0,0 +1,228 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Asyncio interface to the OpenStack Compute API.
+
+The managers exposed here mirror the ones of ``novaclient.client.Client``.
+Every public manager method becomes a coroutine function, except the
+``iter_*`` methods, like ``iter_pages``, which become asynchronous
+iterators, and listings can be consumed with ``async for``. The calls
+themselves go through the regular synchronous managers, so microversion
+dispatch (``api_versions.wraps``) and error mapping
+(``exceptions.from_response``) behave exactly as they do for the
+synchronous client.
+
+The blocking calls are not removed, they are moved off the event loop: each
+pending call holds a thread of the executor of the client, a thread pool of
+``max_workers`` threads by default, so the number of concurrent calls is
+bounded by the size of that pool, or of the executor given by the caller.
+
+The resources returned are the ones of the synchronous managers: loading
+their missing attributes, or calling their methods like
+``server.reboot()``, does blocking requests. Run those calls with
+:meth:`AsyncClient.run`, e.g. ``await nova.run(server.reboot)``. The clients
+created by :func:`Client` forbid lazy loading by default, so that a missing
+attribute raises :class:`novaclient.exceptions.LazyLoadForbidden` rather
+than blocking the event loop.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+
+from novaclient import base
+from novaclient import client as nova_client
+
+# NOTE: the managers which are wrapped eagerly; any other manager of the
+# underlying client is wrapped on first access.
+ASYNC_MANAGERS = ('servers', 'flavors', 'hypervisors', 'migrations')
+
+_DONE = object()
+
+
+def _next_page(pages):
+    # NOTE: StopIteration cannot be raised into a Future, so translate the
+    # end of the iteration into a sentinel.
+    return next(pages, _DONE)
+
+
+class AsyncManager(object):
+    """Awaitable facade over a synchronous manager."""
+
+    def __init__(self, client, manager):
+        self._client = client
+        self._manager = manager
+
+    def __repr__(self):
+        return "<AsyncManager: %s>" % self._manager.__class__.__name__
+
+    @property
+    def manager(self):
+        """The wrapped synchronous manager."""
+        return self._manager
+
+    def __getattr__(self, name):
+        attr = getattr(self._manager, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        if name.startswith('iter_'):
+            # NOTE: the iterators fetch their items as they are consumed,
+            # each step must run on the executor, not only their creation.
+            @functools.wraps(attr)
+            async def iterate(*args, **kwargs):
+                items = await self._client.run(attr, *args, **kwargs)
+                async for item in self._iterate(items):
+                    yield item
+
+            return iterate
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._client.run(attr, *args, **kwargs)
+
+        return call
+
+    async def _iterate(self, items):
+        """Iterate over a blocking iterator, stepping it on the executor."""
+        items = iter(items)
+        step = concurrent.futures.Future()
+        step.set_result(None)
+        try:
+            while True:
+                step = self._client.executor.submit(_next_page, items)
+                item = await asyncio.wrap_future(step)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            if hasattr(items, 'close'):
+                self._close_after(items, step)
+
+    def _close_after(self, items, step):
+        """Close an iterator on the executor once its last step is done.
+
+        If the consumer was cancelled while an item was being fetched, the
+        iterator is still running on the executor, it can't be closed
+        before that step returns.
+        """
+        def close(step):
+            try:
+                self._client.executor.submit(items.close)
+            except RuntimeError:
+                # the executor is shut down
+                items.close()
+
+        step.add_done_callback(close)
+
+    def _pages(self, *args, **kwargs):
+        if hasattr(self._manager, 'iter_pages'):
+            yield from self._manager.iter_pages(*args, **kwargs)
+        else:
+            yield self._manager.list(*args, **kwargs)
+
+    async def iter_list(self, *args, **kwargs):
+        """Iterate asynchronously over the items of a listing.
+
+        The arguments are the ones of the ``iter_pages`` method of the
+        wrapped manager, or of its ``list`` method for the managers not
+        paginating their listings. Items are yielded as soon as the page
+        holding them has been received.
+        """
+        async for page in self._iterate(self._pages(*args, **kwargs)):
+            for item in page:
+                yield item
+
+
+class AsyncClient(object):
+    """Asyncio flavour of the OpenStack Compute API client.
+
+    It should be created via :func:`Client`.
+
+    :param client: synchronous client to drive, as returned by
+        :func:`novaclient.client.Client`
+    :param executor: :class:`concurrent.futures.Executor` running the
+        blocking HTTP calls. If not provided, a thread pool of
+        ``max_workers`` threads is created and owned by this client. Its
+        size bounds the number of concurrent calls.
+    :param max_workers: size of the thread pool created when ``executor``
+        is not provided (optional), see
+        :class:`concurrent.futures.ThreadPoolExecutor` for the default.
+    """
+
+    def __init__(self, client, executor=None, max_workers=None):
+        self.client = client
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='novaclient-aio')
+        self.executor = executor
+        for name in ASYNC_MANAGERS:
+            setattr(self, name, AsyncManager(self, getattr(client, name)))
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if isinstance(attr, base.Manager):
+            attr = AsyncManager(self, attr)
+            setattr(self, name, attr)
+        return attr
+
+    @property
+    def api_version(self):
+        return self.client.api_version
+
+    @api_version.setter
+    def api_version(self, value):
+        self.client.api_version = value
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking callable on the executor and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        """Release the executor, if it is owned by this client."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, t, v, tb):
+        self.close()
+
+
+def Client(version, username=None, password=None, project_id=None,
+           auth_url=None, executor=None, max_workers=None, **kwargs):
+    """Initialize an asyncio client object based on given version.
+
+    The arguments are the ones of :func:`novaclient.client.Client`, plus the
+    ``executor`` and ``max_workers`` arguments of :class:`AsyncClient`.
+    ``lazy_load`` defaults to ``novaclient.base.LAZY_LOAD_RAISE``, the lazy
+    loads of the resources would block the event loop::
+
+        >>> from novaclient import aio
+        >>> async with aio.Client(VERSION, session=sess) as nova:
+        ...     server = await nova.servers.get(SERVER_ID)
+        ...     async for server in nova.servers.iter_list():
+        ...         print(server.name)
+    """
+    kwargs.setdefault('lazy_load', base.LAZY_LOAD_RAISE)
+    sync_client = nova_client.Client(version, username=username,
+                                     password=password,
+                                     project_id=project_id,
+                                     auth_url=auth_url, **kwargs)
+    return AsyncClient(sync_client, executor=executor,
+                       max_workers=max_workers)
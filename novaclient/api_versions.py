@@ -13,9 +13,7 @@
 
 import functools
 import logging
-import os
 import re
-import traceback
 import warnings
 
 from oslo_utils import strutils
@@ -34,9 +32,17 @@ HEADER_NAME = "OpenStack-API-Version"
 SERVICE_TYPE = "compute"
 
 _SUBSTITUTIONS = {}
+# the identifier, generation and first line of the last variant registered
+# for each qualified function name
+_DEFINITIONS = {}
+# the variant to call for each identifier and version, see get_dispatch
+_DISPATCH = {}
 
 _type_error_msg = _("'%(other)s' should be an instance of '%(cls)s'")
 
+# the minor part of the latest version of a major version
+_LATEST_MINOR = float("inf")
+
 
 class APIVersion(object):
     """This class represents an API Version Request.
@@ -44,9 +50,18 @@ class APIVersion(object):
     This class provides convenience methods for manipulation
     and comparison of version numbers that we need to do to
     implement microversions.
+
+    The objects are immutable and hashable, and the ones created from the
+    same string are the same object, so creating them and comparing them is
+    cheap.
     """
 
-    def __init__(self, version_str=None):
+    __slots__ = ('ver_major', 'ver_minor', '_key')
+
+    # the parsed objects, by class and string representation
+    _interned = {}
+
+    def __new__(cls, version_str=None):
         """Create an API version object.
 
         :param version_str: String representation of APIVersionRequest.
@@ -55,26 +70,52 @@ class APIVersion(object):
                             to create Null APIVersionRequest, which is
                             equal to 0.0
         """
-        self.ver_major = 0
-        self.ver_minor = 0
+        try:
+            return cls._interned[(cls, version_str)]
+        except KeyError:
+            pass
+
+        ver_major = 0
+        ver_minor = 0
 
         if version_str is not None:
             match = re.match(r"^([1-9]\d*)\.([1-9]\d*|0|latest)$", version_str)
             if match:
-                self.ver_major = int(match.group(1))
+                ver_major = int(match.group(1))
                 if match.group(2) == "latest":
                     # NOTE(andreykurilin): Infinity allows to easily determine
                     # latest version and doesn't require any additional checks
                     # in comparison methods.
-                    self.ver_minor = float("inf")
+                    ver_minor = _LATEST_MINOR
                 else:
-                    self.ver_minor = int(match.group(2))
+                    ver_minor = int(match.group(2))
             else:
                 msg = _("Invalid format of client version '%s'. "
                         "Expected format 'X.Y', where X is a major part and Y "
                         "is a minor part of version.") % version_str
                 raise exceptions.UnsupportedVersion(msg)
 
+        self = super(APIVersion, cls).__new__(cls)
+        object.__setattr__(self, 'ver_major', ver_major)
+        object.__setattr__(self, 'ver_minor', ver_minor)
+        object.__setattr__(self, '_key', (ver_major, ver_minor))
+        return cls._interned.setdefault((cls, version_str), self)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(_("APIVersion objects are immutable."))
+
+    def __delattr__(self, name):
+        raise AttributeError(_("APIVersion objects are immutable."))
+
+    def __reduce__(self):
+        return (self.__class__,
+                (None if self.is_null() else self.get_string(),))
+
+    def __hash__(self):
+        # NOTE: salted, so a version and its (major, minor) tuple do not
+        # collide in the dicts mixing both, as comparing them raises
+        return hash((APIVersion, self._key))
+
     def __str__(self):
         """Debug/Logging representation of object."""
         if self.is_latest():
@@ -89,43 +130,44 @@ class APIVersion(object):
             return "<APIVersion: %s>" % self.get_string()
 
     def is_null(self):
-        return self.ver_major == 0 and self.ver_minor == 0
+        return self._key == (0, 0)
 
     def is_latest(self):
-        return self.ver_minor == float("inf")
+        return self.ver_minor == _LATEST_MINOR
+
+    def _type_error(self, other):
+        return TypeError(_type_error_msg % {"other": other,
+                                            "cls": self.__class__})
 
     def __lt__(self, other):
         if not isinstance(other, APIVersion):
-            raise TypeError(_type_error_msg % {"other": other,
-                                               "cls": self.__class__})
-
-        return ((self.ver_major, self.ver_minor) <
-                (other.ver_major, other.ver_minor))
+            raise self._type_error(other)
+        return self._key < other._key
 
     def __eq__(self, other):
         if not isinstance(other, APIVersion):
-            raise TypeError(_type_error_msg % {"other": other,
-                                               "cls": self.__class__})
-
-        return ((self.ver_major, self.ver_minor) ==
-                (other.ver_major, other.ver_minor))
+            raise self._type_error(other)
+        return self._key == other._key
 
     def __gt__(self, other):
         if not isinstance(other, APIVersion):
-            raise TypeError(_type_error_msg % {"other": other,
-                                               "cls": self.__class__})
-
-        return ((self.ver_major, self.ver_minor) >
-                (other.ver_major, other.ver_minor))
+            raise self._type_error(other)
+        return self._key > other._key
 
     def __le__(self, other):
-        return self < other or self == other
+        if not isinstance(other, APIVersion):
+            raise self._type_error(other)
+        return self._key <= other._key
 
     def __ne__(self, other):
-        return not self.__eq__(other)
+        if not isinstance(other, APIVersion):
+            raise self._type_error(other)
+        return self._key != other._key
 
     def __ge__(self, other):
-        return self > other or self == other
+        if not isinstance(other, APIVersion):
+            raise self._type_error(other)
+        return self._key >= other._key
 
     def matches(self, min_version, max_version):
         """Matches the version object.
@@ -168,6 +210,14 @@ class APIVersion(object):
         return "%s.%s" % (self.ver_major, self.ver_minor)
 
 
+# Microversions which the API version is compared with on hot paths, like
+# listing and showing servers
+V2_47 = APIVersion("2.47")  # flavor details embedded in servers
+V2_66 = APIVersion("2.66")  # changes-before filter of servers
+V2_69 = APIVersion("2.69")  # servers of down cells without flavor
+V2_73 = APIVersion("2.73")  # locked filter of servers
+
+
 class VersionedMethod(object):
 
     def __init__(self, name, start_version, end_version, func):
@@ -358,23 +408,26 @@ def check_headers(response, api_version):
 def _add_substitution(versioned_method):
     _SUBSTITUTIONS.setdefault(versioned_method.name, [])
     _SUBSTITUTIONS[versioned_method.name].append(versioned_method)
+    _DISPATCH.clear()
 
 
 def _get_function_name(func):
-    # NOTE(andreykurilin): Based on the facts:
-    #  - Python 2 does not have __qualname__ property as Python 3 has;
-    #  - we cannot use im_class here, since we need to obtain name of
-    #    function in `wraps` decorator during class initialization
-    #    ("im_class" property does not exist at that moment)
-    #  we need to write own logic to obtain the full function name which
-    #  include module name, owner name(optional) and just function name.
-    filename, _lineno, _name, line = traceback.extract_stack()[-4]
-    module, _file_extension = os.path.splitext(filename)
-    module = module.replace("/", ".")
-    if module.endswith(func.__module__):
-        return "%s.[%s].%s" % (func.__module__, line, func.__name__)
-    else:
-        return "%s.%s" % (func.__module__, func.__name__)
+    """Get the identifier shared by the versioned variants of a function.
+
+    The variants of a method are defined one after the other in the body of
+    their class, and share the qualified name of the function. A variant
+    defined above the last registered one means that the scope was run again,
+    e.g. a class defined in a function, and starts a new set of variants.
+    """
+    base = "%s.%s" % (func.__module__, func.__qualname__)
+    code = getattr(func, "__code__", None)
+    lineno = code.co_firstlineno if code is not None else 0
+    name, generation, last_lineno = _DEFINITIONS.get(base, (base, 0, -1))
+    if lineno <= last_lineno:
+        generation += 1
+        name = "%s[%s]" % (base, generation)
+    _DEFINITIONS[base] = (name, generation, lineno)
+    return name
 
 
 def get_substitutions(func_name, api_version=None):
@@ -388,6 +441,27 @@ def get_substitutions(func_name, api_version=None):
     return sorted(substitutions, key=lambda m: m.start_version)
 
 
+def get_dispatch(func_name, api_version):
+    """Get the function of the variant to call for an API version.
+
+    The variant is resolved once for each version of each method. The cache
+    is keyed by the value of the version, so a client whose ``api_version``
+    changes gets the variants of its new version, and it is cleared when a
+    variant is registered.
+
+    :returns: the function, or None if no variant supports the version
+    """
+    key = (func_name, api_version)
+    try:
+        return _DISPATCH[key]
+    except KeyError:
+        pass
+    methods = get_substitutions(func_name, api_version)
+    func = methods[-1].func if methods else None
+    _DISPATCH[key] = func
+    return func
+
+
 # FIXME(mriedem): This breaks any ManagerWithFind.list method that has a
 # 'detailed' kwarg since the ManagerWithFind.findall won't find the correct
 # argspec from the wrapped list method.
@@ -408,12 +482,12 @@ def wraps(start_version, end_version=None):
 
         @functools.wraps(func)
         def substitution(obj, *args, **kwargs):
-            methods = get_substitutions(name, obj.api_version)
+            method = get_dispatch(name, obj.api_version)
 
-            if not methods:
+            if method is None:
                 raise exceptions.VersionNotFoundForAPIMethod(
                     obj.api_version.get_string(), name)
-            return methods[-1].func(obj, *args, **kwargs)
+            return method(obj, *args, **kwargs)
 
         # Let's share "arguments" with original method and substitution to
         # allow put utils.arg and wraps decorators in any order
@@ -421,11 +495,10 @@ def wraps(start_version, end_version=None):
             func.arguments = []
         substitution.arguments = func.arguments
 
-        # NOTE(andreykurilin): The way to obtain function's name in Python 2
-        #   bases on traceback(see _get_function_name for details). Since the
-        #   right versioned method is used in several places, one object
-        #   can have different names. Let's generate name of function one time
-        #   and use __id__ property in all other places.
+        # NOTE(andreykurilin): The name of the function depends on the order
+        #   in which its variants are defined (see _get_function_name for
+        #   details). Let's generate name of function one time and use __id__
+        #   property in all other places.
         substitution.__id__ = name
 
         return substitution
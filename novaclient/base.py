@@ -20,19 +20,56 @@ Base utilities to build API operation managers and objects on top of.
 """
 
 import abc
+import array
+import collections
+import collections.abc
+from concurrent import futures
 import contextlib
 import copy
-import hashlib
-import os
+import functools
+import itertools
+import json
+import logging
+import queue
+import re
 import threading
+from urllib import parse
+import weakref
 
+from oslo_utils import importutils
 from oslo_utils import reflection
 from oslo_utils import strutils
 import requests
 
+from novaclient import api_versions
 from novaclient import exceptions
 from novaclient import utils
 
+numpy = importutils.try_import('numpy')
+
+LOG = logging.getLogger(__name__)
+
+# Modes of the lazy loading of the resources
+LAZY_LOAD_ALLOW, LAZY_LOAD_LOG, LAZY_LOAD_RAISE = 'allow', 'log', 'raise'
+LAZY_LOAD_MODES = (LAZY_LOAD_ALLOW, LAZY_LOAD_LOG, LAZY_LOAD_RAISE)
+
+# Maximum number of concurrent gets of Manager.hydrate
+DEFAULT_HYDRATE_WORKERS = 8
+
+# Raw modes of the listings and gets: the decoded response body, or the
+# undecoded one
+RAW_BODY, RAW_BYTES = 'body', 'bytes'
+RAW_MODES = (RAW_BODY, RAW_BYTES)
+
+_RAW_COLON_RE = re.compile(rb'\s*:\s*')
+_RAW_EMPTY_LIST_RE = re.compile(rb'\[\s*\]')
+_JSON_DECODER = json.JSONDecoder()
+
+_DONE = object()
+
+# query parameters which order or split a listing without filtering it
+_ORDER_PARAMS = frozenset(['limit', 'sort_key', 'sort_dir'])
+
 
 def getid(obj):
     """Get object's ID or object.
@@ -43,6 +80,165 @@ def getid(obj):
     return getattr(obj, 'id', obj)
 
 
+def get_next_marker(body, links_key):
+    """Get the marker of the next page of a paginated listing.
+
+    Nova returns a "next" link in the ``links_key`` entry of the response
+    body when the page is full. The marker is taken from the query string
+    of that link.
+
+    :returns: the marker, or None if there is no next page
+    """
+    for link in body.get(links_key) or []:
+        if link.get('rel') == 'next':
+            query = parse.parse_qs(parse.urlsplit(link.get('href', '')).query)
+            markers = query.get('marker')
+            if markers:
+                return markers[-1]
+    return None
+
+
+def is_unfiltered(url, params=()):
+    """Whether a listing URL, and its query parameters, filter nothing.
+
+    Only the parameters ordering the listing or setting its page size are
+    allowed, a marker skips the start of the listing.
+    """
+    query = parse.parse_qsl(parse.urlsplit(url).query)
+    return all(k in _ORDER_PARAMS for k, v in itertools.chain(query, params))
+
+
+def _find_raw_value(content, key, last=True):
+    """Get the offset of the value of a key in an undecoded JSON object.
+
+    Nova writes the items of a listing before its links, so the first
+    occurrence of the key is used for the items and the last one for the
+    links.
+
+    :returns: the offset, or -1 if the key is missing
+    """
+    needle = json.dumps(key).encode('utf-8')
+    start, end = 0, len(content)
+    while True:
+        if last:
+            index = content.rfind(needle, 0, end)
+        else:
+            index = content.find(needle, start)
+        if index < 0:
+            return -1
+        match = _RAW_COLON_RE.match(content, index + len(needle))
+        if match:
+            return match.end()
+        start, end = index + 1, index
+
+
+def get_raw_next_marker(content, links_key):
+    """Get the marker of the next page from an undecoded response body.
+
+    Only the links are decoded, see :func:`get_next_marker`.
+    """
+    offset = _find_raw_value(content, links_key)
+    if offset < 0:
+        return None
+    try:
+        links = _JSON_DECODER.raw_decode(content[offset:].decode('utf-8'))[0]
+    except ValueError:
+        return None
+    if not isinstance(links, list):
+        return None
+    return get_next_marker({links_key: links}, links_key)
+
+
+def is_raw_list_empty(content, key):
+    """Whether the list of a key of an undecoded response body is empty."""
+    offset = _find_raw_value(content, key, last=False)
+    return offset < 0 or bool(_RAW_EMPTY_LIST_RE.match(content, offset))
+
+
+def prefetch_pages(pages, depth):
+    """Fetch pages ahead of the consumer on a worker thread.
+
+    While the consumer handles a page, the worker fetches up to ``depth``
+    following pages, so the round trips of the listing overlap with the
+    processing of its pages. At most ``depth`` pages are held besides the
+    one being consumed. Errors raised while fetching are re-raised to the
+    consumer in order. When the consumer stops early (by closing the
+    generator, or dropping it), the worker exits after the request in
+    flight, if any, and closes ``pages``.
+
+    :param pages: iterator of pages, run on the worker thread
+    :param depth: number of pages fetched ahead of the consumer
+    :returns: generator of the pages
+    """
+    if depth < 1:
+        raise ValueError("depth must be a positive integer")
+    fetched = queue.Queue()
+    slots = threading.Semaphore(depth)
+    stop = threading.Event()
+
+    def fetch():
+        try:
+            while True:
+                slots.acquire()
+                if stop.is_set():
+                    return
+                page = next(pages, _DONE)
+                fetched.put((page, None))
+                if page is _DONE:
+                    return
+        except Exception as e:
+            fetched.put((None, e))
+        finally:
+            close = getattr(pages, 'close', None)
+            if close is not None:
+                close()
+
+    worker = threading.Thread(target=fetch, name='novaclient-prefetch')
+    worker.daemon = True
+
+    def consume():
+        worker.start()
+        try:
+            while True:
+                page, error = fetched.get()
+                if error is not None:
+                    raise error
+                if page is _DONE:
+                    return
+                slots.release()
+                yield page
+        finally:
+            stop.set()
+            # wake the worker up if it waits for a free slot
+            slots.release()
+
+    return consume()
+
+
+def iter_json(resources, **kwargs):
+    """Encode resources as a JSON array, chunk by chunk.
+
+    The attributes of the resources are encoded straight from their
+    ``_info`` mapping, without copying them, so a listing can be written to
+    a file or a socket as it is encoded::
+
+        for chunk in base.iter_json(cs.servers.list()):
+            fp.write(chunk)
+
+    :param resources: iterable of :class:`Resource`
+    :param kwargs: arguments of :class:`json.JSONEncoder`
+    :returns: generator of strings
+    """
+    encoder = json.JSONEncoder(**kwargs)
+    yield '['
+    for i, resource in enumerate(resources):
+        if i:
+            yield encoder.item_separator
+        for chunk in encoder.iterencode(resource._info):
+            yield chunk
+    yield ']'
+
+
 # TODO(aababilov): call run_hooks() in HookableMixin's child classes
 class HookableMixin(object):
     """Mixin so classes can register and run hooks."""
@@ -75,15 +271,82 @@ class HookableMixin(object):
             hook_func(*args, **kwargs)
 
 
+def _reindexing(method):
+    """Wrap a list method of :class:`RequestIds` to reindex it after."""
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        try:
+            return method(self, *args)
+        finally:
+            self._seen = set(self)
+    return wrapper
+
+
+class RequestIds(list):
+    """Request ids of a result, in order and without duplicates.
+
+    It is a list, with the membership test of a set: adding the request ids
+    of many pages or sub-requests to a result is linear.
+    """
+    __slots__ = ('_seen',)
+
+    def __init__(self, values=()):
+        super(RequestIds, self).__init__()
+        self._seen = set()
+        self.extend(values)
+
+    def __contains__(self, request_id):
+        return request_id in self._seen
+
+    def add(self, request_id):
+        """Append a request id, unless it is known already."""
+        if request_id not in self._seen:
+            self._seen.add(request_id)
+            super(RequestIds, self).append(request_id)
+
+    def append(self, request_id):
+        self._seen.add(request_id)
+        super(RequestIds, self).append(request_id)
+
+    def extend(self, values):
+        for value in values:
+            self.add(value)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    insert = _reindexing(list.insert)
+    remove = _reindexing(list.remove)
+    pop = _reindexing(list.pop)
+    clear = _reindexing(list.clear)
+    __setitem__ = _reindexing(list.__setitem__)
+    __delitem__ = _reindexing(list.__delitem__)
+
+    def __reduce__(self):
+        return RequestIds, (list(self),)
+
+
 class RequestIdMixin(object):
     """Wrapper class to expose x-openstack-request-id to the caller.
     """
+    __slots__ = ()
+
     def request_ids_setup(self):
-        self.x_openstack_request_ids = []
+        # NOTE: the results without request ids, like most resources of a
+        # listing, share an empty tuple until they get one.
+        self.x_openstack_request_ids = ()
+
+    def _get_request_ids(self):
+        request_ids = self.x_openstack_request_ids
+        if not isinstance(request_ids, RequestIds):
+            request_ids = RequestIds(request_ids)
+            self.x_openstack_request_ids = request_ids
+        return request_ids
 
     @property
     def request_ids(self):
-        return self.x_openstack_request_ids
+        return self._get_request_ids()
 
     def append_request_ids(self, resp):
         """Add request_ids as an attribute to the object
@@ -107,39 +370,151 @@ class RequestIdMixin(object):
         else:
             # If resp is of type string or None.
             request_id = resp
-        if request_id not in self.x_openstack_request_ids:
-            self.x_openstack_request_ids.append(request_id)
+        self._get_request_ids().add(request_id)
+
+
+_IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+
+def copy_info(value):
+    """Deep copy of the JSON data of a resource.
+
+    Dicts and lists are copied recursively, immutable values are shared and
+    any other value is copied with :func:`copy.deepcopy`.
+    """
+    if type(value) is dict:
+        return {k: copy_info(v) for k, v in value.items()}
+    if type(value) is list:
+        return [copy_info(v) for v in value]
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    return copy.deepcopy(value)
+
+
+def _read_only(value):
+    if isinstance(value, dict):
+        return ReadOnlyMapping(value)
+    if isinstance(value, list):
+        return ReadOnlySequence(value)
+    return value
+
+
+class ReadOnlyMapping(collections.abc.Mapping):
+    """Read-only view of a dict, nested dicts and lists included."""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        return _read_only(self._data[key])
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __eq__(self, other):
+        if isinstance(other, ReadOnlyMapping):
+            other = other._data
+        return self._data == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._data)
+
+
+class ReadOnlySequence(collections.abc.Sequence):
+    """Read-only view of a list, nested dicts and lists included."""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ReadOnlySequence(self._data[index])
+        return _read_only(self._data[index])
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, ReadOnlySequence):
+            other = other._data
+        return self._data == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._data)
 
 
 class Resource(RequestIdMixin):
     """Base class for OpenStack resources (tenant, user, etc.).
 
     This is pretty much just a bag for attributes.
+
+    In compact mode, the attributes are not copied to the instance but read
+    from ``_info`` on access, which halves the memory used by large
+    listings. Attributes defined on the class take precedence over the keys
+    of ``_info`` in that mode, deleting an attribute removes its key from
+    ``_info``, and resources overriding ``_add_details`` always use the
+    default mode. Compact mode is enabled with the ``compact_resources``
+    option of the client.
     """
 
+    __slots__ = ('manager', '_info', '_loaded', '_compact',
+                 'x_openstack_request_ids', '__dict__', '__weakref__')
+
     HUMAN_ID = False
     NAME_ATTR = 'name'
 
-    def __init__(self, manager, info, loaded=False, resp=None):
+    def __init__(self, manager, info, loaded=False, resp=None, compact=None):
         """Populate and bind to a manager.
 
         :param manager: BaseManager object
         :param info: dictionary representing resource attributes
         :param loaded: prevent lazy-loading if set to True
         :param resp: Response or list of Response objects
+        :param compact: use compact mode, defaults to the
+                        ``compact_resources`` option of the client
         """
+        if compact is None:
+            compact = getattr(getattr(manager, 'api', None),
+                              'compact_resources', False)
         self.manager = manager
         self._info = info
-        self._add_details(info)
+        self._compact = (compact is True and
+                         type(self)._add_details is Resource._add_details)
+        if not self._compact:
+            self._add_details(info)
         self._loaded = loaded
         self.request_ids_setup()
         self.append_request_ids(resp)
 
     def __repr__(self):
-        reprkeys = sorted(k
-                          for k in self.__dict__.keys()
-                          if k[0] != '_' and
-                          k not in ['manager', 'x_openstack_request_ids'])
+        keys = set(self.__dict__)
+        if self._compact:
+            cls = type(self)
+            # NOTE: keys shadowed by a property are not attributes, like
+            # the ones which could not be set in the default mode.
+            keys.update(k for k in self._info
+                        if not hasattr(getattr(cls, k, None), '__set__'))
+        reprkeys = sorted(k for k in keys if k[0] != '_')
         info = ", ".join("%s=%s" % (k, getattr(self, k)) for k in reprkeys)
         return "<%s %s>" % (self.__class__.__name__, info)
 
@@ -158,6 +533,9 @@ class Resource(RequestIdMixin):
         return None
 
     def _add_details(self, info):
+        if self._compact:
+            self._info.update(info)
+            return
         for (k, v) in info.items():
             try:
                 setattr(self, k, v)
@@ -167,15 +545,49 @@ class Resource(RequestIdMixin):
                 pass
 
     def __getattr__(self, k):
-        if k not in self.__dict__:
+        if k in Resource.__slots__:
+            # NOTE: the bookkeeping fields are not set yet, for example on
+            # a copy, do not lazy-load them.
+            raise AttributeError(k)
+        if self._compact:
+            info = self._info
+        else:
+            info = self.__dict__
+        if k not in info:
             # NOTE(bcwaldon): disallow lazy-loading if already loaded once
             if not self.is_loaded():
+                self._check_lazy_load(k)
                 self.get()
                 return self.__getattr__(k)
 
             raise AttributeError(k)
         else:
-            return self.__dict__[k]
+            return info[k]
+
+    def __delattr__(self, k):
+        if (getattr(self, '_compact', False) and k not in self.__dict__ and
+                k in self._info):
+            # NOTE: in compact mode, the attributes are the keys of _info
+            del self._info[k]
+            return
+        super(Resource, self).__delattr__(k)
+
+    def _check_lazy_load(self, k):
+        """Apply the ``lazy_load`` option of the client to a lazy load."""
+        api = getattr(self.manager, 'api', None)
+        lazy_loads = getattr(api, 'lazy_loads', None)
+        if isinstance(lazy_loads, collections.Counter):
+            lazy_loads[self.__class__.__name__] += 1
+        mode = getattr(api, 'lazy_load', LAZY_LOAD_ALLOW)
+        if mode == LAZY_LOAD_RAISE:
+            raise exceptions.LazyLoadForbidden(self, k)
+        if mode == LAZY_LOAD_LOG:
+            logger = getattr(api, 'logger', None)
+            if not isinstance(logger, logging.Logger):
+                logger = LOG
+            logger.warning("Lazy loading %s %s to get '%s'",
+                           self.__class__.__name__, self._info.get('id'), k,
+                           stack_info=True)
 
     def get(self):
         """Support for lazy loading details.
@@ -210,6 +622,12 @@ class Resource(RequestIdMixin):
         # __eq__, when it returns NotImplemented, is returning False.
         return not self == other
 
+    def __hash__(self):
+        # NOTE: resources are equal by id, or by info when they have none,
+        # which is not hashable: they all share the same hash then. _info is
+        # read directly, a resource which is not loaded must not be fetched.
+        return hash(self._info.get('id'))
+
     def is_loaded(self):
         return self._loaded
 
@@ -219,8 +637,66 @@ class Resource(RequestIdMixin):
     def set_info(self, key, value):
         self._info[key] = value
 
+    def as_mapping(self):
+        """Get a read-only view of the attributes, without copying them.
+
+        Nested dicts and lists are returned as read-only views too. Use
+        :meth:`to_dict` to get a copy which can be modified.
+        """
+        return ReadOnlyMapping(self._info)
+
     def to_dict(self):
-        return copy.deepcopy(self._info)
+        """Get a deep copy of the attributes, see :func:`copy_info`.
+
+        Use :meth:`as_mapping` to read the attributes without copying them.
+        """
+        return copy_info(self._info)
+
+
+class IdentityMap(object):
+    """Canonical resources of a client, by class and id.
+
+    When a resource is fetched again, by a listing or a get, the newer
+    attributes are merged into the resource fetched first, which is
+    returned instead of a new object. The resources are weakly referenced,
+    they are forgotten once they are not used anymore. Resources without an
+    id are not mapped.
+
+    Enabled with the ``identity_map`` option of the client.
+    """
+
+    def __init__(self):
+        self._resources = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, resource_class, resource_id):
+        """Get the canonical resource of a class and an id, or None."""
+        return self._resources.get((resource_class, resource_id))
+
+    def merge(self, resource):
+        """Get the canonical resource, updated with the given one."""
+        resource_id = resource._info.get('id')
+        if resource_id is None:
+            return resource
+        key = (type(resource), resource_id)
+        with self._lock:
+            canonical = self._resources.get(key)
+            if canonical is None:
+                self._resources[key] = resource
+                return resource
+            if canonical is not resource:
+                canonical._add_details(resource._info)
+                canonical._info.update(resource._info)
+                if resource.is_loaded():
+                    canonical.set_loaded(True)
+                if resource.x_openstack_request_ids:
+                    canonical.x_openstack_request_ids = RequestIds(
+                        resource.request_ids)
+            return canonical
+
+    def clear(self):
+        with self._lock:
+            self._resources.clear()
 
 
 class Manager(HookableMixin):
@@ -230,7 +706,6 @@ class Manager(HookableMixin):
     etc.) and provide CRUD operations for them.
     """
     resource_class = None
-    cache_lock = threading.RLock()
 
     def __init__(self, api):
         self.api = api
@@ -244,14 +719,46 @@ class Manager(HookableMixin):
         return self.api.api_version
 
     def _list(self, url, response_key, obj_class=None, body=None,
-              filters=None):
+              filters=None, as_columns=False, fields=None, raw=None):
+        """List resources.
+
+        :param raw: return the response body as it is, without building
+                    resources: ``RAW_BODY`` for the decoded body as a
+                    :class:`DictWithMeta`, ``RAW_BYTES`` for the undecoded
+                    one as a :class:`RawResponse`. ``as_columns`` and
+                    ``fields`` are ignored then.
+        """
         if filters:
             url = utils.get_url_with_filter(url, filters)
+        if raw:
+            return self._request_raw(url, raw, body=body)
+        # NOTE: only a complete listing of the resources may replace the
+        # completion cache, the other ones are merged into it.
+        replace_cache = not body and is_unfiltered(url)
         if body:
             resp, body = self.api.client.post(url, body=body)
         else:
             resp, body = self.api.client.get(url)
-
+        if replace_cache and isinstance(body, dict):
+            replace_cache = not get_next_marker(body,
+                                                '%s_links' % response_key)
+
+        return self._build_list(resp, body, response_key, obj_class,
+                                replace_cache=replace_cache,
+                                as_columns=as_columns, fields=fields)
+
+    def _build_list(self, resp, body, response_key, obj_class=None,
+                    replace_cache=False, as_columns=False, fields=None):
+        """Build the result of a listing from the response body.
+
+        :param replace_cache: replace the completion cache with the listed
+                              resources rather than merge them into it, for
+                              complete unfiltered listings
+        :param as_columns: return a :class:`ColumnarList` rather than a
+                           list of resources, no resource is built
+        :param fields: fields kept in the resources or in the columns, all
+                       of them by default, see :func:`project_info`
+        """
         if obj_class is None:
             obj_class = self.resource_class
 
@@ -264,11 +771,174 @@ class Manager(HookableMixin):
             except KeyError:
                 pass
 
-        with self.completion_cache('human_id', obj_class, mode="w"):
-            with self.completion_cache('uuid', obj_class, mode="w"):
-                items = [obj_class(self, res, loaded=True)
-                         for res in data if res]
-                return ListWithMeta(items, resp)
+        if as_columns:
+            return ColumnarList.from_items([res for res in data if res],
+                                           fields, resp)
+        if fields is not None:
+            # NOTE: drop the other fields before the resources are built, so
+            # only the projected fields outlive the response body.
+            data = [project_info(res, fields) for res in data if res]
+
+        items = [obj_class(self, res, loaded=True) for res in data if res]
+        items = self._merge_identities(items)
+        if fields is None:
+            # NOTE: projected resources may lack the names, they must not
+            # replace the complete ones of the cache.
+            self._populate_completion_cache(obj_class, items,
+                                            replace=replace_cache)
+        return ListWithMeta(items, resp)
+
+    def _request_raw(self, url, raw, body=None):
+        """Get, or post to, an URL and return the body of the response.
+
+        See the ``raw`` parameter of :meth:`_list`.
+        """
+        if raw not in RAW_MODES:
+            raise ValueError("raw must be one of: %s" % ", ".join(RAW_MODES))
+        kwargs = {'decode': False} if raw == RAW_BYTES else {}
+        if body:
+            resp, body = self.api.client.post(url, body=body, **kwargs)
+        else:
+            resp, body = self.api.client.get(url, **kwargs)
+        if raw == RAW_BYTES:
+            return RawResponse(resp)
+        return DictWithMeta(body or {}, resp)
+
+    def _paginate(self, url, response_key, obj_class=None, filters=None,
+                  marker=None, limit=None, links_key=None, prefetch=0,
+                  as_columns=False, fields=None, raw=None):
+        """Iterate over the pages of a marker-paginated listing.
+
+        Pages are requested one at a time, when the previous one has been
+        consumed. The marker of the next page is taken from the next link
+        returned by Nova (see :func:`get_next_marker`), so the iteration
+        stops with the first page lacking that link, that is with the first
+        partial page. An empty trailing page is not yielded.
+
+        :param url: URL of the listing, it may already hold a query string
+        :param response_key: key of the items in the response body
+        :param obj_class: class of the items (optional)
+        :param filters: dict or list of (key, value) pairs of query
+                        parameters (optional)
+        :param marker: marker of the first page (optional)
+        :param limit: page size (optional). Note the API server has a
+                      configurable default limit.
+        :param links_key: key of the links in the response body, defaults
+                          to ``<response_key>_links``
+        :param prefetch: number of pages fetched ahead of the consumer by a
+                         worker thread (see :func:`prefetch_pages`). Pages
+                         are fetched on demand by default.
+        :param as_columns: yield :class:`ColumnarList` pages rather than
+                           lists of resources (optional)
+        :param fields: fields kept in the resources or in the columns
+                       (optional), see :func:`project_info`
+        :param raw: yield the response bodies as they are (optional), see
+                    :meth:`_list`. Only the links of undecoded bodies are
+                    decoded, to get the next marker.
+        :returns: generator of :class:`ListWithMeta`
+        """
+        if isinstance(filters, dict):
+            filters = filters.items()
+        params = [(k, v) for k, v in filters or () if k != 'marker']
+        if limit:
+            params = [(k, v) for k, v in params if k != 'limit']
+            params.append(('limit', int(limit)))
+        links_key = links_key or '%s_links' % response_key
+
+        pages = self._fetch_pages(url, response_key, obj_class, params,
+                                  marker, links_key, as_columns, fields, raw)
+        if prefetch:
+            pages = prefetch_pages(pages, prefetch)
+        return pages
+
+    def _fetch_pages(self, url, response_key, obj_class, params, marker,
+                     links_key, as_columns=False, fields=None, raw=None):
+        # NOTE: the pages are merged into the completion cache, which is
+        # replaced once a complete unfiltered listing has been walked, with
+        # the resources it keeps, i.e. the last ones.
+        cache = self._get_completion_cache()
+        listed = None
+        if (cache and not (raw or as_columns) and fields is None and
+                not marker and is_unfiltered(url, params)):
+            listed = collections.deque(
+                maxlen=getattr(cache, 'max_entries', None))
+        first = True
+        while True:
+            query = list(params)
+            if marker:
+                query.append(('marker', marker))
+            page_url = url
+            if query:
+                # sort by key only, to keep the order of repeated keys
+                query_string = parse.urlencode(
+                    sorted(query, key=lambda x: x[0]))
+                page_url = "%s%s%s" % (url, '&' if '?' in url else '?',
+                                       query_string)
+            if raw == RAW_BYTES:
+                page = self._request_raw(page_url, raw)
+                empty = is_raw_list_empty(page, response_key)
+            else:
+                if raw:
+                    page = body = self._request_raw(page_url, raw)
+                else:
+                    resp, body = self.api.client.get(page_url)
+                empty = not body.get(response_key)
+            if not first and empty:
+                break
+            if raw:
+                yield page
+            else:
+                page = self._build_list(resp, body, response_key, obj_class,
+                                        as_columns=as_columns, fields=fields)
+                if listed is not None:
+                    listed.extend(page)
+                yield page
+            first = False
+            if raw == RAW_BYTES:
+                marker = get_raw_next_marker(page, links_key)
+            else:
+                marker = get_next_marker(body, links_key)
+            if not marker:
+                break
+        if listed is not None:
+            self._populate_completion_cache(obj_class or self.resource_class,
+                                            listed, replace=True)
+
+    def iter_all(self, *args, **kwargs):
+        """Iterate over all the resources of a paginated listing.
+
+        The arguments are the ones of the ``iter_pages`` method of the
+        manager. Pages are fetched as the iteration goes, so only one page
+        is held in memory at a time.
+        """
+        for page in self.iter_pages(*args, **kwargs):
+            for item in page:
+                yield item
+
+    def list_all(self, *args, **kwargs):
+        """Get all the resources of a paginated listing.
+
+        The arguments are the ones of the ``iter_pages`` method of the
+        manager.
+
+        :returns: :class:`ListWithMeta` holding the request ids of every
+                  page, or :class:`ColumnarList` for columnar pages. The
+                  list holds the pages themselves for raw pages.
+        """
+        pages = self.iter_pages(*args, **kwargs)
+        if kwargs.get('as_columns') and not kwargs.get('raw'):
+            return ColumnarList.concat(list(pages))
+        raw = kwargs.get('raw')
+        result = ListWithMeta([], None)
+        # NOTE: the pages are consumed as they are fetched, so only the
+        # resources outlive them.
+        for page in pages:
+            if raw:
+                result.append(page)
+            else:
+                result.extend(page)
+            result.append_request_ids(page.request_ids)
+        return result
 
     @contextlib.contextmanager
     def alternate_service_type(self, default, allowed_types=()):
@@ -276,86 +946,84 @@ class Manager(HookableMixin):
         if original_service_type in allowed_types:
             yield
         else:
-            self.api.client.service_type = default
-            try:
+            with self.api.client.alternate_service_type(default):
                 yield
-            finally:
-                self.api.client.service_type = original_service_type
 
-    @contextlib.contextmanager
-    def completion_cache(self, cache_type, obj_class, mode):
-        """The completion cache for bash autocompletion.
+    def _merge_identities(self, items):
+        """Replace resources by their canonical instance, if enabled."""
+        identity_map = getattr(self.api, 'identity_map', None)
+        if not isinstance(identity_map, IdentityMap):
+            return items
+        return [identity_map.merge(item) for item in items]
 
-        The completion cache store items that can be used for bash
-        autocompletion, like UUIDs or human-friendly IDs.
+    def _get_completion_cache(self):
+        return getattr(self.api, 'completion_cache', None)
 
-        A resource listing will clear and repopulate the cache.
+    def _populate_completion_cache(self, obj_class, items, replace=False):
+        cache = self._get_completion_cache()
+        if not cache:
+            return
+        # NOTE: read _info directly, attribute access on a resource which is
+        # not loaded would trigger a GET.
+        infos = [item._info for item in items]
+        resource = obj_class.__name__.lower()
+        cache.write(resource, 'uuid', [i.get('id') for i in infos],
+                    replace=replace)
+        if obj_class.HUMAN_ID:
+            names = [i.get(obj_class.NAME_ATTR) for i in infos]
+            cache.write(resource, 'human_id',
+                        [strutils.to_slug(n) for n in names if n],
+                        replace=replace)
 
-        A resource create will append to the cache.
+    @contextlib.contextmanager
+    def completion_cache(self, cache_type, obj_class, mode):
+        """The completion cache for bash autocompletion.
 
-        Delete is not handled because listings are assumed to be performed
-        often enough to keep the cache reasonably up-to-date.
+        Values written with :meth:`write_to_completion_cache` inside this
+        context are queued to the completion cache of the client when the
+        context exits. Mode "w" replaces the content of the cache, mode "a"
+        appends to it. Nothing is done if the completion cache is disabled.
         """
-        # NOTE(wryan): This lock protects read and write access to the
-        # completion caches
-        with self.cache_lock:
-            base_dir = utils.env('NOVACLIENT_UUID_CACHE_DIR',
-                                 default="~/.novaclient")
-
-            # NOTE(sirp): Keep separate UUID caches for each username +
-            # endpoint pair
-            username = utils.env('OS_USERNAME', 'NOVA_USERNAME')
-            url = utils.env('OS_URL', 'NOVA_URL')
-            uniqifier = hashlib.sha256(username.encode('utf-8') +
-                                       url.encode('utf-8')).hexdigest()
-
-            cache_dir = os.path.expanduser(os.path.join(base_dir, uniqifier))
-
-            try:
-                os.makedirs(cache_dir, 0o755)
-            except OSError:
-                # NOTE(kiall): This is typically either permission denied while
-                #              attempting to create the directory, or the
-                #              directory already exists. Either way, don't
-                #              fail.
-                pass
-
-            resource = obj_class.__name__.lower()
-            filename = "%s-%s-cache" % (resource, cache_type.replace('_', '-'))
-            path = os.path.join(cache_dir, filename)
-
-            cache_attr = "_%s_cache" % cache_type
-
-            try:
-                setattr(self, cache_attr, open(path, mode))
-            except IOError:
-                # NOTE(kiall): This is typically a permission denied while
-                #              attempting to write the cache file.
-                pass
+        cache = self._get_completion_cache()
+        if not cache:
+            yield
+            return
 
-            try:
-                yield
-            finally:
-                cache = getattr(self, cache_attr, None)
-                if cache:
-                    cache.close()
-                    delattr(self, cache_attr)
+        cache_attr = "_%s_cache" % cache_type
+        local = self.__dict__.setdefault('_completion_values',
+                                         threading.local())
+        setattr(local, cache_attr, [])
+        try:
+            yield
+        finally:
+            values = getattr(local, cache_attr)
+            delattr(local, cache_attr)
+            cache.write(obj_class.__name__.lower(), cache_type, values,
+                        replace=(mode == "w"))
 
     def write_to_completion_cache(self, cache_type, val):
-        cache = getattr(self, "_%s_cache" % cache_type, None)
-        if cache:
-            cache.write("%s\n" % val)
+        local = self.__dict__.get('_completion_values')
+        values = getattr(local, "_%s_cache" % cache_type, None)
+        if values is not None:
+            values.append(val)
+
+    def _get(self, url, response_key, filters=None, raw=None):
+        """Get a resource.
 
-    def _get(self, url, response_key, filters=None):
+        :param raw: return the response body as it is, without building
+                    the resource, see :meth:`_list`
+        """
         if filters:
             url = utils.get_url_with_filter(url, filters)
+        if raw:
+            return self._request_raw(url, raw)
         resp, body = self.api.client.get(url)
         if response_key is not None:
             content = body[response_key]
         else:
             content = body
-        return self.resource_class(self, content, loaded=True,
-                                   resp=resp)
+        obj = self.resource_class(self, content, loaded=True, resp=resp)
+        return self._merge_identities([obj])[0]
 
     def _create(self, url, body, response_key, return_raw=False,
                 obj_class=None, **kwargs):
@@ -367,12 +1035,16 @@ class Manager(HookableMixin):
         if obj_class is None:
             obj_class = self.resource_class
 
-        with self.completion_cache('human_id', obj_class, mode="a"):
-            with self.completion_cache('uuid', obj_class, mode="a"):
-                return obj_class(self, body[response_key], resp=resp)
+        obj = obj_class(self, body[response_key], resp=resp)
+        obj = self._merge_identities([obj])[0]
+        self._populate_completion_cache(obj_class, [obj])
+        return obj
 
     def _delete(self, url):
         resp, body = self.api.client.delete(url)
+        resolution_cache = getattr(self.api, 'resolution_cache', None)
+        if resolution_cache is not None:
+            resolution_cache.clear()
         return self.convert_into_with_meta(body, resp)
 
     def _update(self, url, body, response_key=None, **kwargs):
@@ -380,9 +1052,10 @@ class Manager(HookableMixin):
         resp, body = self.api.client.put(url, body=body)
         if body:
             if response_key:
-                return self.resource_class(self, body[response_key], resp=resp)
+                obj = self.resource_class(self, body[response_key], resp=resp)
             else:
-                return self.resource_class(self, body, resp=resp)
+                obj = self.resource_class(self, body, resp=resp)
+            return self._merge_identities([obj])[0]
         else:
             return StrWithMeta(body, resp)
 
@@ -404,37 +1077,167 @@ class Manager(HookableMixin):
 class ManagerWithFind(Manager, metaclass=abc.ABCMeta):
     """Like a `Manager`, but with additional `find()`/`findall()` methods."""
 
+    # Attributes of findall filtered by the API when the listing has
+    # search_opts: attribute -> (search option, minimum microversion,
+    # attribute also matched locally or None)
+    findall_filters = {}
+
     @abc.abstractmethod
     def list(self):
         pass
 
     def find(self, **kwargs):
-        """Find a single item with attributes matching ``**kwargs``."""
-        matches = self.findall(**kwargs)
-        num_matches = len(matches)
-        if num_matches == 0:
+        """Find a single item with attributes matching ``**kwargs``.
+
+        The listing is not searched further than a second match, and only
+        the matching item is fetched when the listing is not detailed.
+        """
+        list_kwargs, searches = self._findall_query(kwargs)
+        listing = self.list(**list_kwargs)
+        return self._find_one(listing, [searches], list_kwargs, kwargs)
+
+    def find_name_or_human_id(self, name, **kwargs):
+        """Find a single item by name, or else by human_id.
+
+        ``findall`` lists the same items to search a name and a human_id, so
+        a single listing serves both searches.
+        """
+        name_attr = getattr(self.resource_class, 'NAME_ATTR', 'name')
+        kwargs[name_attr] = name
+        list_kwargs, searches = self._findall_query(kwargs)
+        human_id_searches = [('human_id', value) if attr == name_attr
+                             else (attr, value)
+                             for attr, value in searches]
+        listing = self.list(**list_kwargs)
+        return self._find_one(listing, [searches, human_id_searches],
+                              list_kwargs, kwargs)
+
+    def _find_one(self, listing, searches_list, list_kwargs, kwargs):
+        # the first searches with matches decide the match
+        for searches in searches_list:
+            matches = list(itertools.islice(
+                self._findall_matches(listing, searches), 2))
+            if matches:
+                break
+        if not matches:
             msg = "No %s matching %s." % (self.resource_class.__name__, kwargs)
             raise exceptions.NotFound(404, msg)
-        elif num_matches > 1:
+        elif len(matches) > 1:
             raise exceptions.NoUniqueMatch
-        else:
-            matches[0].append_request_ids(matches.request_ids)
-            return matches[0]
+        match = matches[0]
+        if not list_kwargs.get('detailed', True):
+            match = self.get(match.id)
+        match.append_request_ids(listing.request_ids)
+        return match
 
     def findall(self, **kwargs):
         """Find all items with attributes matching ``**kwargs``."""
         found = ListWithMeta([], None)
+        list_kwargs, searches = self._findall_query(kwargs)
+        listing = self.list(**list_kwargs)
+        found.append_request_ids(listing.request_ids)
+
+        matches = list(self._findall_matches(listing, searches))
+        if list_kwargs.get('detailed', True):
+            found.extend(matches)
+        else:
+            found.extend(self._findall_details(matches, list_kwargs, found))
+
+        return found
+
+    def hydrate(self, resources, list_kwargs=None,
+                max_workers=DEFAULT_HYDRATE_WORKERS):
+        """Load the details of partially loaded resources.
+
+        When ``list`` supports the ``detailed`` argument and more than
+        ``max_workers`` resources are given, their details are taken from a
+        single detailed listing. The other resources, and the ones missing
+        from the listing, are fetched with up to ``max_workers`` concurrent
+        gets. The resources which are not found anymore are left as they
+        are, but are not lazy-loaded later.
+
+        :param resources: the resources to load, from a listing which is not
+                          detailed for example
+        :param list_kwargs: arguments of the detailed listing (optional),
+                            like the search options of the first listing
+        :param max_workers: maximum number of concurrent gets
+        :returns: the resources
+        """
+        pending = collections.OrderedDict()
+        for resource in resources:
+            pending.setdefault(resource.id, []).append(resource)
+        if (len(pending) > max_workers and
+                'detailed' in reflection.get_callable_args(self.list)):
+            listing = self.list(**dict(list_kwargs or {}, detailed=True))
+            for detail in listing:
+                for resource in pending.pop(detail.id, ()):
+                    self._hydrate_one(resource, detail, listing.request_ids)
+
+        def get(resource_id):
+            try:
+                detail = self.get(resource_id)
+            except exceptions.NotFound:
+                detail = None
+            for resource in pending[resource_id]:
+                self._hydrate_one(resource, detail, getattr(
+                    detail, 'request_ids', None))
+
+        if len(pending) == 1:
+            get(next(iter(pending)))
+        elif pending:
+            with futures.ThreadPoolExecutor(
+                    max_workers=min(max_workers, len(pending)),
+                    thread_name_prefix='novaclient-hydrate') as executor:
+                list(executor.map(get, list(pending)))
+        return resources
+
+    @staticmethod
+    def _hydrate_one(resource, detail, request_ids):
+        resource.set_loaded(True)
+        if detail is not None and detail is not resource:
+            resource._add_details(detail._info)
+            resource.append_request_ids(request_ids)
+
+    def _findall_details(self, matches, list_kwargs, found):
+        """Get the details of the matches of a listing which is not detailed.
+
+        A single match is fetched, the details of several matches are taken
+        from one detailed listing with the same filters.
+        """
+        if len(matches) < 2:
+            details = [self.get(obj.id) for obj in matches]
+            for detail in details:
+                found.append_request_ids(detail.request_ids)
+            return details
+
+        listing = self.list(**dict(list_kwargs, detailed=True))
+        found.append_request_ids(listing.request_ids)
+        listed = dict((obj.id, obj) for obj in listing)
+        details = []
+        for obj in matches:
+            detail = listed.get(obj.id)
+            if detail is None:
+                # NOTE: the item changed between the two listings
+                detail = self.get(obj.id)
+                found.append_request_ids(detail.request_ids)
+            details.append(detail)
+        return details
+
+    def _findall_query(self, kwargs):
+        """Get the arguments of the listing of ``findall``.
+
+        :returns: the keyword arguments of ``list`` and the (attribute,
+                  value) pairs the items of the listing must match
+        """
         searches = kwargs.items()
 
-        detailed = True
         list_kwargs = {}
 
         list_argspec = reflection.get_callable_args(self.list)
         if 'detailed' in list_argspec:
-            detailed = ("human_id" not in kwargs and
-                        "name" not in kwargs and
-                        "display_name" not in kwargs)
-            list_kwargs['detailed'] = detailed
+            list_kwargs['detailed'] = ("human_id" not in kwargs and
+                                       "name" not in kwargs and
+                                       "display_name" not in kwargs)
 
         if 'is_public' in list_argspec and 'is_public' in kwargs:
             is_public = kwargs['is_public']
@@ -451,39 +1254,57 @@ class ManagerWithFind(Manager, metaclass=abc.ABCMeta):
             # volumes does not support regex while servers does. So when
             # doing findall on servers some client side filtering is still
             # needed.
+            search_opts = {}
             if "human_id" in kwargs:
-                list_kwargs['search_opts'] = {"name": kwargs["human_id"]}
+                search_opts["name"] = kwargs["human_id"]
             elif "name" in kwargs:
-                list_kwargs['search_opts'] = {"name": kwargs["name"]}
+                search_opts["name"] = kwargs["name"]
             elif "display_name" in kwargs:
-                list_kwargs['search_opts'] = {"name": kwargs["display_name"]}
+                search_opts["name"] = kwargs["display_name"]
             if "all_tenants" in kwargs:
-                all_tenants = kwargs['all_tenants']
-                list_kwargs['search_opts']['all_tenants'] = all_tenants
+                search_opts['all_tenants'] = kwargs['all_tenants']
                 searches = [(k, v) for k, v in searches if k != 'all_tenants']
             if "deleted" in kwargs:
-                deleted = kwargs['deleted']
-                list_kwargs['search_opts']['deleted'] = deleted
+                search_opts['deleted'] = kwargs['deleted']
                 searches = [(k, v) for k, v in searches if k != 'deleted']
+            searches = self._findall_pushdown(searches, search_opts)
+            if search_opts:
+                list_kwargs['search_opts'] = search_opts
 
-        listing = self.list(**list_kwargs)
-        found.append_request_ids(listing.request_ids)
+        return list_kwargs, list(searches)
+
+    def _findall_pushdown(self, searches, search_opts):
+        """Move the searches the API can filter into search_opts.
+
+        :returns: the searches left to match locally
+        """
+        left = []
+        for attr, value in searches:
+            opt, min_version, local_attr = self.findall_filters.get(
+                attr, (None, None, None))
+            # NOTE: the search options only take single values which are
+            # set, searches of dicts or lists, like a flavor, or of empty
+            # values are matched locally
+            if (opt is None or not value or
+                    not isinstance(value, (str, int)) or
+                    self.api_version < api_versions.APIVersion(min_version)):
+                left.append((attr, value))
+                continue
+            search_opts[opt] = value
+            if local_attr is not None:
+                left.append((local_attr, value))
+        return left
 
+    @staticmethod
+    def _findall_matches(listing, searches):
         for obj in listing:
             try:
                 if all(getattr(obj, attr) == value
                         for (attr, value) in searches):
-                    if detailed:
-                        found.append(obj)
-                    else:
-                        detail = self.get(obj.id)
-                        found.append(detail)
-                        found.append_request_ids(detail.request_ids)
+                    yield obj
             except AttributeError:
                 continue
 
-        return found
-
 
 class BootingManagerWithFind(ManagerWithFind):
     """Like a `ManagerWithFind`, but has the ability to boot servers."""
@@ -530,6 +1351,180 @@ class ListWithMeta(list, RequestIdMixin):
         self.append_request_ids(resp)
 
 
+def _lookup_path(info, path):
+    value = info
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return False, None
+        value = value[key]
+    return True, value
+
+
+def get_field(info, field):
+    """Get a field of the JSON data of a resource, or None.
+
+    Fields of nested dicts are selected with dotted paths, like
+    ``flavor.original_name``.
+    """
+    if field in info or '.' not in field:
+        return info.get(field)
+    return _lookup_path(info, field.split('.'))[1]
+
+
+def project_info(info, fields):
+    """Keep only some fields of the JSON data of a resource.
+
+    Fields of nested dicts are selected with dotted paths, like
+    ``flavor.original_name``, the nested dicts only keep the selected
+    fields then. The id is always kept.
+
+    :param info: dict of the resource
+    :param fields: the fields to keep
+    :returns: a new dict, sharing the kept values with ``info``
+    """
+    projected = {}
+    for field in fields:
+        if field in info:
+            projected[field] = info[field]
+            continue
+        path = field.split('.')
+        found, value = _lookup_path(info, path)
+        if not found or len(path) == 1:
+            continue
+        src, dst = info, projected
+        for key in path[:-1]:
+            src = src[key]
+            nested = dst.get(key)
+            if nested is src:
+                # the whole nested dict is kept already
+                break
+            if nested is None:
+                nested = dst[key] = {}
+            dst = nested
+        else:
+            dst[path[-1]] = value
+    if 'id' in info:
+        projected.setdefault('id', info['id'])
+    return projected
+
+
+def make_column(values):
+    """Pack the values of a column into the most compact sequence.
+
+    Columns of integers or floats are packed into a NumPy array when NumPy
+    is installed, or else into an :class:`array.array`. Other columns, and
+    the columns holding missing values, are lists.
+    """
+    types = set(type(v) for v in values)
+    if types == {int} or types == {float}:
+        if numpy is not None:
+            return numpy.asarray(values)
+        try:
+            return array.array('q' if types == {int} else 'd', values)
+        except OverflowError:
+            pass
+    return list(values)
+
+
+class ColumnarList(RequestIdMixin):
+    """Result of a listing as one column per field.
+
+    Only the requested fields of the listed items are kept, no resource is
+    built. Each column is packed with :func:`make_column`, ``columns`` maps
+    the fields to their column.
+
+    :param fields: the fields of the columns
+    :param resp: Response or list of Response objects
+    """
+
+    def __init__(self, fields=(), resp=None):
+        self.fields = list(fields)
+        self.columns = dict((f, []) for f in self.fields)
+        self._length = 0
+        self.request_ids_setup()
+        self.append_request_ids(resp)
+
+    @classmethod
+    def from_items(cls, items, fields=None, resp=None):
+        """Project the fields of the items, dicts, into columns.
+
+        All the fields of the items are kept if ``fields`` is None.
+        """
+        result = cls((), resp)
+        if fields is None:
+            fields = []
+            seen = set()
+            for item in items:
+                for field in item:
+                    if field not in seen:
+                        seen.add(field)
+                        fields.append(field)
+        result.fields = list(fields)
+        result.columns = dict(
+            (f, make_column([get_field(item, f) for item in items]))
+            for f in fields)
+        result._length = len(items)
+        return result
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def __repr__(self):
+        return "<ColumnarList fields=%s, length=%d>" % (
+            self.fields, self._length)
+
+    @classmethod
+    def concat(cls, parts):
+        """Join :class:`ColumnarList` parts, pages of a listing for example.
+
+        The request ids of the parts are kept.
+        """
+        fields = []
+        for part in parts:
+            fields.extend(f for f in part.fields if f not in fields)
+        result = cls(fields)
+        for field in fields:
+            columns = [part.columns.get(field) for part in parts]
+            columns = [[None] * len(part) if column is None else column
+                       for part, column in zip(parts, columns)]
+            kinds = set(getattr(c, 'typecode', getattr(c, 'dtype', None))
+                        for c in columns)
+            if len(kinds) == 1 and None not in kinds:
+                if numpy is not None and isinstance(columns[0],
+                                                    numpy.ndarray):
+                    result.columns[field] = numpy.concatenate(columns)
+                    continue
+                if isinstance(columns[0], array.array):
+                    column = array.array(columns[0].typecode)
+                    for c in columns:
+                        column.extend(c)
+                    result.columns[field] = column
+                    continue
+            result.columns[field] = make_column(
+                list(itertools.chain.from_iterable(columns)))
+        result._length = sum(len(part) for part in parts)
+        for part in parts:
+            result.append_request_ids(part.request_ids)
+        return result
+
+    def extend(self, other):
+        """Append the rows of another :class:`ColumnarList`."""
+        joined = ColumnarList.concat([self, other])
+        self.fields = joined.fields
+        self.columns = joined.columns
+        self._length = joined._length
+
+    def records(self, as_dict=False):
+        """Get the rows, as tuples ordered like the fields, or as dicts."""
+        rows = zip(*[self.columns[f] for f in self.fields])
+        if as_dict:
+            return [dict(zip(self.fields, row)) for row in rows]
+        return list(rows)
+
+
 class DictWithMeta(dict, RequestIdMixin):
     def __init__(self, values, resp):
         super(DictWithMeta, self).__init__(values)
@@ -562,3 +1557,21 @@ class BytesWithMeta(bytes, RequestIdMixin):
     def __init__(self, values, resp):
         self.request_ids_setup()
         self.append_request_ids(resp)
+
+
+class RawResponse(BytesWithMeta):
+    """Undecoded body of a response, with its status code and headers.
+
+    It can be forwarded as it is, or decoded with :meth:`json`.
+    """
+
+    def __new__(cls, resp):
+        return super(RawResponse, cls).__new__(cls, resp.content, resp)
+
+    def __init__(self, resp):
+        super(RawResponse, self).__init__(resp.content, resp)
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+
+    def json(self):
+        return json.loads(self)
@@ -20,8 +20,10 @@
 OpenStack Client interface. Handles the REST calls and responses.
 """
 
+import contextlib
 import itertools
 import pkgutil
+import threading
 import warnings
 
 from keystoneauth1 import adapter
@@ -57,8 +59,37 @@ class SessionClient(adapter.LegacyJsonAdapter):
 
         api_versions.check_version(self.api_version)
 
+        self._thread_state = threading.local()
         super(SessionClient, self).__init__(*args, **kwargs)
 
+    def _get_thread_state(self):
+        # NOTE: subclasses used as fakes do not always call __init__
+        return self.__dict__.setdefault('_thread_state', threading.local())
+
+    @property
+    def service_type(self):
+        return (getattr(self._get_thread_state(), 'service_type', None) or
+                self._service_type)
+
+    @service_type.setter
+    def service_type(self, value):
+        self._service_type = value
+
+    @contextlib.contextmanager
+    def alternate_service_type(self, service_type):
+        """Use another service type for the requests of the current thread.
+
+        The service type of the client is left untouched, so other threads
+        sharing the client keep talking to their own service.
+        """
+        state = self._get_thread_state()
+        original_service_type = getattr(state, 'service_type', None)
+        state.service_type = service_type
+        try:
+            yield
+        finally:
+            state.service_type = original_service_type
+
     def request(self, url, method, **kwargs):
         kwargs.setdefault('headers', kwargs.get('headers', {}))
         api_versions.update_headers(kwargs["headers"], self.api_version)
@@ -71,20 +102,36 @@ class SessionClient(adapter.LegacyJsonAdapter):
         # NOTE(jamielennox): The standard call raises errors from
         # keystoneauth1, where we need to raise the novaclient errors.
         raise_exc = kwargs.pop('raise_exc', True)
+        # NOTE: with decode=False the body is not decoded, the caller reads
+        # the content of the response itself.
+        decode = kwargs.pop('decode', True)
         with utils.record_time(self.times, self.timings, method, url):
-            resp, body = super(SessionClient, self).request(url,
-                                                            method,
-                                                            raise_exc=False,
-                                                            **kwargs)
+            if decode:
+                resp, body = super(SessionClient, self).request(
+                    url, method, raise_exc=False, **kwargs)
+            else:
+                resp, body = self._request_raw(url, method, **kwargs), None
 
         # TODO(andreykurilin): uncomment this line, when we will be able to
         #   check only nova-related calls
         # api_versions.check_headers(resp, self.api_version)
         if raise_exc and resp.status_code >= 400:
+            if not decode:
+                try:
+                    body = resp.json()
+                except ValueError:
+                    pass
             raise exceptions.from_response(resp, body, url, method)
 
         return resp, body
 
+    def _request_raw(self, url, method, **kwargs):
+        # Like LegacyJsonAdapter.request, without decoding the response.
+        kwargs['headers'].setdefault('Accept', 'application/json')
+        if 'body' in kwargs:
+            kwargs['json'] = kwargs.pop('body')
+        return self._request(url, method, raise_exc=False, **kwargs)
+
     def get_timings(self):
         return self.times
 
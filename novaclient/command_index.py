@@ -0,0 +1,222 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Index of the shell subcommands, their options and help, by API version.
+
+Building the parsers of the shell requires the action module of the API,
+``novaclient.v2.shell``, which is large. The index holds what ``nova help``
+and ``nova bash-completion`` need, so they are served without importing it.
+It is generated by ``tools/generate_command_index.py`` and shipped as
+``novaclient/v<major>/command_index.json``. An index of another format, or
+of another maximum API version than the client, is ignored.
+"""
+
+import argparse
+import json
+import os
+
+import novaclient
+from novaclient import api_versions
+
+# Version of the format of the index, increased on incompatible changes
+INDEX_FORMAT = 1
+
+
+def get_index_path(major):
+    """Get the path of the index of a major API version."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'v%s' % major, 'command_index.json')
+
+
+class CommandIndex(object):
+    """Subcommands of a major API version, by range of microversions.
+
+    :param data: the decoded index, see :func:`build_index`
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._ranges = {}
+
+    def _matches(self, variant, version):
+        key = (variant['start'], variant['end'])
+        versions = self._ranges.get(key)
+        if versions is None:
+            versions = self._ranges[key] = (
+                api_versions.APIVersion(variant['start']),
+                api_versions.APIVersion(variant['end']))
+        return version.matches(*versions)
+
+    def get(self, command, version):
+        """Get a subcommand supported by an API version, or None.
+
+        :returns: dict with the ``description`` and the ``arguments`` of
+                  the subcommand, and ``hint`` when the help hint for the
+                  latest version applies to it
+        """
+        for variant in self.data['commands'].get(command, ()):
+            if self._matches(variant, version):
+                return variant
+        return None
+
+    def commands(self, version):
+        """Get the subcommands supported by an API version, in help order.
+
+        :returns: list of (name, variant) pairs, see :meth:`get`
+        """
+        commands = []
+        for command in self.data['commands']:
+            variant = self.get(command, version)
+            if variant is not None:
+                commands.append((command, variant))
+        return commands
+
+    def options(self, version):
+        """Get the option strings of the subcommands of an API version."""
+        options = set()
+        for _command, variant in self.commands(version):
+            for argument in variant['arguments']:
+                options.update(argument['option_strings'])
+        return options
+
+
+def load_index(major, path=None):
+    """Load the index of a major API version.
+
+    :returns: :class:`CommandIndex`, or None if the index is missing or
+              doesn't match the client
+    """
+    try:
+        with open(path or get_index_path(major)) as f:
+            data = json.load(f)
+    except (IOError, ValueError):
+        return None
+    if (not isinstance(data, dict) or
+            data.get('format') != INDEX_FORMAT or
+            data.get('api_max_version') !=
+            novaclient.API_MAX_VERSION.get_string()):
+        return None
+    return CommandIndex(data)
+
+
+def _argument_spec(action, parser, groups):
+    spec = {
+        'option_strings': list(action.option_strings),
+        'dest': action.dest,
+    }
+    if action.help is not None:
+        help = action.help
+        if help != argparse.SUPPRESS:
+            # NOTE: expand the help like the help formatter, and escape it
+            # for the one which formats the rebuilt parser.
+            formatter = parser._get_formatter()
+            help = formatter._expand_help(action).replace('%', '%%')
+        spec['help'] = help
+    if isinstance(action, argparse._HelpAction):
+        spec['action'] = 'help'
+    elif action.nargs == 0:
+        spec['action'] = 'store_true'
+    else:
+        if action.nargs is not None:
+            spec['nargs'] = action.nargs
+        if action.metavar is not None:
+            spec['metavar'] = (list(action.metavar)
+                               if isinstance(action.metavar, tuple)
+                               else action.metavar)
+        if action.choices is not None:
+            spec['choices'] = [str(choice) for choice in action.choices]
+    if action.option_strings and action.required:
+        spec['required'] = True
+    for i, group in enumerate(parser._mutually_exclusive_groups):
+        if action in group._group_actions:
+            spec['group'] = i
+            groups[i] = group.required
+    return spec
+
+
+def _command_variant(parser, description):
+    groups = {}
+    arguments = [_argument_spec(action, parser, groups)
+                 for action in parser._actions]
+    variant = {'description': description, 'arguments': arguments}
+    if groups:
+        variant['groups'] = [groups[i] for i in sorted(groups)]
+    return variant
+
+
+def build_index(major=2):
+    """Build the index of a major API version from the shell.
+
+    The subcommands are indexed for each microversion supported by the
+    client, and for the latest one. The consecutive microversions for which
+    a subcommand is the same are merged into ranges.
+
+    :returns: dict, see :class:`CommandIndex`
+    """
+    # NOTE: the shell loads the index, import it late
+    from novaclient import shell
+
+    max_minor = novaclient.API_MAX_VERSION.ver_minor
+    versions = [api_versions.APIVersion('%s.%s' % (major, minor))
+                for minor in range(max_minor + 1)]
+    versions.append(api_versions.APIVersion('%s.latest' % major))
+
+    commands = {}
+    own_commands = set()
+    previous = None
+    for version in versions:
+        nova = shell.OpenStackComputeShell()
+        nova.extensions = []
+        nova.get_subcommand_parser(version, do_help=True, argv=[])
+        own_commands.update(name for name, _callback, _desc
+                            in nova._find_commands(nova, version, True))
+        for name, (_callback, desc) in nova.commands.items():
+            hint = (version.is_latest() and
+                    desc.endswith(shell.HINT_HELP_MSG))
+            if hint:
+                desc = desc[:-len(shell.HINT_HELP_MSG)]
+            variant = _command_variant(nova.subcommands[name], desc)
+            variants = commands.setdefault(name, [])
+            last = variants[-1] if variants else None
+            if (last is not None and last['end'] == previous and
+                    last['description'] == variant['description'] and
+                    last['arguments'] == variant['arguments'] and
+                    last.get('groups') == variant.get('groups')):
+                last['end'] = version.get_string()
+            else:
+                variant['start'] = variant['end'] = version.get_string()
+                variants.append(variant)
+            if hint:
+                variants[-1]['hint'] = True
+        previous = version.get_string()
+
+    # list the subcommands in the order of the shell, the ones of the action
+    # module first, sorted by their function
+    def order(name):
+        return (name in own_commands, name.replace('-', '_'))
+
+    return {
+        'format': INDEX_FORMAT,
+        'api_max_version': novaclient.API_MAX_VERSION.get_string(),
+        'commands': dict((name, commands[name])
+                         for name in sorted(commands, key=order)),
+    }
+
+
+def write_index(major=2, path=None):
+    """Build the index of a major API version and write it."""
+    data = build_index(major)
+    with open(path or get_index_path(major), 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=False)
+        f.write('\n')
+    return data
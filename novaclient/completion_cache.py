@@ -0,0 +1,173 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Completion cache for bash autocompletion.
+
+The cache stores items that can be used for bash autocompletion, like UUIDs
+or human-friendly IDs, in one file per resource and cache type. It is
+disabled by default and enabled by passing ``completion_cache=True`` to the
+client.
+"""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+
+from oslo_utils import importutils
+
+from novaclient import utils
+
+fcntl = importutils.try_import('fcntl')
+
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def get_cache_dir():
+    """Returns the cache directory of the current user and endpoint."""
+    base_dir = utils.env('NOVACLIENT_UUID_CACHE_DIR', default="~/.novaclient")
+
+    # NOTE(sirp): Keep separate UUID caches for each username +
+    # endpoint pair
+    username = utils.env('OS_USERNAME', 'NOVA_USERNAME')
+    url = utils.env('OS_URL', 'NOVA_URL')
+    uniqifier = hashlib.sha256(username.encode('utf-8') +
+                               url.encode('utf-8')).hexdigest()
+
+    return os.path.expanduser(os.path.join(base_dir, uniqifier))
+
+
+@contextlib.contextmanager
+def _interprocess_lock(path):
+    """Serialise the updates of a cache file between processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class CompletionCache(object):
+    """Bounded completion cache written from a background thread.
+
+    Writes are queued and coalesced per file: a listing replaces whatever is
+    still pending for its file, a create appends to it. A writer thread is
+    started when there is something to write and exits once the queue is
+    drained. Each file is rewritten through a temporary file and an atomic
+    rename while holding an inter-process lock, so concurrent processes
+    never observe partial files nor lose each other's appends.
+
+    :param cache_dir: directory holding the cache files. Defaults to a
+        directory per username + endpoint pair under
+        ``env[NOVACLIENT_UUID_CACHE_DIR]`` or ``~/.novaclient``.
+    :param max_entries: maximum number of entries kept in a cache file. The
+        most recent entries are kept.
+    """
+
+    def __init__(self, cache_dir=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir or get_cache_dir()
+        self.max_entries = max_entries
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._writer = None
+
+    def get_path(self, resource, cache_type):
+        filename = "%s-%s-cache" % (resource, cache_type.replace('_', '-'))
+        return os.path.join(self.cache_dir, filename)
+
+    def write(self, resource, cache_type, values, replace=False):
+        """Queue values to be written to a cache file.
+
+        :param resource: lower case name of the resource class
+        :param cache_type: 'uuid' or 'human_id'
+        :param values: iterable of values to write
+        :param replace: replace the content of the file instead of
+            appending to it
+        """
+        path = self.get_path(resource, cache_type)
+        values = [str(v) for v in values if v is not None]
+        with self._cond:
+            if not replace and path in self._pending:
+                replace, pending = self._pending[path]
+                values = pending + values
+            self._pending[path] = (replace, values[-self.max_entries:])
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._run, name='novaclient-completion-cache')
+                self._writer.start()
+
+    def flush(self, timeout=None):
+        """Wait for the queued values to be written.
+
+        :returns: True if everything was written before the timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._writer is None, timeout)
+
+    def read(self, resource, cache_type):
+        """Returns the entries of a cache file."""
+        try:
+            with open(self.get_path(resource, cache_type)) as f:
+                return [line.rstrip('\n') for line in f if line.strip()]
+        except IOError:
+            return []
+
+    def _run(self):
+        while True:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+                if not pending:
+                    self._writer = None
+                    self._cond.notify_all()
+                    return
+            for path, (replace, values) in pending.items():
+                try:
+                    self._write_file(path, replace, values)
+                except (IOError, OSError):
+                    # NOTE(kiall): This is typically a permission denied
+                    #              while attempting to write the cache file.
+                    #              Don't fail.
+                    pass
+
+    def _write_file(self, path, replace, values):
+        cache_dir, filename = os.path.split(path)
+        os.makedirs(cache_dir, 0o755, exist_ok=True)
+
+        with _interprocess_lock(path + '.lock'):
+            entries = []
+            if not replace:
+                try:
+                    with open(path) as f:
+                        entries = [line.rstrip('\n') for line in f
+                                   if line.strip()]
+                except IOError:
+                    pass
+            entries.extend(values)
+            # keep the most recent occurrence of each entry
+            entries = list(reversed(dict.fromkeys(reversed(entries))))
+            entries = entries[-self.max_entries:]
+
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir,
+                                            prefix='.%s.' % filename)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.writelines("%s\n" % entry for entry in entries)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
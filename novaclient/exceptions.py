@@ -86,6 +86,21 @@ class InstanceInDeletedState(Exception):
     pass
 
 
+class LazyLoadForbidden(Exception):
+    """An attribute of a resource which is not loaded was accessed while
+    the lazy loading of the resources is forbidden.
+    """
+
+    def __init__(self, obj, attr):
+        self.obj = obj
+        self.attr = attr
+        self.message = ("Accessing '%s' would lazy-load %s %s, load its "
+                        "details explicitly" % (
+                            attr, obj.__class__.__name__,
+                            obj._info.get('id')))
+        super(LazyLoadForbidden, self).__init__(self.message)
+
+
 class ClientException(Exception):
     """
     The base exception class for all exceptions this library raises.
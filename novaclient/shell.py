@@ -19,6 +19,7 @@ Command-line interface to the OpenStack Nova API.
 """
 
 import argparse
+import difflib
 import logging
 import os
 import sys
@@ -31,6 +32,7 @@ from oslo_utils import strutils
 import novaclient
 from novaclient import api_versions
 from novaclient import client
+from novaclient import command_index
 from novaclient import exceptions as exc
 import novaclient.extension
 from novaclient.i18n import _
@@ -50,6 +52,9 @@ DEFAULT_NOVA_SERVICE_TYPE = "compute"
 HINT_HELP_MSG = (" [hint: use '--os-compute-api-version' flag to show help "
                  "message for proper version]")
 
+# Subcommands served from the command index, see novaclient.command_index
+INDEXED_COMMANDS = ('help', 'bash-completion', 'bash_completion')
+
 logger = logging.getLogger(__name__)
 
 
@@ -247,6 +252,7 @@ class OpenStackComputeShell(object):
 
     def __init__(self):
         self.client_logger = None
+        self._command_index = None
 
     def _append_global_identity_args(self, parser, argv):
         # Register the CLI arguments that have moved to the session object.
@@ -390,25 +396,131 @@ class OpenStackComputeShell(object):
 
         return parser
 
-    def get_subcommand_parser(self, version, do_help=False, argv=None):
+    def get_subcommand_parser(self, version, do_help=False, argv=None,
+                              command=None):
+        """Build the parser of the subcommands.
+
+        The index of the subcommands, ``commands``, maps their names to
+        their callback and description. Building the parser of a subcommand
+        is much more expensive than indexing it, so with ``command`` only
+        the parser of that subcommand is built, the others are built on
+        demand by :meth:`get_subcommand`. They are all listed in the help
+        either way.
+
+        The help and bash-completion subcommands are served from the
+        generated index of the subcommands, see
+        :mod:`novaclient.command_index`, without importing the action
+        module, unless extensions are loaded.
+
+        :param command: name of the only subcommand to build (optional).
+                        All of them are built by default, or when it is not
+                        a known subcommand.
+        """
         parser = self.get_base_parser(argv)
 
         self.subcommands = {}
+        self.commands = {}
         subparsers = parser.add_subparsers(metavar='<subcommand>')
-
-        actions_module = importutils.import_module(
-            "novaclient.v%s.shell" % version.ver_major)
-
-        self._find_actions(subparsers, actions_module, version, do_help)
-        self._find_actions(subparsers, self, version, do_help)
-
-        for extension in self.extensions:
-            self._find_actions(subparsers, extension.module, version, do_help)
+        self._subparsers = subparsers
+        self._subcommand_version = version
+        self._subcommand_do_help = do_help
+
+        self._command_index = None
+        if command in INDEXED_COMMANDS and not self.extensions:
+            self._command_index = command_index.load_index(version.ver_major)
+        if self._command_index is not None:
+            # NOTE: the subcommands which are not the ones of the shell are
+            # built from the index, without importing their module.
+            for name, variant in self._command_index.commands(version):
+                self.commands[name] = (
+                    None, self._get_indexed_description(variant, version))
+            modules = [self]
+        else:
+            modules = [importutils.import_module(
+                "novaclient.v%s.shell" % version.ver_major), self]
+            modules.extend(extension.module for extension in self.extensions)
+        for module in modules:
+            for name, callback, desc in self._find_commands(
+                    module, version, do_help):
+                self.commands[name] = (callback, desc)
+        if command not in self.commands and command != 'bash_completion':
+            command = None
+
+        for name, (callback, desc) in self.commands.items():
+            # NOTE: list the subcommand in the help without building its
+            # parser.
+            subparsers._choices_actions.append(
+                subparsers._ChoicesPseudoAction(name, (), desc.strip()))
+        if command is None:
+            for name in self.commands:
+                self.get_subcommand(name)
+        else:
+            self.get_subcommand(command)
 
         self._add_bash_completion_subparser(subparsers)
 
         return parser
 
+    def get_subcommand(self, command):
+        """Get the parser of a subcommand, or None if it is unknown.
+
+        The parser is built on first use, see :meth:`get_subcommand_parser`.
+        """
+        subparser = self.subcommands.get(command)
+        if subparser is None and command in self.commands:
+            callback, desc = self.commands[command]
+            if callback is None:
+                variant = self._command_index.get(command,
+                                                  self._subcommand_version)
+                subparser = self._add_indexed_subparser(
+                    self._subparsers, command, variant, desc)
+            else:
+                subparser = self._add_subparser(
+                    self._subparsers, command, callback, desc,
+                    self._subcommand_version, self._subcommand_do_help)
+        return subparser
+
+    @staticmethod
+    def _get_indexed_description(variant, version):
+        desc = variant['description']
+        if variant.get('hint') and version.is_latest():
+            desc += HINT_HELP_MSG
+        return desc
+
+    def _add_indexed_subparser(self, subparsers, command, variant, desc):
+        """Build the parser of a subcommand from the index, for its help."""
+        subparser = subparsers.add_parser(
+            command,
+            description=desc,
+            add_help=False,
+            formatter_class=OpenStackHelpFormatter)
+        groups = [subparser.add_mutually_exclusive_group(required=required)
+                  for required in variant.get('groups', ())]
+        for spec in variant['arguments']:
+            kwargs = dict((key, spec[key])
+                          for key in ('action', 'help', 'nargs', 'choices',
+                                      'required')
+                          if key in spec)
+            if kwargs.get('help') == argparse.SUPPRESS:
+                # NOTE: argparse tests the identity of SUPPRESS
+                kwargs['help'] = argparse.SUPPRESS
+            metavar = spec.get('metavar')
+            if metavar is not None:
+                kwargs['metavar'] = (tuple(metavar)
+                                     if isinstance(metavar, list)
+                                     else metavar)
+            target = subparser
+            if 'group' in spec:
+                target = groups[spec['group']]
+            if not spec['option_strings']:
+                target.add_argument(spec['dest'], **kwargs)
+                continue
+            if spec.get('action') != 'help':
+                kwargs['dest'] = spec['dest']
+            target.add_argument(*spec['option_strings'], **kwargs)
+        self.subcommands[command] = subparser
+        return subparser
+
     def _add_bash_completion_subparser(self, subparsers):
         subparser = subparsers.add_parser(
             'bash_completion',
@@ -419,7 +531,18 @@ class OpenStackComputeShell(object):
         subparser.set_defaults(func=self.do_bash_completion)
 
     def _find_actions(self, subparsers, actions_module, version, do_help):
+        for command, callback, desc in self._find_commands(
+                actions_module, version, do_help):
+            self._add_subparser(subparsers, command, callback, desc,
+                                version, do_help, help=desc.strip())
+
+    def _find_commands(self, actions_module, version, do_help):
+        """Get the subcommands of a module supported by an API version.
+
+        :returns: list of (command, callback, description) tuples
+        """
         msg = _(" (Supported by API versions '%(start)s' - '%(end)s')")
+        commands = []
         for attr in (a for a in dir(actions_module) if a.startswith('do_')):
             # I prefer to be hyphen-separated instead of underscores.
             command = attr[3:].replace('_', '-')
@@ -445,54 +568,62 @@ class OpenStackComputeShell(object):
                     continue
                 desc = callback.__doc__ or desc
                 desc += additional_msg
+            commands.append((command, callback, desc))
+        return commands
 
-            action_help = desc.strip()
-            arguments = getattr(callback, 'arguments', [])
-            groups = {}
-
-            subparser = subparsers.add_parser(
-                command,
-                help=action_help,
-                description=desc,
-                add_help=False,
-                formatter_class=OpenStackHelpFormatter)
-            subparser.add_argument(
-                '-h', '--help',
-                action='help',
-                help=argparse.SUPPRESS,
-            )
-            self.subcommands[command] = subparser
-            for (args, kwargs) in arguments:
-                kwargs = kwargs.copy()
-
-                start_version = kwargs.pop("start_version", None)
-                end_version = kwargs.pop("end_version", None)
-                group = kwargs.pop("group", None)
-
-                if start_version:
-                    start_version = api_versions.APIVersion(start_version)
-                    if end_version:
-                        end_version = api_versions.APIVersion(end_version)
-                    else:
-                        end_version = api_versions.APIVersion(
-                            "%s.latest" % start_version.ver_major)
-                    if do_help:
-                        kwargs["help"] = kwargs.get("help", "") + (msg % {
-                            "start": start_version.get_string(),
-                            "end": end_version.get_string()})
-                    if not version.matches(start_version, end_version):
-                        continue
-
-                if group:
-                    if group not in groups:
-                        groups[group] = (
-                            subparser.add_mutually_exclusive_group()
-                        )
-                    kwargs['dest'] = kwargs.get('dest', group)
-                    groups[group].add_argument(*args, **kwargs)
+    def _add_subparser(self, subparsers, command, callback, desc, version,
+                       do_help, help=None):
+        msg = _(" (Supported by API versions '%(start)s' - '%(end)s')")
+        arguments = getattr(callback, 'arguments', [])
+        groups = {}
+
+        parser_kwargs = {}
+        if help is not None:
+            parser_kwargs['help'] = help
+        subparser = subparsers.add_parser(
+            command,
+            description=desc,
+            add_help=False,
+            formatter_class=OpenStackHelpFormatter,
+            **parser_kwargs)
+        subparser.add_argument(
+            '-h', '--help',
+            action='help',
+            help=argparse.SUPPRESS,
+        )
+        self.subcommands[command] = subparser
+        for (args, kwargs) in arguments:
+            kwargs = kwargs.copy()
+
+            start_version = kwargs.pop("start_version", None)
+            end_version = kwargs.pop("end_version", None)
+            group = kwargs.pop("group", None)
+
+            if start_version:
+                start_version = api_versions.APIVersion(start_version)
+                if end_version:
+                    end_version = api_versions.APIVersion(end_version)
                 else:
-                    subparser.add_argument(*args, **kwargs)
-            subparser.set_defaults(func=callback)
+                    end_version = api_versions.APIVersion(
+                        "%s.latest" % start_version.ver_major)
+                if do_help:
+                    kwargs["help"] = kwargs.get("help", "") + (msg % {
+                        "start": start_version.get_string(),
+                        "end": end_version.get_string()})
+                if not version.matches(start_version, end_version):
+                    continue
+
+            if group:
+                if group not in groups:
+                    groups[group] = (
+                        subparser.add_mutually_exclusive_group()
+                    )
+                kwargs['dest'] = kwargs.get('dest', group)
+                groups[group].add_argument(*args, **kwargs)
+            else:
+                subparser.add_argument(*args, **kwargs)
+        subparser.set_defaults(func=callback)
+        return subparser
 
     def setup_debugging(self, debug):
         if not debug:
@@ -697,14 +828,20 @@ class OpenStackComputeShell(object):
         self.extensions = client.discover_extensions(api_version)
         self._run_extension_hooks('__pre_parse_args__')
 
+        # only build the parser of the requested subcommand, the parsers
+        # of the other ones are built on demand
+        command = args_list[0] if args_list else 'help'
         subcommand_parser = self.get_subcommand_parser(
-            api_version, do_help=do_help, argv=argv)
+            api_version, do_help=do_help, argv=argv, command=command)
         self.parser = subcommand_parser
 
         if args.help or not argv:
             subcommand_parser.print_help()
             return 0
 
+        if command not in self.subcommands and not command.startswith('-'):
+            self._invalid_subcommand(subcommand_parser, command)
+
         args = subcommand_parser.parse_args(argv)
         self._run_extension_hooks('__post_parse_args__', args)
 
@@ -755,6 +892,14 @@ class OpenStackComputeShell(object):
         if args.timings:
             self._dump_timings(self.times + self.cs.get_timings())
 
+    def _invalid_subcommand(self, parser, command):
+        message = _("argument <subcommand>: invalid choice: '%s'") % command
+        matches = difflib.get_close_matches(command, self.commands)
+        if matches:
+            message += _(", did you mean %s?") % ", ".join(
+                "'%s'" % match for match in matches)
+        parser.error(message)
+
     def _dump_timings(self, timings):
         class Tyme(object):
             def __init__(self, url, seconds):
@@ -777,15 +922,21 @@ class OpenStackComputeShell(object):
         Prints all of the commands and options to stdout so that the
         nova.bash_completion script doesn't have to hard code them.
         """
-        commands = set()
-        options = set()
-        for sc_str, sc in self.subcommands.items():
-            commands.add(sc_str)
-            for option in sc._optionals._option_string_actions.keys():
-                options.add(option)
-
-        commands.remove('bash-completion')
-        commands.remove('bash_completion')
+        if self._command_index is not None:
+            commands = set(self.commands)
+            options = self._command_index.options(self._subcommand_version)
+        else:
+            commands = set()
+            options = set()
+            for command in self.commands:
+                self.get_subcommand(command)
+            for sc_str, sc in self.subcommands.items():
+                commands.add(sc_str)
+                for option in sc._optionals._option_string_actions.keys():
+                    options.add(option)
+
+        commands.discard('bash-completion')
+        commands.discard('bash_completion')
         print(' '.join(commands | options))
 
     @utils.arg(
@@ -798,8 +949,9 @@ class OpenStackComputeShell(object):
         Display help about this program or one of its subcommands.
         """
         if args.command:
-            if args.command in self.subcommands:
-                self.subcommands[args.command].print_help()
+            subparser = self.get_subcommand(args.command)
+            if subparser is not None:
+                subparser.print_help()
             else:
                 raise exc.CommandError(_("'%s' is not a valid subcommand") %
                                        args.command)
@@ -160,12 +160,16 @@ class Base(base.Fixture):
 
         self.requests_mock.get(
             self.url('detail', marker=self.server_1234["id"]),
-            json={"servers": [self.server_1234, self.server_5678]},
+            json={"servers": [self.server_1234, self.server_5678],
+                  "servers_links": [{
+                      "rel": "next",
+                      "href": self.url('detail',
+                                       marker=self.server_5678["id"])}]},
             headers=self.json_headers, complete_qs=True)
 
         self.requests_mock.get(
             self.url('detail', marker=self.server_5678["id"]),
-            json={"servers": []},
+            json={"servers": [self.server_9012]},
             headers=self.json_headers, complete_qs=True)
 
         self.server_1235 = self.server_1234.copy()
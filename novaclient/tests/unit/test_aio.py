@@ -0,0 +1,196 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import asyncio
+import threading
+from unittest import mock
+
+from novaclient import aio
+from novaclient import api_versions
+from novaclient import base
+from novaclient import exceptions
+from novaclient.tests.unit import utils
+from novaclient.tests.unit.v2 import fakes
+from novaclient.v2 import flavors
+from novaclient.v2 import servers
+
+
+class AsyncClientTest(utils.TestCase):
+
+    def setUp(self):
+        super(AsyncClientTest, self).setUp()
+        self.sync_cs = fakes.FakeClient(api_versions.APIVersion("2.1"))
+        self.cs = aio.AsyncClient(self.sync_cs, max_workers=4)
+        self.addCleanup(self.cs.close)
+
+    def _run(self, coro):
+        return asyncio.run(coro)
+
+    def test_get(self):
+        server = self._run(self.cs.servers.get(1234))
+        self.assertIsInstance(server, servers.Server)
+        self.sync_cs.assert_called('GET', '/servers/1234')
+
+    def test_request_ids(self):
+        fl = self._run(self.cs.flavors.list())
+        self.assertEqual(fakes.FAKE_REQUEST_ID_LIST, fl.request_ids)
+
+    def test_list(self):
+        sl = self._run(self.cs.servers.list())
+        self.sync_cs.assert_called('GET', '/servers/detail')
+        for s in sl:
+            self.assertIsInstance(s, servers.Server)
+
+    def test_iter_list(self):
+        async def collect():
+            return [f async for f in self.cs.flavors.iter_list()]
+
+        fl = self._run(collect())
+        self.sync_cs.assert_called('GET', '/flavors/detail')
+        self.assertEqual(3, len(fl))
+        for f in fl:
+            self.assertIsInstance(f, flavors.Flavor)
+
+    def test_iter_methods_step_on_executor(self):
+        fetch_threads = []
+        paginate = self.sync_cs.servers._paginate
+
+        def pages(*args, **kwargs):
+            for page in paginate(*args, **kwargs):
+                fetch_threads.append(threading.current_thread())
+                yield page
+
+        async def collect():
+            self.assertEqual([], fetch_threads)
+            pages = [p async for p in self.cs.servers.iter_pages()]
+            items = [s async for s in self.cs.servers.iter_all()]
+            return pages, items
+
+        with mock.patch.object(self.sync_cs.servers, '_paginate', pages):
+            pages, items = self._run(collect())
+        self.assertEqual(1, len(pages))
+        self.assertEqual([s.id for s in pages[0]], [s.id for s in items])
+        for s in items:
+            self.assertIsInstance(s, servers.Server)
+        # every page is fetched on the executor, not on the event loop
+        self.assertEqual(2, len(fetch_threads))
+        self.assertNotIn(threading.main_thread(), fetch_threads)
+
+    def test_cancelled_iteration_closes_pages(self):
+        fetching = threading.Event()
+        release = threading.Event()
+        closed = threading.Event()
+
+        generators = []
+
+        def pages():
+            try:
+                yield ['a']
+                fetching.set()
+                release.wait(5)
+                yield ['b']
+            finally:
+                closed.set()
+
+        def iter_pages():
+            # NOTE: held here, so the generator is not closed by its
+            # garbage collection
+            generators.append(pages())
+            return generators[-1]
+
+        async def consume(items):
+            async for page in self.cs.servers.iter_pages():
+                items.extend(page)
+
+        async def cancel():
+            items = []
+            task = asyncio.ensure_future(consume(items))
+            loop = asyncio.get_running_loop()
+            self.assertTrue(await loop.run_in_executor(None, fetching.wait,
+                                                       5))
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return items
+
+        with mock.patch.object(self.sync_cs.servers, 'iter_pages',
+                               iter_pages):
+            self.assertEqual(['a'], self._run(cancel()))
+        # the pages are closed once the pending step returns
+        self.assertFalse(closed.is_set())
+        release.set()
+        self.assertTrue(closed.wait(5))
+
+    def test_concurrent_calls(self):
+        async def gather():
+            return await asyncio.gather(self.cs.servers.get(1234),
+                                        self.cs.servers.get(5678),
+                                        self.cs.flavors.get(1))
+
+        s1, s2, f1 = self._run(gather())
+        self.assertEqual('1234', s1.id)
+        self.assertEqual('5678', s2.id)
+        self.assertEqual(1, f1.id)
+
+    def test_errors_are_mapped(self):
+        self.assertRaises(exceptions.NotFound, self._run,
+                          self.cs.flavors.get('512 MiB Server'))
+
+    def test_versioned_dispatch(self):
+        self.assertRaises(exceptions.VersionNotFoundForAPIMethod,
+                          self._run, self.cs.servers.topology(1234))
+        self.cs.api_version = api_versions.APIVersion("2.78")
+        self.assertEqual(api_versions.APIVersion("2.78"),
+                         self.sync_cs.api_version)
+        self._run(self.cs.servers.topology(1234))
+        self.sync_cs.assert_called('GET', '/servers/1234/topology')
+
+    def test_other_managers_are_wrapped_on_access(self):
+        self.assertIsInstance(self.cs.keypairs, aio.AsyncManager)
+        self.assertIs(self.cs.keypairs, self.cs.keypairs)
+        self.assertIs(self.sync_cs.keypairs, self.cs.keypairs.manager)
+        self.assertEqual(self.sync_cs.project_id, self.cs.project_id)
+
+    def test_context_manager_closes_owned_executor(self):
+        async def use():
+            async with self.cs as cs:
+                await cs.servers.get(1234)
+
+        with mock.patch.object(self.cs.executor, 'shutdown') as shutdown:
+            self._run(use())
+        shutdown.assert_called_once_with(wait=False)
+
+    def test_external_executor_is_not_closed(self):
+        executor = mock.Mock()
+        cs = aio.AsyncClient(self.sync_cs, executor=executor)
+        cs.close()
+        self.assertFalse(executor.shutdown.called)
+
+    @mock.patch('novaclient.client.Client')
+    def test_client_factory(self, mock_client):
+        cs = aio.Client('2.1', session=mock.sentinel.session)
+        self.addCleanup(cs.close)
+        mock_client.assert_called_once_with(
+            '2.1', username=None, password=None, project_id=None,
+            auth_url=None, session=mock.sentinel.session,
+            lazy_load=base.LAZY_LOAD_RAISE)
+        self.assertIs(mock_client.return_value, cs.client)
+
+    def test_lazy_load_does_not_block(self):
+        self.sync_cs.lazy_load = base.LAZY_LOAD_RAISE
+        server = servers.Server(self.sync_cs.servers, {'id': 1234})
+        self.assertRaises(exceptions.LazyLoadForbidden, getattr, server,
+                          'status')
+        self.assertEqual([], self.sync_cs.client.callstack)
+        # the methods of the resources are run on the executor
+        self._run(self.cs.run(server.reboot))
+        self.sync_cs.assert_called('POST', '/servers/%s/action' % server.id)
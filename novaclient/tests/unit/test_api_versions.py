@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+import pickle
 from unittest import mock
 
 import novaclient
@@ -93,6 +95,39 @@ class APIVersionTestCase(utils.TestCase):
         self.assertTrue(v_null.__eq__(v_null))
         self.assertRaises(TypeError, v1.__le__, "2.1")
 
+    def test_versions_are_interned(self):
+        self.assertIs(api_versions.APIVersion("2.47"),
+                      api_versions.APIVersion("2.47"))
+        self.assertIs(api_versions.V2_47, api_versions.APIVersion("2.47"))
+        self.assertIs(api_versions.APIVersion(), api_versions.APIVersion())
+
+    def test_version_is_immutable(self):
+        v = api_versions.APIVersion("2.5")
+        self.assertRaises(AttributeError, setattr, v, "ver_minor", 6)
+        self.assertRaises(AttributeError, setattr, v, "other", 6)
+        self.assertRaises(AttributeError, delattr, v, "ver_minor")
+        self.assertEqual(5, api_versions.APIVersion("2.5").ver_minor)
+
+    def test_version_is_hashable(self):
+        versions = {api_versions.APIVersion("2.5"): "a",
+                    api_versions.APIVersion("2.latest"): "b",
+                    api_versions.APIVersion(): "c"}
+        self.assertEqual("a", versions[api_versions.APIVersion("2.5")])
+        self.assertEqual("b", versions[api_versions.APIVersion("2.latest")])
+        self.assertEqual("c", versions[api_versions.APIVersion()])
+        # versions and tuples can be mixed
+        versions[(2, 5)] = "d"
+        self.assertEqual("a", versions[api_versions.APIVersion("2.5")])
+        self.assertNotIn((2, 5), {api_versions.APIVersion("2.5")})
+        self.assertNotIn(api_versions.APIVersion("2.5"), {(2, 5): "d"})
+
+    def test_version_copy_and_pickle(self):
+        for version in ("2.5", "2.latest", None):
+            v = api_versions.APIVersion(version)
+            self.assertIs(v, copy.copy(v))
+            self.assertIs(v, copy.deepcopy(v))
+            self.assertIs(v, pickle.loads(pickle.dumps(v)))
+
     def test_version_matches(self):
         v1 = api_versions.APIVersion("2.0")
         v2 = api_versions.APIVersion("2.5")
@@ -331,7 +366,9 @@ class WrapsTestCase(utils.TestCase):
         self.assertEqual(2, B().f())
 
     def test_generate_function_name(self):
-        expected_name = "novaclient.tests.unit.test_api_versions.fake_func"
+        expected_name = ("novaclient.tests.unit.test_api_versions."
+                         "WrapsTestCase.test_generate_function_name."
+                         "<locals>.fake_func")
 
         self.assertNotIn(expected_name, api_versions._SUBSTITUTIONS)
 
@@ -342,6 +379,90 @@ class WrapsTestCase(utils.TestCase):
         self.assertIn(expected_name, api_versions._SUBSTITUTIONS)
         self.assertEqual(expected_name, fake_func.__id__)
 
+    def test_generate_method_name(self):
+        class A(object):
+            @api_versions.wraps("777.1", "777.1")
+            def f(self):
+                pass
+
+            @api_versions.wraps("777.2")
+            def f(self):  # noqa: F811
+                pass
+
+        expected_name = ("novaclient.tests.unit.test_api_versions."
+                         "WrapsTestCase.test_generate_method_name."
+                         "<locals>.A.f")
+        self.assertEqual(expected_name, A.f.__id__)
+        self.assertEqual(2, len(api_versions._SUBSTITUTIONS[expected_name]))
+
+    def test_scope_run_again_starts_new_variants(self):
+        def make_class(value):
+            class A(object):
+                api_version = api_versions.APIVersion("777.777")
+
+                @api_versions.wraps("777.1")
+                def f(self):
+                    return value
+
+            return A
+
+        first, second = make_class(1), make_class(2)
+
+        self.assertNotEqual(first.f.__id__, second.f.__id__)
+        self.assertEqual(1, len(api_versions.get_substitutions(first.f)))
+        self.assertEqual(1, len(api_versions.get_substitutions(second.f)))
+        self.assertEqual(1, first().f())
+        self.assertEqual(2, second().f())
+
+    def test_dispatch_is_resolved_once_per_version(self):
+        class A(object):
+            api_version = api_versions.APIVersion("777.1")
+
+            @api_versions.wraps("777.1", "777.1")
+            def f(self):
+                return 1
+
+            @api_versions.wraps("777.2")
+            def f(self):  # noqa: F811
+                return 2
+
+        obj = A()
+        with mock.patch.object(api_versions, "get_substitutions",
+                               wraps=api_versions.get_substitutions) as m:
+            self.assertEqual(1, obj.f())
+            self.assertEqual(1, obj.f())
+            self.assertEqual(1, m.call_count)
+
+            obj.api_version = api_versions.APIVersion("777.3")
+            self.assertEqual(2, obj.f())
+            self.assertEqual(2, obj.f())
+            self.assertEqual(2, m.call_count)
+
+            obj.api_version = api_versions.APIVersion("777.1")
+            self.assertEqual(1, obj.f())
+            self.assertEqual(2, m.call_count)
+
+    def test_dispatch_cache_cleared_on_new_variant(self):
+        name = "novaclient.tests.unit.test_api_versions.dispatched"
+        version = api_versions.APIVersion("777.5")
+        self.assertIsNone(api_versions.get_dispatch(name, version))
+
+        func = mock.Mock()
+        api_versions._add_substitution(api_versions.VersionedMethod(
+            name, api_versions.APIVersion("777.1"),
+            api_versions.APIVersion("777.latest"), func))
+        self.addCleanup(api_versions._SUBSTITUTIONS.pop, name)
+
+        self.assertIs(func, api_versions.get_dispatch(name, version))
+
+    @mock.patch("traceback.extract_stack")
+    def test_function_name_does_not_walk_the_stack(self, mock_extract):
+        @api_versions.wraps("7777777.7777777")
+        def fake_func():
+            pass
+
+        self.assertFalse(mock_extract.called)
+
 
 class CheckVersionTestCase(utils.TestCase):
     def test_version_unsupported(self):
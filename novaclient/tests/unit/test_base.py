@@ -11,6 +11,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import array
+import copy
+import json
+import operator
+import threading
+import time
+from unittest import mock
+from urllib import parse
+import weakref
+
 import requests
 
 from novaclient import api_versions
@@ -19,6 +29,7 @@ from novaclient import exceptions
 from novaclient.tests.unit import utils
 from novaclient.tests.unit.v2 import fakes
 from novaclient.v2 import flavors
+from novaclient.v2 import servers
 
 
 def create_response_obj_with_header():
@@ -54,6 +65,52 @@ class BaseTest(utils.TestCase):
         # Missing stuff still fails after a second get
         self.assertRaises(AttributeError, getattr, f, 'blahblah')
 
+    def test_resource_lazy_load_raise(self):
+        cs = fakes.FakeClient(api_versions.APIVersion("2.0"))
+        cs.lazy_load = base.LAZY_LOAD_RAISE
+        f = flavors.Flavor(cs.flavors, {'id': 1})
+        self.assertRaises(exceptions.LazyLoadForbidden, getattr, f, 'name')
+        self.assertEqual([], cs.client.callstack)
+        self.assertEqual({'Flavor': 1}, cs.lazy_loads)
+        # explicit loads are allowed
+        f.get()
+        self.assertEqual('256 MiB Server', f.name)
+
+    def test_resource_lazy_load_log(self):
+        cs = fakes.FakeClient(api_versions.APIVersion("2.0"))
+        cs.lazy_load = base.LAZY_LOAD_LOG
+        f = flavors.Flavor(cs.flavors, {'id': 1})
+        with mock.patch.object(cs.logger, 'warning') as warning:
+            self.assertEqual('256 MiB Server', f.name)
+        warning.assert_called_once_with(mock.ANY, 'Flavor', 1, 'name',
+                                        stack_info=True)
+        self.assertEqual({'Flavor': 1}, cs.lazy_loads)
+
+    def test_hydrate_gets(self):
+        cs = fakes.FakeClient(api_versions.APIVersion("2.0"))
+        listed = cs.flavors.list(detailed=False)[:2]
+        self.assertRaises(AttributeError, getattr, listed[0], 'ram')
+        cs.client.callstack = []
+        self.assertIs(listed, cs.flavors.hydrate(listed))
+        self.assertEqual([256, 1024], [f.ram for f in listed])
+        self.assertEqual(['/flavors/1', '/flavors/4'],
+                         sorted(call[1] for call in cs.client.callstack))
+
+    def test_hydrate_listing(self):
+        cs = fakes.FakeClient(api_versions.APIVersion("2.0"))
+        listed = cs.flavors.list(detailed=False)[:2]
+        listed.append(flavors.Flavor(cs.flavors, {'id': 'missing'}))
+        cs.client.callstack = []
+        with mock.patch.object(cs.flavors, 'get',
+                               side_effect=exceptions.NotFound(404)):
+            cs.flavors.hydrate(listed, max_workers=1)
+        self.assertEqual([256, 1024], [f.ram for f in listed[:2]])
+        self.assertEqual([('GET', '/flavors/detail', None)],
+                         cs.client.callstack)
+        # not found, and not lazy-loaded anymore
+        self.assertTrue(listed[2].is_loaded())
+        self.assertRaises(AttributeError, getattr, listed[2], 'ram')
+
     def test_eq(self):
         # Two resources of the same type with the same id: equal
         r1 = base.Resource(None, {'id': 1, 'name': 'hi'})
@@ -87,6 +144,25 @@ class BaseTest(utils.TestCase):
                           cs.flavors.find,
                           vegetable='carrot')
 
+    def test_findall_details_from_detailed_listing(self):
+        manager = FindManager()
+        found = manager.findall(name='dup')
+        self.assertEqual([0, 1, 2], [r.id for r in found])
+        self.assertEqual(['ACTIVE'] * 3, [r.status for r in found])
+        # a single detailed listing replaces a get per match
+        self.assertEqual([('list', False), ('list', True)], manager.calls)
+
+    def test_findall_details_single_match(self):
+        manager = FindManager()
+        found = manager.findall(name='single')
+        self.assertEqual(['ACTIVE'], [r.status for r in found])
+        self.assertEqual([('list', False), ('get', 3)], manager.calls)
+
+    def test_find_stops_after_second_match(self):
+        manager = FindManager()
+        self.assertRaises(exceptions.NoUniqueMatch, manager.find, name='dup')
+        self.assertEqual([('list', False)], manager.calls)
+
     def test_resource_object_with_request_ids(self):
         resp_obj = create_response_obj_with_header()
         r = base.Resource(None, {"name": "1"}, resp=resp_obj)
@@ -97,6 +173,645 @@ class BaseTest(utils.TestCase):
         r = base.Resource(None, {"name": "1"}, resp=resp_obj)
         self.assertEqual(fakes.FAKE_REQUEST_ID_LIST, r.request_ids)
 
+    def test_compact_resource(self):
+        info = {'id': 1, 'name': 'hi', 'nested': {'a': [1]}}
+        r = base.Resource(None, dict(info), loaded=True, compact=True)
+        default = base.Resource(None, dict(info), loaded=True)
+        self.assertEqual({}, r.__dict__)
+        self.assertEqual('hi', r.name)
+        self.assertEqual(repr(default), repr(r))
+        self.assertEqual(default.to_dict(), r.to_dict())
+        self.assertEqual([], r.request_ids)
+        self.assertRaises(AttributeError, getattr, r, 'blahblah')
+        r.name = 'renamed'
+        self.assertEqual('renamed', r.name)
+
+    def test_compact_resource_lazy_getattr(self):
+        cs = fakes.FakeClient(api_versions.APIVersion("2.0"))
+        cs.compact_resources = True
+        f = flavors.Flavor(cs.flavors, {'id': 1})
+        self.assertEqual('256 MiB Server', f.name)
+        self.assertEqual({}, f.__dict__)
+        self.assertEqual(fakes.FAKE_REQUEST_ID_LIST, f.request_ids)
+        cs.assert_called('GET', '/flavors/1')
+
+    def test_compact_resource_properties(self):
+        class Item(base.Resource):
+            @property
+            def status(self):
+                return 'computed'
+
+        r = Item(None, {'id': 1, 'status': 'raw'}, loaded=True, compact=True)
+        self.assertEqual('computed', r.status)
+        self.assertEqual('<Item id=1>', repr(r))
+
+    def test_compact_resource_add_details_override(self):
+        class Wrapped(base.Resource):
+            def _add_details(self, info):
+                for k, v in info['resource'].items():
+                    setattr(self, k, v)
+
+        r = Wrapped(None, {'resource': {'id': 1}}, compact=True)
+        self.assertEqual(1, r.id)
+
+    def test_compact_resource_delattr(self):
+        r = base.Resource(None, {'id': 1, 'flavor': {'id': 'f'}},
+                          loaded=True, compact=True)
+        del r.flavor
+        self.assertRaises(AttributeError, getattr, r, 'flavor')
+        self.assertEqual({'id': 1}, r.to_dict())
+        r.name = 'set'
+        del r.name
+        self.assertRaises(AttributeError, getattr, r, 'name')
+        self.assertRaises(AttributeError, delattr, r, 'missing')
+
+    def test_compact_resources_share_info(self):
+        # the memory saved is measured by tools/resource_memory_benchmark.py
+        info = {'id': 1, 'name': 'joe'}
+        r = base.Resource(None, info, loaded=True, compact=True)
+        self.assertIs(info, r._info)
+        self.assertEqual({}, r.__dict__)
+        r = base.Resource(None, dict(info), loaded=True, compact=False)
+        self.assertEqual(info, r.__dict__)
+
+    def test_as_mapping(self):
+        r = base.Resource(None, {'id': 1, 'flavor': {'links': [{'a': 1}]}})
+        view = r.as_mapping()
+        self.assertEqual(r._info, view)
+        self.assertEqual(repr(r._info), repr(view))
+        self.assertEqual({'a': 1}, view['flavor']['links'][0])
+        self.assertRaises(TypeError, operator.setitem, view, 'id', 2)
+        self.assertRaises(TypeError, operator.setitem, view['flavor'],
+                          'id', 2)
+        self.assertRaises(TypeError, operator.setitem,
+                          view['flavor']['links'], 0, {})
+        # a view, not a copy
+        r.set_info('id', 2)
+        self.assertEqual(2, view['id'])
+
+    def test_to_dict(self):
+        info = {'id': 1, 'flavor': {'id': 'f'}, 'links': [{'rel': 'self'}]}
+        r = base.Resource(None, info)
+        d = r.to_dict()
+        self.assertIs(dict, type(d))
+        self.assertEqual(info, d)
+        d['flavor']['id'] = 'g'
+        d['links'].append('x')
+        d['id'] = 2
+        self.assertEqual(
+            {'id': 1, 'flavor': {'id': 'f'}, 'links': [{'rel': 'self'}]},
+            info)
+        # a snapshot, not a view
+        d = r.to_dict()
+        r._info['flavor']['id'] = 'h'
+        self.assertEqual({'id': 'f'}, d['flavor'])
+
+    def test_iter_json(self):
+        resources = [base.Resource(None, {'id': i, 'tags': ['a']})
+                     for i in range(3)]
+        self.assertEqual([r._info for r in resources],
+                         json.loads(''.join(base.iter_json(resources))))
+        self.assertEqual('[]', ''.join(base.iter_json([])))
+
+    def test_hash(self):
+        r1 = base.Resource(None, {'id': 1, 'name': 'hi'}, loaded=True)
+        r2 = base.Resource(None, {'id': 1, 'name': 'hello'}, loaded=True)
+        r3 = base.Resource(None, {'id': 2}, loaded=True)
+        self.assertEqual(2, len({r1, r2, r3}))
+        self.assertEqual('one', {r1: 'one'}[r2])
+        # resources without id are hashable too
+        r4 = base.Resource(None, {'name': 'joe'}, loaded=True)
+        r5 = base.Resource(None, {'name': 'joe'}, loaded=True)
+        self.assertEqual(1, len({r4, r5}))
+
+    def test_hash_does_not_lazy_load(self):
+        cs = fakes.FakeClient(api_versions.APIVersion("2.0"))
+        cs.lazy_load = base.LAZY_LOAD_RAISE
+        f1 = flavors.Flavor(cs.flavors, {'name': 'joe'})
+        f2 = flavors.Flavor(cs.flavors, {'id': 1})
+        self.assertEqual(hash(None), hash(f1))
+        self.assertEqual(hash(1), hash(f2))
+        self.assertEqual([], cs.client.callstack)
+        self.assertEqual({}, cs.lazy_loads)
+
+
+class IdentityMapTest(utils.TestCase):
+
+    def setUp(self):
+        super(IdentityMapTest, self).setUp()
+        self.cs = fakes.FakeClient(api_versions.APIVersion("2.1"))
+        self.cs.identity_map = base.IdentityMap()
+
+    def test_merge(self):
+        identity_map = base.IdentityMap()
+        r1 = base.Resource(None, {'id': 1, 'name': 'a'})
+        r2 = base.Resource(None, {'id': 1, 'status': 'ACTIVE'}, loaded=True,
+                           resp='req-2')
+        self.assertIs(r1, identity_map.merge(r1))
+        self.assertIs(r1, identity_map.merge(r2))
+        self.assertEqual({'id': 1, 'name': 'a', 'status': 'ACTIVE'},
+                         r1._info)
+        self.assertEqual('ACTIVE', r1.status)
+        self.assertTrue(r1.is_loaded())
+        self.assertEqual(['req-2'], r1.request_ids)
+        self.assertIs(r1, identity_map.get(base.Resource, 1))
+        # other classes and resources without id are not merged
+        f = flavors.Flavor(None, {'id': 1})
+        self.assertIs(f, identity_map.merge(f))
+        r3 = base.Resource(None, {'name': 'a'})
+        self.assertIs(r3, identity_map.merge(r3))
+
+    def test_merge_weak(self):
+        identity_map = base.IdentityMap()
+        identity_map.merge(base.Resource(None, {'id': 1}))
+        self.assertIsNone(identity_map.get(base.Resource, 1))
+
+    def test_listing_and_get(self):
+        listed = self.cs.servers.list(detailed=False)
+        server = self.cs.servers.get('1234')
+        self.assertIs(listed[0], server)
+        self.assertEqual('BUILD', listed[0].status)
+        self.assertIs(server, self.cs.servers.list()[0])
+        self.assertIsInstance(server, servers.Server)
+
+    def test_disabled(self):
+        self.cs.identity_map = None
+        self.assertIsNot(self.cs.servers.get('1234'),
+                         self.cs.servers.get('1234'))
+
+
+@mock.patch.object(base, 'numpy', None)
+class ColumnarListTest(utils.TestCase):
+
+    def test_make_column(self):
+        self.assertEqual(array.array('q', [1, 2]), base.make_column([1, 2]))
+        self.assertEqual(array.array('d', [1.5]), base.make_column([1.5]))
+        self.assertEqual([1, None], base.make_column([1, None]))
+        self.assertEqual([True], base.make_column([True]))
+        self.assertEqual([2 ** 70], base.make_column([2 ** 70]))
+
+    def test_make_column_numpy(self):
+        numpy = mock.Mock()
+        with mock.patch.object(base, 'numpy', numpy):
+            column = base.make_column([1, 2])
+        self.assertEqual(numpy.asarray.return_value, column)
+        numpy.asarray.assert_called_once_with([1, 2])
+
+    def test_from_items(self):
+        items = [{'id': 1, 'name': 'a', 'big': 'x' * 100}, {'id': 2}]
+        cols = base.ColumnarList.from_items(
+            items, ['id', 'name'], create_response_obj_with_header())
+        self.assertEqual(2, len(cols))
+        self.assertEqual(array.array('q', [1, 2]), cols['id'])
+        self.assertEqual(['a', None], cols['name'])
+        self.assertEqual([(1, 'a'), (2, None)], cols.records())
+        self.assertEqual([{'id': 1, 'name': 'a'}, {'id': 2, 'name': None}],
+                         cols.records(as_dict=True))
+        self.assertEqual(fakes.FAKE_REQUEST_ID_LIST, cols.request_ids)
+
+        cols = base.ColumnarList.from_items(items)
+        self.assertEqual(['id', 'name', 'big'], cols.fields)
+
+    def test_concat(self):
+        page1 = base.ColumnarList.from_items([{'id': 1, 'host': 'h1'}],
+                                             resp='req-1')
+        page2 = base.ColumnarList.from_items([{'id': 2, 'zone': 'z'}],
+                                             resp='req-2')
+        page3 = base.ColumnarList.from_items([{'id': 3.5}])
+        cols = base.ColumnarList.concat([page1, page2])
+        self.assertEqual(['id', 'host', 'zone'], cols.fields)
+        self.assertEqual(array.array('q', [1, 2]), cols['id'])
+        self.assertEqual(['h1', None], cols['host'])
+        self.assertEqual([None, 'z'], cols['zone'])
+        self.assertEqual(['req-1', 'req-2'], cols.request_ids)
+        # the pages are not modified
+        self.assertEqual(array.array('q', [1]), page1['id'])
+
+        cols.extend(page3)
+        self.assertEqual(3, len(cols))
+        self.assertEqual([1, 2, 3.5], cols['id'])
+
+    def test_project_info(self):
+        info = {'id': 1, 'name': 'a', 'fault': 'x' * 100,
+                'flavor': {'original_name': 'small', 'extra_specs': {}}}
+        self.assertEqual({'id': 1, 'name': 'a'},
+                         base.project_info(info, ['name']))
+        self.assertEqual({'id': 1, 'flavor': {'original_name': 'small'}},
+                         base.project_info(info, ['flavor.original_name']))
+        self.assertEqual({'id': 1, 'flavor': info['flavor']},
+                         base.project_info(info, ['flavor',
+                                                  'flavor.original_name']))
+        self.assertEqual({'id': 1},
+                         base.project_info(info, ['missing', 'name.x',
+                                                  'flavor.missing']))
+        # the original is not modified
+        self.assertEqual({'original_name': 'small', 'extra_specs': {}},
+                         info['flavor'])
+        self.assertEqual('small', base.get_field(info, 'flavor.original_name'))
+        self.assertIsNone(base.get_field(info, 'flavor.missing'))
+
+    def test_paginate_fields(self):
+        api = PagedAPI(count=3, page_size=2)
+        for item in api.items:
+            item.update(name='n' + item['id'], fault='x' * 100)
+        manager = base.Manager(api)
+        manager.resource_class = base.Resource
+        pages = list(manager._paginate('/items', 'items', fields=['name']))
+        self.assertEqual([{'id': '0', 'name': 'n0'}, {'id': '1', 'name': 'n1'},
+                          {'id': '2', 'name': 'n2'}],
+                         [r._info for page in pages for r in page])
+        self.assertRaises(AttributeError, getattr, pages[0][0], 'fault')
+
+    def test_paginate_as_columns(self):
+        manager = base.Manager(PagedAPI(count=5, page_size=2))
+        manager.resource_class = base.Resource
+        pages = list(manager._paginate('/items', 'items', as_columns=True,
+                                       fields=['id']))
+        self.assertEqual([['0', '1'], ['2', '3'], ['4']],
+                         [page['id'] for page in pages])
+        cols = base.ColumnarList.concat(pages)
+        self.assertEqual(['0', '1', '2', '3', '4'], cols['id'])
+        self.assertEqual(fakes.FAKE_REQUEST_ID_LIST, cols.request_ids)
+
+
+class FindManager(base.ManagerWithFind):
+    """Manager listing three items named 'dup' and one named 'single'."""
+
+    resource_class = base.Resource
+
+    def __init__(self):
+        self.calls = []
+
+    def _item(self, item_id, detailed):
+        info = {'id': item_id, 'name': 'dup' if item_id < 3 else 'single'}
+        if detailed:
+            info['status'] = 'ACTIVE'
+        return base.Resource(self, info, loaded=True)
+
+    def list(self, detailed=True):
+        self.calls.append(('list', detailed))
+        return base.ListWithMeta([self._item(item_id, detailed)
+                                  for item_id in range(4)], None)
+
+    def get(self, item_id):
+        self.calls.append(('get', item_id))
+        return self._item(item_id, True)
+
+
+class FakeAPI(object):
+    """Fake endpoint answering listings.
+
+    :param barrier: :class:`threading.Barrier` the requests wait on before
+                    answering (optional)
+    """
+
+    def __init__(self, count=1, barrier=None):
+        self.client = self
+        self.api_version = api_versions.APIVersion('2.1')
+        self.count = count
+        self.barrier = barrier
+
+    def get(self, url):
+        if self.barrier is not None:
+            self.barrier.wait()
+        items = [{'id': i} for i in range(self.count)]
+        return create_response_obj_with_header(), {'items': items}
+
+
+class ManagerConcurrencyTest(utils.TestCase):
+
+    def _run_threads(self, target, count):
+        errors = []
+
+        def run():
+            try:
+                target()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+
+    def test_list_builds_resources_concurrently(self):
+        # Each resource can only be built once the other thread is building
+        # its own, which would dead-lock if listings were serialised.
+        barrier = threading.Barrier(2, timeout=5)
+
+        class Item(base.Resource):
+            def __init__(self, *args, **kwargs):
+                barrier.wait()
+                super(Item, self).__init__(*args, **kwargs)
+
+        manager = base.Manager(FakeAPI())
+        manager.resource_class = Item
+        self._run_threads(lambda: manager._list('/items', 'items'), 2)
+
+    def test_list_requests_run_concurrently(self):
+        # Each request only returns once every thread is in a request, which
+        # would dead-lock if the requests of a manager were serialised.
+        threads, calls = 8, 5
+        barrier = threading.Barrier(threads, timeout=5)
+        manager = base.Manager(FakeAPI(count=100, barrier=barrier))
+        manager.resource_class = base.Resource
+
+        def list_items():
+            for _ in range(calls):
+                self.assertEqual(100, len(manager._list('/items', 'items')))
+
+        self._run_threads(list_items, threads)
+
+
+class PagedAPI(object):
+    """Fake endpoint answering a marker-paginated listing."""
+
+    def __init__(self, count, page_size):
+        self.client = self
+        self.api_version = api_versions.APIVersion('2.1')
+        self.items = [{'id': str(i)} for i in range(count)]
+        self.page_size = page_size
+        self.urls = []
+
+    def get(self, url, decode=True):
+        self.urls.append(url)
+        query = parse.parse_qs(parse.urlsplit(url).query)
+        start = 0
+        if 'marker' in query:
+            start = int(query['marker'][0]) + 1
+        page = self.items[start:start + self.page_size]
+        body = {'items': page}
+        if len(page) == self.page_size:
+            body['items_links'] = [{
+                'rel': 'next',
+                'href': 'http://nova/items?limit=%d&marker=%s' % (
+                    self.page_size, page[-1]['id'])}]
+        resp = create_response_obj_with_header()
+        if not decode:
+            resp.status_code = 200
+            resp._content = json.dumps(body).encode('utf-8')
+            body = None
+        return resp, body
+
+
+class PaginateTest(utils.TestCase):
+
+    def setUp(self):
+        super(PaginateTest, self).setUp()
+        self.api = PagedAPI(count=5, page_size=2)
+        self.manager = base.Manager(self.api)
+        self.manager.resource_class = base.Resource
+
+    def test_get_next_marker(self):
+        body = {'items_links': [
+            {'rel': 'self', 'href': 'http://nova/items?marker=a'},
+            {'rel': 'next', 'href': 'http://nova/items?limit=2&marker=b'}]}
+        self.assertEqual('b', base.get_next_marker(body, 'items_links'))
+        self.assertIsNone(base.get_next_marker({}, 'items_links'))
+
+    def test_paginate(self):
+        pages = list(self.manager._paginate('/items', 'items',
+                                            filters={'name': 'x'}))
+        self.assertEqual([['0', '1'], ['2', '3'], ['4']],
+                         [[i.id for i in page] for page in pages])
+        self.assertEqual(['/items?name=x',
+                          '/items?marker=1&name=x',
+                          '/items?marker=3&name=x'], self.api.urls)
+        for page in pages:
+            self.assertEqual(fakes.FAKE_REQUEST_ID_LIST, page.request_ids)
+
+    def test_paginate_is_lazy(self):
+        pages = self.manager._paginate('/items?a=b', 'items', marker='0',
+                                       limit=2)
+        self.assertEqual([], self.api.urls)
+        self.assertEqual(['1', '2'], [i.id for i in next(pages)])
+        self.assertEqual(['/items?a=b&limit=2&marker=0'], self.api.urls)
+        pages.close()
+        self.assertEqual(1, len(self.api.urls))
+
+    def test_paginate_no_trailing_empty_page(self):
+        self.api.items = self.api.items[:4]
+        pages = list(self.manager._paginate('/items', 'items'))
+        self.assertEqual([['0', '1'], ['2', '3']],
+                         [[i.id for i in page] for page in pages])
+        self.assertEqual(3, len(self.api.urls))
+
+    def test_paginate_raw(self):
+        self.api.items = self.api.items[:4]
+        for raw in base.RAW_MODES:
+            self.api.urls = []
+            pages = list(self.manager._paginate('/items', 'items', raw=raw))
+            self.assertEqual(3, len(self.api.urls))
+            if raw == base.RAW_BYTES:
+                self.assertIsInstance(pages[0], base.RawResponse)
+                pages = [page.json() for page in pages]
+            else:
+                self.assertIsInstance(pages[0], base.DictWithMeta)
+            self.assertEqual([['0', '1'], ['2', '3']],
+                             [[i['id'] for i in page['items']]
+                              for page in pages])
+
+    def test_list_all_streams_pages(self):
+        alive = []
+
+        def iter_pages(**kwargs):
+            refs = []
+            for page in self.manager._paginate('/items', 'items', **kwargs):
+                alive.append(sum(ref() is not None for ref in refs))
+                refs.append(weakref.ref(page))
+                yield page
+
+        self.manager.iter_pages = iter_pages
+        items = self.manager.list_all()
+        self.assertEqual(['0', '1', '2', '3', '4'], [i.id for i in items])
+        self.assertEqual(fakes.FAKE_REQUEST_ID_LIST, items.request_ids)
+        # at most the page being consumed is held when the next one is
+        # fetched
+        self.assertEqual([0, 1, 1], alive)
+
+        columns = self.manager.list_all(as_columns=True, fields=['id'])
+        self.assertIsInstance(columns, base.ColumnarList)
+        self.assertEqual(['0', '1', '2', '3', '4'], columns['id'])
+
+    def _cache_writes(self, listing):
+        self.api.completion_cache = mock.Mock(max_entries=3)
+        listing()
+        return [(c[0][2], c[1]['replace'])
+                for c in self.api.completion_cache.write.call_args_list]
+
+    def test_paginate_replaces_completion_cache(self):
+        writes = self._cache_writes(
+            lambda: list(self.manager._paginate('/items', 'items')))
+        self.assertEqual([(['0', '1'], False), (['2', '3'], False),
+                          (['4'], False), (['2', '3', '4'], True)], writes)
+
+    def test_paginate_merges_into_completion_cache(self):
+        def abandoned():
+            pages = self.manager._paginate('/items', 'items')
+            next(pages)
+            pages.close()
+
+        for listing in (
+                lambda: list(self.manager._paginate('/items?name=x', 'items')),
+                lambda: list(self.manager._paginate('/items', 'items',
+                                                    filters={'name': 'x'})),
+                lambda: list(self.manager._paginate('/items', 'items',
+                                                    marker='0')),
+                abandoned):
+            writes = self._cache_writes(listing)
+            self.assertTrue(writes)
+            self.assertFalse(any(replace for values, replace in writes))
+
+    def test_list_completion_cache(self):
+        # the listing is cut by the page size of the endpoint
+        writes = self._cache_writes(
+            lambda: self.manager._list('/items', 'items'))
+        self.assertEqual([(['0', '1'], False)], writes)
+        self.api.page_size = 10
+        writes = self._cache_writes(
+            lambda: self.manager._list('/items?sort_key=id', 'items'))
+        self.assertEqual([(['0', '1', '2', '3', '4'], True)], writes)
+        writes = self._cache_writes(
+            lambda: self.manager._list('/items', 'items',
+                                       filters={'name': 'x'}))
+        self.assertEqual([(['0', '1', '2', '3', '4'], False)], writes)
+
+    def test_is_unfiltered(self):
+        self.assertTrue(base.is_unfiltered('/items'))
+        self.assertTrue(base.is_unfiltered('/items?sort_key=id&limit=2',
+                                           [('sort_dir', 'asc')]))
+        self.assertFalse(base.is_unfiltered('/items?name=x'))
+        self.assertFalse(base.is_unfiltered('/items', [('marker', 'a')]))
+
+    def test_get_raw_next_marker(self):
+        content = json.dumps({
+            'items': [{'id': 'a', 'metadata': {'items_links': 'x'}}],
+            'items_links': [{'rel': 'next',
+                             'href': 'http://nova/items?marker=a'}]})
+        self.assertEqual('a', base.get_raw_next_marker(
+            content.encode('utf-8'), 'items_links'))
+        self.assertIsNone(base.get_raw_next_marker(
+            b'{"items": [{"items_links": []}]}', 'items_links'))
+        self.assertIsNone(base.get_raw_next_marker(b'{"items": []}',
+                                                   'items_links'))
+
+    def test_is_raw_list_empty(self):
+        self.assertTrue(base.is_raw_list_empty(b'{"items" : [ ]}', 'items'))
+        self.assertTrue(base.is_raw_list_empty(b'{}', 'items'))
+        self.assertFalse(base.is_raw_list_empty(
+            b'{"items": [{"items": []}]}', 'items'))
+
+
+class PrefetchPagesTest(utils.TestCase):
+
+    def _pages(self, count, fetched, error=None):
+        for i in range(count):
+            fetched.append(i)
+            yield [i]
+        if error:
+            raise error
+
+    def _wait_for(self, predicate):
+        deadline = time.time() + 5
+        while not predicate() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(predicate())
+
+    def test_prefetch_pages(self):
+        depth, received, ahead = 2, [], []
+
+        def source():
+            for i in range(6):
+                # number of pages fetched ahead of the consumer
+                ahead.append(i - len(received))
+                yield [i]
+
+        pages = base.prefetch_pages(source(), depth)
+        # nothing is fetched before the first page is asked for
+        self.assertEqual([], ahead)
+        for page in pages:
+            received.append(page)
+        self.assertEqual([[i] for i in range(6)], received)
+        # the worker runs ahead by the prefetch depth, not further
+        self.assertLessEqual(max(ahead), depth)
+
+    def test_prefetch_pages_error(self):
+        pages = base.prefetch_pages(
+            self._pages(2, [], error=exceptions.NotFound(404)), 1)
+        self.assertEqual([0], next(pages))
+        self.assertEqual([1], next(pages))
+        self.assertRaises(exceptions.NotFound, next, pages)
+
+    def test_prefetch_pages_close(self):
+        fetched = []
+        source = self._pages(100, fetched)
+        pages = base.prefetch_pages(source, 3)
+        self.assertEqual([0], next(pages))
+        pages.close()
+        self._wait_for(lambda: source.gi_frame is None)
+        self.assertLessEqual(len(fetched), 5)
+
+    def test_paginate_prefetch(self):
+        api = PagedAPI(count=5, page_size=2)
+        manager = base.Manager(api)
+        manager.resource_class = base.Resource
+        pages = manager._paginate('/items', 'items', prefetch=2)
+        self.assertEqual([['0', '1'], ['2', '3'], ['4']],
+                         [[i.id for i in page] for page in pages])
+        self.assertEqual(3, len(api.urls))
+
+    def test_prefetch_overlaps_requests_and_processing(self):
+        depth, count = 2, 6
+        # set when the worker starts fetching each page, and the end
+        started = [threading.Event() for _ in range(count + 1)]
+
+        def source():
+            for i in range(count):
+                started[i].set()
+                yield [i]
+            started[count].set()
+
+        for page in base.prefetch_pages(source(), depth):
+            # the following pages are fetched while a page is processed,
+            # which would dead-lock if the pages were fetched on demand
+            self.assertTrue(started[min(page[0] + depth, count)].wait(5))
+
+
+class RequestIdsTest(utils.TestCase):
+    def test_request_ids(self):
+        ids = base.RequestIds(['req-1', 'req-2', 'req-1'])
+        self.assertEqual(['req-1', 'req-2'], ids)
+        ids.add('req-2')
+        ids.add('req-3')
+        self.assertEqual(['req-1', 'req-2', 'req-3'], ids)
+        ids.remove('req-2')
+        self.assertNotIn('req-2', ids)
+        ids.add('req-2')
+        self.assertEqual(['req-1', 'req-3', 'req-2'], ids)
+        del ids[0]
+        self.assertNotIn('req-1', ids)
+        self.assertEqual(ids, copy.deepcopy(ids))
+        self.assertIsInstance(copy.copy(ids), base.RequestIds)
+
+    def test_append_request_ids_is_linear(self):
+        obj = base.ListWithMeta([], None)
+        obj.append_request_ids(['req-%d' % i for i in range(10000)])
+        obj.append_request_ids(['req-%d' % i for i in range(10000)])
+        self.assertEqual(10000, len(obj.request_ids))
+        self.assertIsInstance(obj.request_ids, base.RequestIds)
+
+    def test_listed_resources_share_request_ids(self):
+        cs = fakes.FakeClient(api_versions.APIVersion("2.1"))
+        sl = cs.servers.list()
+        self.assertIs(sl[0].x_openstack_request_ids,
+                      sl[1].x_openstack_request_ids)
+        self.assertEqual([], sl[0].request_ids)
+        sl[0].append_request_ids('req-1')
+        self.assertEqual(['req-1'], sl[0].request_ids)
+        self.assertEqual([], sl[1].request_ids)
+
 
 class ListWithMetaTest(utils.TestCase):
     def test_list_with_meta(self):
@@ -14,6 +14,7 @@
 #    under the License.
 
 import copy
+import threading
 from unittest import mock
 
 from keystoneauth1 import session
@@ -21,6 +22,7 @@ from oslo_utils import uuidutils
 
 import novaclient.api_versions
 import novaclient.client
+import novaclient.exceptions
 import novaclient.extension
 from novaclient.tests.unit import utils
 import novaclient.v2.client
@@ -51,6 +53,29 @@ class SessionClientTest(utils.TestCase):
         cs.reset_timings()
         self.assertEqual(0, len(cs.get_timings()))
 
+    def test_alternate_service_type_is_per_thread(self):
+        client = novaclient.client.SessionClient(session=session.Session(),
+                                                 service_type='compute')
+        seen = []
+        entered = threading.Event()
+        release = threading.Event()
+
+        def use_image_service():
+            with client.alternate_service_type('image'):
+                seen.append(client.service_type)
+                entered.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=use_image_service)
+        thread.start()
+        self.assertTrue(entered.wait(5))
+        self.assertEqual('compute', client.service_type)
+        release.set()
+        thread.join()
+
+        self.assertEqual(['image'], seen)
+        self.assertEqual('compute', client.service_type)
+
     def test_global_id(self):
         global_id = "req-%s" % uuidutils.generate_uuid()
         self.requests_mock.get('http://no.where')
@@ -61,6 +86,25 @@ class SessionClientTest(utils.TestCase):
         headers = self.requests_mock.last_request.headers
         self.assertEqual(headers['X-OpenStack-Request-ID'], global_id)
 
+    def test_request_without_decoding(self):
+        self.requests_mock.get('http://no.where', content=b'{"a": 1}')
+
+        client = novaclient.client.SessionClient(session=session.Session())
+        resp, body = client.request("http://no.where", 'GET', decode=False)
+        self.assertIsNone(body)
+        self.assertEqual(b'{"a": 1}', resp.content)
+        headers = self.requests_mock.last_request.headers
+        self.assertEqual('application/json', headers['Accept'])
+
+    def test_request_without_decoding_error(self):
+        self.requests_mock.get('http://no.where', status_code=404,
+                               json={'itemNotFound': {'message': 'gone'}})
+
+        client = novaclient.client.SessionClient(session=session.Session())
+        e = self.assertRaises(novaclient.exceptions.NotFound, client.request,
+                              "http://no.where", 'GET', decode=False)
+        self.assertEqual('gone', e.message)
+
 
 class ClientsUtilsTest(utils.TestCase):
 
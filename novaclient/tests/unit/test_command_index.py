@@ -0,0 +1,74 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+
+import fixtures
+
+from novaclient import api_versions
+from novaclient import command_index
+import novaclient.shell
+from novaclient.tests.unit import utils
+
+
+class CommandIndexTest(utils.TestCase):
+
+    def setUp(self):
+        super(CommandIndexTest, self).setUp()
+        self.useFixture(fixtures.EnvironmentVariable('COLUMNS', '80'))
+
+    def _shell(self, version, command=None):
+        shell = novaclient.shell.OpenStackComputeShell()
+        shell.extensions = []
+        parser = shell.get_subcommand_parser(version, do_help=True, argv=[],
+                                             command=command)
+        return shell, parser
+
+    def test_index_is_up_to_date(self):
+        with open(command_index.get_index_path(2)) as f:
+            shipped = json.load(f)
+        self.assertEqual(command_index.build_index(2), shipped,
+                         "run tools/generate_command_index.py")
+
+    def test_help_from_index(self):
+        for version in ('2.1', '2.60', '2.latest'):
+            version = api_versions.APIVersion(version)
+            shell, parser = self._shell(version)
+            indexed_shell, indexed_parser = self._shell(version, 'help')
+            self.assertIsNotNone(indexed_shell._command_index)
+            self.assertEqual(list(shell.commands),
+                             list(indexed_shell.commands))
+            self.assertEqual(parser.format_help(),
+                             indexed_parser.format_help())
+            for command in shell.commands:
+                self.assertEqual(
+                    shell.get_subcommand(command).format_help(),
+                    indexed_shell.get_subcommand(command).format_help())
+
+    def test_options(self):
+        index = command_index.load_index(2)
+        version = api_versions.APIVersion('2.latest')
+        self.assertIn('--matching', index.options(version))
+        self.assertIsNone(index.get('foofoo', version))
+        self.assertIsNotNone(index.get('list', version))
+
+    def test_load_index_mismatch(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'command_index.json')
+        for data in ({'format': command_index.INDEX_FORMAT,
+                      'api_max_version': '2.1', 'commands': {}},
+                     {'format': 0, 'commands': {}}):
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            self.assertIsNone(command_index.load_index(2, path))
+        self.assertIsNone(command_index.load_index(2, path + '.missing'))
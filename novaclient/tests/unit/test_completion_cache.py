@@ -0,0 +1,158 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+from unittest import mock
+
+import fixtures
+
+from novaclient import api_versions
+from novaclient import completion_cache
+from novaclient.tests.unit import utils
+from novaclient.tests.unit.v2 import fakes
+
+
+class CompletionCacheTest(utils.TestCase):
+
+    def setUp(self):
+        super(CompletionCacheTest, self).setUp()
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.cache = completion_cache.CompletionCache(
+            cache_dir=self.cache_dir, max_entries=5)
+
+    def _write(self, values, replace=False):
+        self.cache.write('server', 'uuid', values, replace=replace)
+        self.assertTrue(self.cache.flush(5))
+        return self.cache.read('server', 'uuid')
+
+    def test_replace(self):
+        self.assertEqual(['a', 'b'], self._write(['a', 'b'], replace=True))
+        self.assertEqual(['c'], self._write(['c'], replace=True))
+        self.assertTrue(os.path.exists(
+            os.path.join(self.cache_dir, 'server-uuid-cache')))
+
+    def test_append(self):
+        self._write(['a', 'b'], replace=True)
+        self.assertEqual(['a', 'b', 'c'], self._write(['c']))
+
+    def test_append_deduplicates(self):
+        self._write(['a', 'b'], replace=True)
+        self.assertEqual(['b', 'a'], self._write(['a']))
+
+    def test_bounded(self):
+        self.assertEqual(['3', '4', '5', '6', '7'],
+                         self._write(range(8), replace=True))
+        self.assertEqual(['5', '6', '7', '8', '9'],
+                         self._write(['8', '9']))
+
+    def test_pending_writes_are_coalesced(self):
+        with mock.patch.object(self.cache, '_write_file') as write_file:
+            with mock.patch('threading.Thread'):
+                self.cache.write('server', 'uuid', ['a'])
+                self.cache.write('server', 'uuid', ['b'], replace=True)
+                self.cache.write('server', 'uuid', ['c'])
+            self.cache._run()
+        path = self.cache.get_path('server', 'uuid')
+        write_file.assert_called_once_with(path, True, ['b', 'c'])
+
+    def test_no_temporary_files_left(self):
+        self._write(['a'], replace=True)
+        self._write(['b'])
+        self.assertEqual(['server-uuid-cache', 'server-uuid-cache.lock'],
+                         sorted(os.listdir(self.cache_dir)))
+
+    def test_write_errors_are_ignored(self):
+        cache = completion_cache.CompletionCache(
+            cache_dir=os.path.join(self.cache_dir, 'file', 'dir'))
+        open(os.path.join(self.cache_dir, 'file'), 'w').close()
+        cache.write('server', 'uuid', ['a'])
+        self.assertTrue(cache.flush(5))
+        self.assertEqual([], cache.read('server', 'uuid'))
+
+    def test_default_cache_dir(self):
+        self.useFixture(fixtures.EnvironmentVariable(
+            'NOVACLIENT_UUID_CACHE_DIR', self.cache_dir))
+        cache_dir = completion_cache.get_cache_dir()
+        self.assertEqual(self.cache_dir, os.path.dirname(cache_dir))
+
+
+class ManagerCompletionCacheTest(utils.TestCase):
+
+    def setUp(self):
+        super(ManagerCompletionCacheTest, self).setUp()
+        self.cs = fakes.FakeClient(api_versions.APIVersion("2.1"))
+
+    @mock.patch('os.makedirs')
+    def test_disabled_by_default(self, mock_makedirs):
+        self.assertIsNone(self.cs.completion_cache)
+        self.cs.flavors.list()
+        self.cs.flavors.create('flavorcreate', 512, 1, 10, 1234)
+        self.assertFalse(mock_makedirs.called)
+
+    def test_list_and_create(self):
+        cache_dir = self.useFixture(fixtures.TempDir()).path
+        cache = completion_cache.CompletionCache(cache_dir=cache_dir)
+        self.cs.completion_cache = cache
+
+        flavors = self.cs.flavors.list()
+        self.assertTrue(cache.flush(5))
+        uuids = [str(f.id) for f in flavors]
+        self.assertEqual(uuids, cache.read('flavor', 'uuid'))
+        self.assertEqual([f.human_id for f in flavors],
+                         cache.read('flavor', 'human_id'))
+
+        # the created flavor moves to the end of the cache
+        created = self.cs.flavors.create('flavorcreate', 512, 1, 10, 1234)
+        self.assertTrue(cache.flush(5))
+        created_id = str(created.id)
+        self.assertEqual([u for u in uuids if u != created_id] + [created_id],
+                         cache.read('flavor', 'uuid'))
+        self.assertEqual(created.human_id,
+                         cache.read('flavor', 'human_id')[-1])
+
+    def test_projected_list_not_cached(self):
+        cache = mock.Mock()
+        self.cs.completion_cache = cache
+        self.cs.servers.list(fields=['id', 'status'])
+        self.assertFalse(cache.write.called)
+
+    def test_filtered_list_merged(self):
+        cache = mock.Mock()
+        self.cs.completion_cache = cache
+        self.cs.servers.list()
+        self.assertTrue(all(c[1]['replace']
+                            for c in cache.write.call_args_list))
+        cache.reset_mock()
+        self.cs.servers.list(search_opts={'name': 'sample-server'})
+        self.cs.servers.findall(name='sample-server')
+        self.assertTrue(cache.write.called)
+        self.assertFalse(any(c[1]['replace']
+                             for c in cache.write.call_args_list))
+
+    def test_write_to_completion_cache(self):
+        cache = mock.Mock()
+        self.cs.completion_cache = cache
+        manager = self.cs.servers
+        with manager.completion_cache('uuid', manager.resource_class, 'w'):
+            manager.write_to_completion_cache('uuid', 'abc')
+        cache.write.assert_called_once_with('server', 'uuid', ['abc'],
+                                            replace=True)
+
+    @mock.patch.object(completion_cache, 'CompletionCache')
+    def test_client_option(self, mock_cache):
+        cs = fakes.FakeClient(api_versions.APIVersion("2.1"))
+        self.assertIsNone(cs.completion_cache)
+        self.assertFalse(mock_cache.called)
+        cs = fakes.FakeClient.__new__(fakes.FakeClient)
+        fakes.client.Client.__init__(cs, completion_cache=True,
+                                     direct_use=False)
+        self.assertEqual(mock_cache.return_value, cs.completion_cache)
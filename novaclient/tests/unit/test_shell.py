@@ -471,6 +471,36 @@ class ShellTest(utils.TestCase):
             self.assertThat((stdout + stderr),
                             matchers.MatchesRegex(r, re.DOTALL | re.MULTILINE))
 
+    def test_unknown_command_suggestion(self):
+        self.make_env()
+        stdout, stderr = self.shell('lsit', exitcodes=[2])
+        self.assertIn("invalid choice: 'lsit', did you mean 'list'", stderr)
+
+    def test_only_requested_subcommand_is_built(self):
+        self.make_env()
+        _shell = novaclient.shell.OpenStackComputeShell()
+        with mock.patch.object(_shell, '_add_subparser',
+                               wraps=_shell._add_subparser) as add_subparser:
+            _shell.main(['list'])
+        self.assertEqual(['list'],
+                         [c[0][1] for c in add_subparser.call_args_list])
+        self.assertIn('show', _shell.commands)
+        self.assertNotIn('show', _shell.subcommands)
+        self.assertIn('show', _shell.parser.format_help())
+        self.assertEqual('show', _shell.get_subcommand('show').prog[5:])
+        self.assertIsNone(_shell.get_subcommand('foofoo'))
+
+    @mock.patch('oslo_utils.importutils.import_module',
+                side_effect=AssertionError('action module imported'))
+    def test_help_and_completion_from_index(self, mock_import):
+        self._test_help('help')
+        self._test_help('help set-password', required=[
+            '.*?^usage: nova set-password',
+            '.*?^Change the admin password'])
+        stdout, stderr = self.shell('bash-completion')
+        self.assertIn('server-group-delete', stdout.split())
+        self.assertIn('--matching', stdout.split())
+
     def test_no_username(self):
         required = ('You must provide a user name/id (via --os-username, '
                     '--os-user-id, env[OS_USERNAME] or env[OS_USER_ID]) or '
@@ -16,10 +16,12 @@ import sys
 from unittest import mock
 from urllib import parse
 
+from novaclient import api_versions
 from novaclient import base
 from novaclient import exceptions
 from novaclient.tests.unit import fakes
 from novaclient.tests.unit import utils as test_utils
+from novaclient.tests.unit.v2 import fakes as v2_fakes
 from novaclient import utils
 from novaclient.v2 import servers
 
@@ -167,6 +169,244 @@ class FindResourceTestCase(test_utils.TestCase):
         self.assertRaises(exceptions.NoUniqueMatch, utils.find_resource,
                           alphanum_manager, res.name, wrap_exception=False)
 
+    def test_find_by_name_lists_once(self):
+        with mock.patch.object(self.manager, 'list',
+                               wraps=self.manager.list) as list_mock:
+            self.assertRaises(exceptions.CommandError,
+                              utils.find_resource, self.manager, 'asdf')
+        # the name and the human_id are searched in the same listing
+        list_mock.assert_called_once_with()
+
+    def test_find_name_before_integer_id(self):
+        output = utils.find_resource(self.manager, '9876')
+        self.assertEqual(output, self.manager.get('5678'))
+
+
+class FindResourceRequestsTestCase(test_utils.TestCase):
+    """Requests made by find_resource for each manager."""
+
+    def setUp(self):
+        super(FindResourceRequestsTestCase, self).setUp()
+        self.cs = v2_fakes.FakeClient(api_versions.APIVersion("2.53"))
+
+    def _find(self, manager, name_or_id, calls, **find_args):
+        self.cs.client.callstack = []
+        resource = utils.find_resource(manager, name_or_id, **find_args)
+        self.assertEqual(sorted(calls),
+                         sorted(call[0:2]
+                                for call in self.cs.client.callstack))
+        return resource
+
+    def test_servers(self):
+        self._find(self.cs.servers, 'sample-server',
+                   [('GET', '/servers?name=sample-server'),
+                    ('GET', '/servers/1234')])
+        # the listing and the lookup by integer id run concurrently
+        self._find(self.cs.servers, '5678',
+                   [('GET', '/servers?name=5678'),
+                    ('GET', '/servers/5678')])
+        self.assertRaises(exceptions.CommandError, self._find,
+                          self.cs.servers, 'unknown', [])
+        self.assertEqual([('GET', '/servers?name=unknown', None)],
+                         self.cs.client.callstack)
+
+    def test_flavors(self):
+        self._find(self.cs.flavors, '1', [('GET', '/flavors/1')],
+                   is_public=None)
+        self._find(self.cs.flavors, '512 MiB Server',
+                   [('GET', '/flavors/512 MiB Server'),
+                    ('GET', '/flavors?is_public=None'),
+                    ('GET', '/flavors/2')],
+                   is_public=None)
+
+    def test_keypairs(self):
+        self._find(self.cs.keypairs, 'test', [('GET', '/os-keypairs/test')])
+
+    def test_aggregates(self):
+        self._find(self.cs.aggregates, 'test2', [('GET', '/os-aggregates')])
+        self._find(self.cs.aggregates, '1',
+                   [('GET', '/os-aggregates'), ('GET', '/os-aggregates/1')])
+
+    def test_hypervisors(self):
+        self._find(self.cs.hypervisors, 'hyper1',
+                   [('GET', '/os-hypervisors/hyper1')])
+
+    def test_resolution_cache(self):
+        self.cs.resolution_cache = utils.ResolutionCache(ttl=5)
+        server = self._find(self.cs.servers, 'sample-server',
+                            [('GET', '/servers?name=sample-server'),
+                             ('GET', '/servers/1234')])
+        # the ID is cached, not the server
+        cached = self._find(self.cs.servers, 'sample-server',
+                            [('GET', '/servers/1234')])
+        self.assertIsNot(server, cached)
+        self.assertEqual(server.id, cached.id)
+        # other find arguments are resolved again
+        self._find(self.cs.servers, 'sample-server',
+                   [('GET', '/servers?all_tenants=1&name=sample-server'),
+                    ('GET', '/servers/1234')],
+                   all_tenants=1)
+        # deletions clear the cache
+        self.cs.servers.delete(server)
+        self._find(self.cs.servers, 'sample-server',
+                   [('GET', '/servers?name=sample-server'),
+                    ('GET', '/servers/1234')])
+
+    def test_resolution_cache_renamed(self):
+        self.cs.resolution_cache = utils.ResolutionCache(ttl=5)
+        server = self._find(self.cs.servers, 'sample-server',
+                            [('GET', '/servers?name=sample-server'),
+                             ('GET', '/servers/1234')])
+        renamed = servers.Server(self.cs.servers,
+                                 {'id': '1234', 'name': 'renamed'},
+                                 loaded=True)
+        with mock.patch.object(self.cs.servers, 'get',
+                               side_effect=[renamed, server]):
+            # the cached server no longer has the name, it is searched again
+            found = self._find(self.cs.servers, 'sample-server',
+                               [('GET', '/servers?name=sample-server')])
+        self.assertIs(server, found)
+
+    def test_resolution_cache_ids_not_cached(self):
+        self.cs.resolution_cache = utils.ResolutionCache(ttl=5)
+        for i in range(2):
+            self._find(self.cs.keypairs, 'test',
+                       [('GET', '/os-keypairs/test')])
+
+    def test_resolution_cache_expires(self):
+        self.cs.resolution_cache = utils.ResolutionCache(ttl=5)
+        with mock.patch('time.monotonic', return_value=100):
+            self._find(self.cs.servers, 'sample-server',
+                       [('GET', '/servers?name=sample-server'),
+                        ('GET', '/servers/1234')])
+        with mock.patch('time.monotonic', return_value=104):
+            self._find(self.cs.servers, 'sample-server',
+                       [('GET', '/servers/1234')])
+        with mock.patch('time.monotonic', return_value=105):
+            self._find(self.cs.servers, 'sample-server',
+                       [('GET', '/servers?name=sample-server'),
+                        ('GET', '/servers/1234')])
+
+    def test_resolution_cache_disabled_by_default(self):
+        for i in range(2):
+            self._find(self.cs.servers, 'sample-server',
+                       [('GET', '/servers?name=sample-server'),
+                        ('GET', '/servers/1234')])
+
+
+class FindResourcesTestCase(test_utils.TestCase):
+
+    def setUp(self):
+        super(FindResourcesTestCase, self).setUp()
+        self.manager = FakeManager(None)
+        list_patch = mock.patch.object(self.manager, 'list',
+                                       wraps=self.manager.list)
+        self.list = list_patch.start()
+        self.addCleanup(list_patch.stop)
+        get_patch = mock.patch.object(self.manager, 'get',
+                                      wraps=self.manager.get)
+        self.get = get_patch.start()
+        self.addCleanup(get_patch.stop)
+
+    def test_find_resources(self):
+        output = utils.find_resources(
+            self.manager, ['lower', UUID, '1234567', '9876', 'lower'])
+        self.assertEqual(['123456', UUID, '1234567', '5678', '123456'],
+                         [r.id for r in output])
+        # one listing for the names and IDs, and a get for the UUID
+        self.list.assert_called_once_with()
+        self.get.assert_called_once_with(UUID)
+
+    def test_find_resources_single(self):
+        output = utils.find_resources(self.manager, ['Mixed'])
+        self.assertEqual(['1234567'], [r.id for r in output])
+        self.list.assert_called_once_with()
+
+    def test_find_resources_alphanum_id(self):
+        self.manager.is_alphanum_id_allowed = True
+        output = utils.find_resources(self.manager, ['01234', '5678'])
+        self.assertEqual(['01234', '5678'], [r.id for r in output])
+        self.assertFalse(self.get.called)
+
+    def test_find_resources_uuid_like_name(self):
+        other_uuid = 'c1b6f2a4-8f4e-4d47-9a2b-1f5d7f0e2a61'
+        errors = {}
+        output = utils.find_resources(self.manager, [other_uuid],
+                                      wrap_exception=False, errors=errors)
+        self.assertEqual([None], output)
+        self.assertIsInstance(errors[other_uuid], exceptions.NotFound)
+        # the name is searched without getting the UUID again
+        self.get.assert_called_once_with(other_uuid)
+        self.list.assert_called_once_with()
+
+        named = FakeResource('4321', {'name': other_uuid})
+        with mock.patch.object(self.manager, 'resources',
+                               self.manager.resources + [named]):
+            self.get.reset_mock()
+            output = utils.find_resources(self.manager, [other_uuid])
+        self.assertEqual([named], output)
+        self.get.assert_called_once_with(other_uuid)
+
+    def test_find_resources_errors_reported_together(self):
+        ex = self.assertRaises(exceptions.CommandError,
+                               utils.find_resources, self.manager,
+                               ['unknown', 'lower', 'other'])
+        self.assertEqual("No fakeresource with a name or ID of 'unknown' "
+                         "exists.\nNo fakeresource with a name or ID of "
+                         "'other' exists.", str(ex))
+        self.list.assert_called_once_with()
+
+    def test_find_resources_errors(self):
+        errors = {}
+        output = utils.find_resources(self.manager, ['unknown', 'lower'],
+                                      wrap_exception=False, errors=errors)
+        self.assertEqual([None, '123456'],
+                         [r and r.id for r in output])
+        self.assertEqual(['unknown'], list(errors))
+        self.assertIsInstance(errors['unknown'], exceptions.NotFound)
+
+    def test_find_resources_searches(self):
+        cs = v2_fakes.FakeClient(api_versions.APIVersion("2.53"))
+        output = utils.find_resources(cs.servers,
+                                      ['sample-server', 'sample-server2'])
+        self.assertEqual(['1234', '5678'], [s.id for s in output])
+        # the names are searched one by one, with the filter of the API
+        urls = [call[1] for call in cs.client.callstack]
+        self.assertIn('/servers?name=sample-server', urls)
+        self.assertIn('/servers?name=sample-server2', urls)
+        self.assertNotIn('/servers', urls)
+
+    @mock.patch.object(utils, 'FIND_SEARCHES_MAX_NAMES', 1)
+    def test_find_resources_requests(self):
+        cs = v2_fakes.FakeClient(api_versions.APIVersion("2.53"))
+        with mock.patch.object(cs.servers, 'iter_pages',
+                               wraps=cs.servers.iter_pages) as iter_pages:
+            output = utils.find_resources(
+                cs.servers, ['sample-server', 'sample-server2'])
+        self.assertEqual(['1234', '5678'], [s.id for s in output])
+        self.assertEqual([('GET', '/servers', None)], cs.client.callstack)
+        # all the pages are listed
+        iter_pages.assert_called_once_with(detailed=False)
+        # the details are loaded on first use
+        self.assertEqual('BUILD', output[0].status)
+        self.assertEqual(('GET', '/servers/1234', None),
+                         cs.client.callstack[-1])
+
+    def test_find_resources_many_names_all_tenants(self):
+        cs = v2_fakes.FakeClient(api_versions.APIVersion("2.53"))
+        names = ['sample-server%d' % i
+                 for i in range(utils.FIND_SEARCHES_MAX_NAMES + 1)]
+        names[0] = 'sample-server'
+        errors = {}
+        output = utils.find_resources(cs.servers, names, errors=errors,
+                                      all_tenants=1)
+        self.assertEqual('1234', output[0].id)
+        self.assertNotIn('sample-server', errors)
+        # the names are not searched one by one, the servers of every
+        # project are listed once
+        self.assertEqual([('GET', '/servers?all_tenants=1', None)],
+                         cs.client.callstack)
+
 
 class _FakeResult(object):
     def __init__(self, name, value):
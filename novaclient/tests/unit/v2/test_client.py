@@ -44,3 +44,8 @@ class ClientTest(utils.TestCase):
                           direct_use=False)
 
         self.assertEqual(endpoint_type, c.client.interface)
+
+    def test_lazy_load_invalid(self):
+        self.assertRaises(ValueError, client.Client,
+                          session=session.Session(), lazy_load='never',
+                          direct_use=False)
@@ -109,6 +109,16 @@ class HypervisorsTest(utils.FixturedTestCase):
         for idx, hyper in enumerate(result):
             self.compare_to_expected(expected[idx], hyper)
 
+    def test_hypervisor_detail_as_columns(self):
+        result = self.cs.hypervisors.list(
+            as_columns=True, fields=['id', 'hypervisor_hostname'])
+        self.assert_request_id(result, fakes.FAKE_REQUEST_ID_LIST)
+        self.assert_called('GET', '/os-hypervisors/detail')
+        self.assertEqual(
+            [(self.data_fixture.hyper_id_1, 'hyper1'),
+             (self.data_fixture.hyper_id_2, 'hyper2')],
+            result.records())
+
     def test_hypervisor_search(self):
         expected = [
             dict(id=self.data_fixture.hyper_id_1,
@@ -0,0 +1,140 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+from unittest import mock
+
+from novaclient import api_versions
+from novaclient import base
+from novaclient.tests.unit import utils
+from novaclient.tests.unit.v2 import fakes
+from novaclient.v2 import inventory
+from novaclient.v2 import servers
+
+
+def _server(manager, server_id, name, host='host1', tenant='t1',
+            ip='10.0.0.1', status='ACTIVE'):
+    return servers.Server(manager, {
+        'id': server_id,
+        'name': name,
+        'status': status,
+        'tenant_id': tenant,
+        'OS-EXT-SRV-ATTR:host': host,
+        'addresses': {'private': [{'addr': ip, 'version': 4}]},
+    }, loaded=True)
+
+
+class ServerInventoryTest(utils.TestCase):
+
+    def setUp(self):
+        super(ServerInventoryTest, self).setUp()
+        self.cs = fakes.FakeClient(api_versions.APIVersion("2.1"))
+        list_patch = mock.patch.object(self.cs.servers, 'list')
+        self.list = list_patch.start()
+        self.addCleanup(list_patch.stop)
+        self.now = datetime.datetime(2020, 1, 1, 12, 0, 0)
+        utcnow_patch = mock.patch('oslo_utils.timeutils.utcnow',
+                                  side_effect=lambda: self.now)
+        utcnow_patch.start()
+        self.addCleanup(utcnow_patch.stop)
+        self.inventory = inventory.ServerInventory(
+            self.cs, search_opts={'all_tenants': 1})
+
+    def _sync(self, *servers):
+        self.list.return_value = self.cs.servers._merge_identities(servers)
+        return self.inventory.sync()
+
+    def test_snapshot(self):
+        events = self._sync(_server(self.cs.servers, 'a', 'web'),
+                            _server(self.cs.servers, 'b', 'db',
+                                    host='host2', ip='10.0.0.2'))
+        self.list.assert_called_once_with(search_opts={'all_tenants': 1},
+                                          limit=-1)
+        self.assertEqual([inventory.CREATED] * 2, [e.type for e in events])
+        self.assertEqual(2, len(self.inventory))
+        self.assertEqual('web', self.inventory.get('a').name)
+        self.assertEqual(['b'],
+                         [s.id for s in self.inventory.find_by_name('db')])
+        self.assertEqual(['b'],
+                         [s.id for s in self.inventory.find_by_host('host2')])
+        self.assertEqual(['a'],
+                         [s.id for s in self.inventory.find_by_ip('10.0.0.1')])
+        self.assertEqual(['a', 'b'], sorted(
+            s.id for s in self.inventory.find_by_tenant('t1')))
+        self.assertEqual(self.now, self.inventory.last_sync)
+
+    def test_deltas(self):
+        self._sync(_server(self.cs.servers, 'a', 'web'),
+                   _server(self.cs.servers, 'b', 'db'))
+        self.now += datetime.timedelta(minutes=5)
+
+        events = self._sync(
+            # unchanged, fetched again because of the clock skew margin
+            _server(self.cs.servers, 'a', 'web'),
+            _server(self.cs.servers, 'b', 'db', host='host2'),
+            _server(self.cs.servers, 'c', 'cache'),
+            _server(self.cs.servers, 'd', 'gone', status='DELETED'))
+
+        since = (datetime.datetime(2020, 1, 1, 12, 0, 0) -
+                 inventory.DEFAULT_CLOCK_SKEW)
+        self.list.assert_called_with(
+            search_opts={'all_tenants': 1,
+                         'changes-since': since.isoformat()},
+            limit=-1)
+        self.assertEqual([(inventory.UPDATED, 'b'), (inventory.CREATED, 'c')],
+                         [(e.type, e.server.id) for e in events])
+        self.assertEqual('host1', getattr(events[0].previous,
+                                          'OS-EXT-SRV-ATTR:host'))
+        self.assertEqual(['b'],
+                         [s.id for s in self.inventory.find_by_host('host2')])
+        self.assertEqual(['a', 'c'], sorted(
+            s.id for s in self.inventory.find_by_host('host1')))
+
+        events = self._sync(_server(self.cs.servers, 'a', 'web',
+                                    status='DELETED'))
+        self.assertEqual([(inventory.DELETED, 'a')],
+                         [(e.type, e.server.id) for e in events])
+        self.assertNotIn('a', self.inventory)
+        self.assertEqual([], self.inventory.find_by_name('web'))
+        self.assertEqual(['b', 'c'], sorted(
+            s.id for s in self.inventory.find_by_ip('10.0.0.1')))
+
+    def test_identity_map(self):
+        # the listed servers are merged into the canonical ones in place
+        self.cs.identity_map = base.IdentityMap()
+        server = self._sync(_server(self.cs.servers, 'a', 'web'))[0].server
+        self.now += datetime.timedelta(minutes=5)
+
+        events = self._sync(_server(self.cs.servers, 'a', 'app',
+                                    host='host2'))
+        self.assertEqual([(inventory.UPDATED, 'a')],
+                         [(e.type, e.server.id) for e in events])
+        self.assertIs(server, events[0].server)
+        self.assertEqual('web', events[0].previous.name)
+        self.assertEqual('host1', getattr(events[0].previous,
+                                          'OS-EXT-SRV-ATTR:host'))
+        self.assertEqual([], self.inventory.find_by_name('web'))
+        self.assertEqual([server], self.inventory.find_by_name('app'))
+        self.assertEqual([server], self.inventory.find_by_host('host2'))
+        self.assertEqual([], self.inventory.find_by_host('host1'))
+
+    def test_watch(self):
+        self.list.side_effect = [
+            [_server(self.cs.servers, 'a', 'web')],
+            [],
+            [_server(self.cs.servers, 'b', 'db')],
+        ]
+        with mock.patch('time.sleep') as sleep:
+            events = self.inventory.watch(interval=30)
+            self.assertEqual('a', next(events).server.id)
+            self.assertEqual('b', next(events).server.id)
+        sleep.assert_has_calls([mock.call(30), mock.call(30)])
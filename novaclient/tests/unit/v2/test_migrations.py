@@ -10,7 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from unittest import mock
+
 from novaclient import api_versions
+from novaclient import exceptions
 from novaclient.tests.unit import utils
 from novaclient.tests.unit.v2 import fakes
 from novaclient.v2 import migrations
@@ -51,6 +54,11 @@ class MigrationsTest(utils.TestCase):
         self.assertEqual(1, len(ml))
         self.assertEqual('instance_id_456', ml[0].instance_uuid)
 
+    def test_iter_pages_limit_unsupported(self):
+        self.cs.api_version = api_versions.APIVersion("2.58")
+        self.assertRaises(exceptions.UnsupportedAttribute,
+                          self.cs.migrations.iter_pages, limit=10)
+
 
 class MigrationsV223Test(MigrationsTest):
     def setUp(self):
@@ -96,6 +104,24 @@ class MigrationsV259Test(MigrationsV223Test):
         for m in ms:
             self.assertIsInstance(m, migrations.Migration)
 
+    def test_iter_pages(self):
+        page1 = {'migrations': [{'uuid': 'a'}, {'uuid': 'b'}],
+                 'migrations_links': [{
+                     'rel': 'next',
+                     'href': 'http://nova/os-migrations?limit=2&marker=b'}]}
+        page2 = {'migrations': [{'uuid': 'c'}]}
+        resp = utils.TestResponse({'status_code': 200,
+                                   'headers': fakes.FAKE_RESPONSE_HEADERS})
+        with mock.patch.object(self.cs.client, 'get', side_effect=[
+                (resp, page1),
+                (resp, page2)]) as mock_get:
+            ms = self.cs.migrations.list_all(limit=2, host='host1')
+        self.assertEqual(['a', 'b', 'c'], [m.uuid for m in ms])
+        self.assert_request_id(ms, fakes.FAKE_REQUEST_ID_LIST)
+        mock_get.assert_has_calls([
+            mock.call('/os-migrations?host=host1&limit=2'),
+            mock.call('/os-migrations?host=host1&limit=2&marker=b')])
+
 
 class MigrationsV266Test(MigrationsV259Test):
     def setUp(self):
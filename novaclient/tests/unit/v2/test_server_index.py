@@ -0,0 +1,175 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import os
+from unittest import mock
+
+import fixtures
+
+from novaclient import api_versions
+from novaclient import exceptions
+from novaclient.tests.unit import utils
+from novaclient.tests.unit.v2 import fakes
+from novaclient import utils as novaclient_utils
+from novaclient.v2 import server_index
+from novaclient.v2 import servers
+
+
+class ServerIndexTest(utils.TestCase):
+
+    def setUp(self):
+        super(ServerIndexTest, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'index', 'servers.sqlite')
+        self.index = server_index.ServerIndex(self.path)
+        self.cs = fakes.FakeClient(api_versions.APIVersion("2.1"))
+        self.cs.server_index = self.index
+
+    def _server(self, info):
+        return servers.Server(self.cs.servers, info, loaded=True)
+
+    def test_list_populates_index(self):
+        self.cs.servers.list()
+        self.assertEqual(['1234'], self.index.find(name='sample-server'))
+        self.assertEqual(['5678', '9012'], self.index.find(ip='4.5.6.7'))
+        self.assertEqual(['5678'], self.index.find(ip='4.5.6.7',
+                                                   host='computenode2'))
+        self.assertEqual(['9014'], self.index.lookup('help'))
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_lookup_human_id(self):
+        self.index.update([self._server({'id': 'a', 'name': 'My Server',
+                                         'status': 'ACTIVE'})])
+        self.assertEqual(['a'], self.index.lookup('My Server'))
+        self.assertEqual(['a'], self.index.lookup('my-server'))
+        self.assertEqual([], self.index.lookup('other'))
+
+    def test_update(self):
+        self.index.update([self._server({
+            'id': 'a', 'name': 'web', 'status': 'ACTIVE', 'tenant_id': 't1',
+            'OS-EXT-SRV-ATTR:host': 'h1',
+            'addresses': {'private': [{'addr': '10.0.0.1'}]}})])
+        # listings which are not detailed only update the name
+        self.index.update([self._server({'id': 'a', 'name': 'web2'})])
+        self.assertEqual(['a'], self.index.find(name='web2', host='h1',
+                                                tenant_id='t1',
+                                                ip='10.0.0.1'))
+        self.index.update([self._server({'id': 'a', 'status': 'DELETED'})])
+        self.assertEqual([], self.index.find())
+
+    def test_update_keeps_missing_fields(self):
+        self.index.update([self._server({
+            'id': 'a', 'name': 'web', 'status': 'ACTIVE', 'tenant_id': 't1',
+            'OS-EXT-SRV-ATTR:host': 'h1',
+            'addresses': {'private': [{'addr': '10.0.0.1'}]}})])
+        # the host is only shown to administrators
+        self.index.update([self._server({'id': 'a', 'name': 'web',
+                                         'status': 'SHUTOFF',
+                                         'tenant_id': 't1'})])
+        self.assertEqual(['a'], self.index.find(name='web', host='h1',
+                                                ip='10.0.0.1'))
+
+    def test_projected_list_does_not_update_index(self):
+        self.cs.servers.list()
+        self.cs.servers.list(fields=['id', 'status'])
+        self.assertEqual(['1234'], self.index.find(name='sample-server'))
+        self.assertEqual(['5678', '9012'], self.index.find(ip='4.5.6.7'))
+
+    def test_sync(self):
+        manager = mock.Mock()
+        manager.list.return_value = [self._server(
+            {'id': 'a', 'name': 'web', 'status': 'ACTIVE'})]
+        self.index.update([self._server({'id': 'old', 'name': 'old',
+                                         'status': 'ACTIVE'})])
+        now = datetime.datetime(2020, 1, 1, 12, 0, 0)
+        with mock.patch('oslo_utils.timeutils.utcnow', return_value=now):
+            self.index.sync(manager, search_opts={'all_tenants': 1})
+        manager.list.assert_called_once_with(
+            search_opts={'all_tenants': 1}, limit=-1)
+        # the first sync replaces the content of the index
+        self.assertEqual(['a'], self.index.find())
+        self.assertEqual(now, self.index.last_sync)
+
+        manager.list.return_value = [self._server(
+            {'id': 'a', 'name': 'web', 'status': 'DELETED'})]
+        self.index.sync(manager, search_opts={'all_tenants': 1},
+                        clock_skew=datetime.timedelta(seconds=10))
+        manager.list.assert_called_with(
+            search_opts={'all_tenants': 1,
+                         'changes-since': '2020-01-01T11:59:50'},
+            limit=-1)
+        self.assertEqual([], self.index.find())
+
+    def test_find_resource_ignores_index_by_default(self):
+        self.cs.servers.list()
+        self.cs.client.callstack = []
+        server = novaclient_utils.find_resource(self.cs.servers,
+                                                'sample-server')
+        self.assertEqual('1234', server.id)
+        self.assertIn('/servers?name=sample-server',
+                      [call[1] for call in self.cs.client.callstack])
+
+    def test_find_resource_with_find_args_ignores_index(self):
+        self.index.resolve_names = True
+        self.cs.servers.list()
+        self.assertIsNone(self.cs.servers.find_in_index('sample-server',
+                                                        all_tenants=1))
+
+    def test_find_resource_uses_index(self):
+        self.index.resolve_names = True
+        self.cs.servers.list()
+        self.cs.client.callstack = []
+        server = novaclient_utils.find_resource(self.cs.servers,
+                                                'sample-server')
+        self.assertEqual('1234', server.id)
+        # a single detailed listing confirms the candidate of the index
+        self.assertEqual([('GET', '/servers/detail?name=sample-server',
+                           None)], self.cs.client.callstack)
+
+    def test_find_resource_stale_index(self):
+        self.index.resolve_names = True
+        self.index.update([self._server({'id': '4321', 'name': 'gone',
+                                         'status': 'ACTIVE'})])
+        self.assertIsNone(self.cs.servers.find_in_index('gone'))
+        self.assertNotIn('4321', self.index.find())
+
+    def test_find_resource_name_no_longer_unique(self):
+        # another client created a server with the name of an indexed one
+        self.index.resolve_names = True
+        self.index.update([self._server({'id': 'a', 'name': 'web',
+                                         'status': 'ACTIVE'})])
+        listing = [self._server({'id': 'a', 'name': 'web'}),
+                   self._server({'id': 'b', 'name': 'web'})]
+        with mock.patch.object(self.cs.servers, 'list',
+                               return_value=listing):
+            self.assertIsNone(self.cs.servers.find_in_index('web'))
+            self.assertRaises(exceptions.CommandError,
+                              novaclient_utils.find_resource,
+                              self.cs.servers, 'web')
+
+    def test_find_resource_ambiguous_index(self):
+        self.index.resolve_names = True
+        self.cs.servers.list()
+        self.index.update([self._server({'id': 'b', 'name': 'sample-server',
+                                         'status': 'ACTIVE'})])
+        self.cs.client.callstack = []
+        server = novaclient_utils.find_resource(self.cs.servers,
+                                                'sample-server')
+        # the index does not hold a single match, the API resolves the name
+        self.assertEqual('1234', server.id)
+        self.assertIn('/servers?name=sample-server',
+                      [call[1] for call in self.cs.client.callstack])
+
+    def test_index_disabled(self):
+        self.cs.server_index = None
+        self.assertIsNone(self.cs.servers.find_in_index('sample-server'))
@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import array
 import base64
 import io
 import os
@@ -19,6 +20,7 @@ import tempfile
 from unittest import mock
 
 from novaclient import api_versions
+from novaclient import base
 from novaclient import exceptions
 from novaclient.tests.unit.fixture_data import client
 from novaclient.tests.unit.fixture_data import floatingips
@@ -65,16 +67,132 @@ class ServersTest(utils.FixturedTestCase):
         sl = self.cs.servers.list(limit=-1, marker=1234)
         self.assert_request_id(sl, fakes.FAKE_REQUEST_ID_LIST)
 
-        self.assertEqual(2, len(sl))
+        self.assertEqual(3, len(sl))
 
         self.assertEqual(self.requests_mock.request_history[-2].method, 'GET')
         self.assertEqual(self.requests_mock.request_history[-2].path_url,
                          '/servers/detail?marker=1234')
+        # the last page has no next link, so no empty page is requested
         self.assert_called('GET', '/servers/detail?marker=5678')
 
         for s in sl:
             self.assertIsInstance(s, servers.Server)
 
+    @mock.patch.object(base, 'numpy', None)
+    def test_list_servers_as_columns(self):
+        cols = self.cs.servers.list(as_columns=True,
+                                    fields=['id', 'name', 'missing'])
+        self.assertIsInstance(cols, base.ColumnarList)
+        self.assert_request_id(cols, fakes.FAKE_REQUEST_ID_LIST)
+        self.assert_called('GET', '/servers/detail')
+        self.assertEqual(['id', 'name', 'missing'], cols.fields)
+        self.assertEqual(len(cols['id']), len(cols))
+        self.assertEqual([None] * len(cols), cols['missing'])
+        self.assertEqual(cols['name'],
+                         [r['name'] for r in cols.records(as_dict=True)])
+
+    @mock.patch.object(base, 'numpy', None)
+    def test_list_all_servers_as_columns(self):
+        cols = self.cs.servers.list(limit=-1, marker=1234, as_columns=True,
+                                    fields=['id'])
+        self.assertEqual(array.array('q', [1234, 5678, 9012]), cols['id'])
+        self.assertEqual([(1234,), (5678,), (9012,)], cols.records())
+        self.assert_request_id(cols, fakes.FAKE_REQUEST_ID_LIST)
+
+    def test_list_servers_fields(self):
+        sl = self.cs.servers.list(fields=['name', 'flavor.id'])
+        self.assert_request_id(sl, fakes.FAKE_REQUEST_ID_LIST)
+        for s in sl:
+            self.assertIsInstance(s, servers.Server)
+            self.assertEqual({'id', 'name', 'flavor'}, set(s._info))
+            self.assertEqual(['id'], list(s.flavor))
+            # the other fields are not lazy-loaded
+            self.assertRaises(AttributeError, getattr, s, 'status')
+
+    def test_list_servers_as_columns_sharded(self):
+        self.assertRaises(ValueError, self.cs.servers.list, as_columns=True,
+                          shard_by='host')
+
+    def test_iter_pages(self):
+        pages = self.cs.servers.iter_pages(marker=1234)
+        page = next(pages)
+        self.assertEqual([1234, 5678], [s.id for s in page])
+        self.assert_request_id(page, fakes.FAKE_REQUEST_ID_LIST)
+        self.assert_called('GET', '/servers/detail?marker=1234')
+
+        page = next(pages)
+        self.assertEqual([9012], [s.id for s in page])
+        self.assert_called('GET', '/servers/detail?marker=5678')
+        self.assertRaises(StopIteration, next, pages)
+        self.assertEqual(2, len([r for r in self.requests_mock.request_history
+                                 if 'marker' in r.path_url]))
+
+    def test_iter_pages_prefetch(self):
+        pages = list(self.cs.servers.iter_pages(marker=1234, prefetch=2))
+        self.assertEqual([[1234, 5678], [9012]],
+                         [[s.id for s in page] for page in pages])
+        self.assertEqual(2, len([r for r in self.requests_mock.request_history
+                                 if 'marker' in r.path_url]))
+
+    def test_iter_all(self):
+        sl = list(self.cs.servers.iter_all(marker=1234))
+        self.assertEqual([1234, 5678, 9012], [s.id for s in sl])
+        for s in sl:
+            self.assertIsInstance(s, servers.Server)
+
+    def test_list_servers_raw_body(self):
+        body = self.cs.servers.list(raw=base.RAW_BODY)
+        self.assertIsInstance(body, base.DictWithMeta)
+        self.assert_request_id(body, fakes.FAKE_REQUEST_ID_LIST)
+        self.assert_called('GET', '/servers/detail')
+        for s in body['servers']:
+            self.assertIsInstance(s, dict)
+
+    def test_list_servers_raw_bytes(self):
+        content = self.cs.servers.list(raw=base.RAW_BYTES)
+        self.assertIsInstance(content, base.RawResponse)
+        self.assertIsInstance(content, bytes)
+        self.assert_request_id(content, fakes.FAKE_REQUEST_ID_LIST)
+        self.assertEqual(200, content.status_code)
+        self.assertIn('x-openstack-request-id', content.headers)
+        self.assertEqual(self.cs.servers.list(raw=base.RAW_BODY),
+                         content.json())
+
+    def test_list_servers_raw_invalid(self):
+        self.assertRaises(ValueError, self.cs.servers.list, raw='objects')
+
+    def test_list_servers_raw_sharded(self):
+        self.assertRaises(ValueError, self.cs.servers.list,
+                          raw=base.RAW_BODY, shard_by='host')
+
+    def test_list_all_servers_raw(self):
+        for raw in base.RAW_MODES:
+            pages = self.cs.servers.list(limit=-1, marker=1234, raw=raw)
+            self.assert_request_id(pages, fakes.FAKE_REQUEST_ID_LIST)
+            if raw == base.RAW_BYTES:
+                pages = [page.json() for page in pages]
+            self.assertEqual([[1234, 5678], [9012]],
+                             [[s['id'] for s in page['servers']]
+                              for page in pages])
+
+    def test_iter_pages_raw_bytes(self):
+        pages = list(self.cs.servers.iter_pages(marker=1234,
+                                                raw=base.RAW_BYTES))
+        self.assertEqual([[1234, 5678], [9012]],
+                         [[s['id'] for s in page.json()['servers']]
+                          for page in pages])
+        self.assertEqual(2, len([r for r in self.requests_mock.request_history
+                                 if 'marker' in r.path_url]))
+
+    def test_get_server_raw(self):
+        body = self.cs.servers.get(1234, raw=base.RAW_BODY)
+        self.assertIsInstance(body, base.DictWithMeta)
+        self.assertEqual(1234, body['server']['id'])
+        self.assert_request_id(body, fakes.FAKE_REQUEST_ID_LIST)
+        content = self.cs.servers.get(1234, raw=base.RAW_BYTES)
+        self.assertEqual(dict(body), content.json())
+        self.assert_called('GET', '/servers/1234')
+
     def test_filter_servers_unlocked(self):
         # calling the cs.servers.list python binding
         # will fail before 2.73 microversion.
@@ -500,6 +618,19 @@ class ServersTest(utils.FixturedTestCase):
         self.assert_request_id(sl, fakes.FAKE_REQUEST_ID_LIST)
         self.assertEqual([1234, 5678, 9012], [s.id for s in sl])
 
+    def test_findall_filters_pushdown(self):
+        sl = self.cs.servers.findall(status='ACTIVE', host='computenode2')
+        self.assert_called('GET',
+                           '/servers/detail?host=computenode2&status=ACTIVE')
+        # the API filters are also matched locally when possible
+        self.assertEqual([5678], [s.id for s in sl])
+
+    def test_findall_filters_unsupported_version(self):
+        self.cs.api_version = api_versions.APIVersion('2.25')
+        sl = self.cs.servers.findall(tags='tag1')
+        self.assert_called('GET', '/servers/detail')
+        self.assertEqual([], sl)
+
     def test_reboot_server(self):
         s = self.cs.servers.get(1234)
         ret = s.reboot()
@@ -1246,6 +1377,10 @@ class ServersV226Test(ServersV225Test):
 
     api_version = "2.26"
 
+    def test_findall_tags(self):
+        self.cs.servers.findall(tags='tag1')
+        self.assert_called('GET', '/servers/detail?tags=tag1')
+
     def test_tag_list(self):
         s = self.cs.servers.get(1234)
         ret = s.tag_list()
@@ -2105,3 +2240,94 @@ class ServersV291Test(ServersV290Test):
             '/servers/1234/action',
             {'unshelve': {'host': 'server1',
                           'availability_zone': None}})
+
+
+class ServersShardedListTest(utils.TestCase):
+
+    def setUp(self):
+        super(ServersShardedListTest, self).setUp()
+        self.cs = fakes.FakeClient(api_versions.APIVersion('2.66'))
+
+    def _servers(self, *infos):
+        return base.ListWithMeta(
+            [servers.Server(self.cs.servers, info, loaded=True)
+             for info in infos], None)
+
+    def test_list_sharded_by_host(self):
+        sl = self.cs.servers.list(search_opts={'all_tenants': 1},
+                                  shard_by='host')
+        # both fake services are on host1, so a single shard is listed
+        self.assertEqual(
+            ['/os-services?binary=nova-compute',
+             '/servers/detail?all_tenants=1&host=host1'],
+            [call[1] for call in self.cs.client.callstack])
+        self.assertEqual(['1234', '5678', '9012', '9013', '9014'],
+                         [s.id for s in sl])
+
+    def test_list_sharded_by_tenant(self):
+        sl = self.cs.servers.list(search_opts={'all_tenants': 1},
+                                  shard_by='tenant_id',
+                                  shards=['t1', 't2', 't1'])
+        self.assertEqual(
+            ['/servers/detail?all_tenants=1&tenant_id=t1',
+             '/servers/detail?all_tenants=1&tenant_id=t2'],
+            sorted(call[1] for call in self.cs.client.callstack))
+        # servers found in several shards are only returned once
+        self.assertEqual(['1234', '5678', '9012', '9013', '9014'],
+                         [s.id for s in sl])
+
+    def test_list_sharded_by_time_windows(self):
+        self.cs.servers.list(
+            search_opts={'changes-since': '2020-01-01T00:00:00Z',
+                         'changes-before': '2020-01-03T00:00:00Z'},
+            shard_by='changes-since', shards=2)
+        self.assertEqual(
+            ['/servers/detail?changes-before=2020-01-02T00%3A00%3A00%2B00'
+             '%3A00&changes-since=2020-01-01T00%3A00%3A00%2B00%3A00',
+             '/servers/detail?changes-before=2020-01-03T00%3A00%3A00Z&'
+             'changes-since=2020-01-02T00%3A00%3A00%2B00%3A00'],
+            sorted(call[1] for call in self.cs.client.callstack))
+
+    def test_list_sharded_by_time_windows_boundaries(self):
+        self.cs.servers.list(shard_by='changes-since',
+                             shards=['2020-01-01', '2020-01-02'])
+        self.cs.assert_called(
+            'GET', '/servers/detail?changes-before=2020-01-02&'
+                   'changes-since=2020-01-01')
+
+    def test_list_sharded_sorted(self):
+        shards = {
+            'h1': self._servers({'id': 'a', 'name': 'x', 'created': '3'},
+                                {'id': 'b', 'name': 'x', 'created': '1'}),
+            'h2': self._servers({'id': 'e', 'name': None, 'created': '0'},
+                                {'id': 'd', 'name': 'x', 'created': '2'},
+                                {'id': 'c', 'name': 'y', 'created': '2'}),
+        }
+
+        def list_all(search_opts, **kwargs):
+            return shards[search_opts['host']]
+
+        with mock.patch.object(self.cs.servers, 'list_all',
+                               side_effect=list_all):
+            sl = self.cs.servers.list(shard_by='host', shards=['h1', 'h2'],
+                                      sort_keys=['display_name',
+                                                 'created_at'],
+                                      sort_dirs=['asc', 'desc'])
+        self.assertEqual(['e', 'a', 'd', 'b', 'c'], [s.id for s in sl])
+
+    def test_list_sharded_invalid(self):
+        self.assertRaises(ValueError, self.cs.servers.list,
+                          shard_by='host', marker='1234')
+        self.assertRaises(ValueError, self.cs.servers.list,
+                          shard_by='flavor')
+        self.assertRaises(ValueError, self.cs.servers.list,
+                          shard_by='tenant_id')
+        self.assertRaises(ValueError, self.cs.servers.list, shard_by='host',
+                          search_opts={'host': 'h1'})
+        self.assertRaises(ValueError, self.cs.servers.list,
+                          detailed=False, shard_by='host', shards=['h1'],
+                          sort_keys=['created_at'])
+        self.cs.api_version = api_versions.APIVersion('2.65')
+        self.assertRaises(exceptions.UnsupportedAttribute,
+                          self.cs.servers.list, shard_by='changes-since',
+                          shards=['2020-01-01', '2020-01-02'])
@@ -117,6 +117,13 @@ class ShellTest(utils.TestCase):
     def assert_not_called(self, method, url, body=None):
         return self.shell.cs.assert_not_called(method, url, body)
 
+    def assert_called_unordered(self, calls, pos):
+        """Assert the (method, url) calls made concurrently from pos."""
+        end = pos + len(calls) or None
+        called = self.shell.cs.client.callstack[pos:end]
+        self.assertEqual(sorted(calls),
+                         sorted(call[0:2] for call in called))
+
     def test_agents_list_with_hypervisor(self):
         _, err = self.run_command('agent-list --hypervisor xen')
         self.assert_called('GET', '/os-agents?hypervisor=xen')
@@ -1820,6 +1827,25 @@ class ShellTest(utils.TestCase):
         self.assertIn('10.11.12.13', output)
         self.assertIn('5.6.7.8', output)
 
+    def test_list_compact_resources(self):
+        def compact_client(*args, **kwargs):
+            cs = fakes.FakeClient(*args, **kwargs)
+            cs.compact_resources = True
+            return cs
+
+        for cmd, api_version in (
+                ('list', None),
+                ('list --fields host,power_state,task_state', None),
+                ('list', '2.47'),
+                ('list --fields flavor:name,host', '2.47'),
+                ('availability-zone-list', None)):
+            expected, _err = self.run_command(cmd, api_version=api_version)
+            with mock.patch('novaclient.client.Client', compact_client):
+                output, _err = self.run_command(cmd,
+                                                api_version=api_version)
+            self.assertTrue(self.shell.cs.servers.api.compact_resources)
+            self.assertEqual(expected, output)
+
     @mock.patch(
         'novaclient.tests.unit.v2.fakes.FakeSessionClient.get_servers_detail')
     def test_list_fields_no_instances(self, mock_get_servers_detail):
@@ -1856,6 +1882,35 @@ class ShellTest(utils.TestCase):
         self.run_command('list --limit 3')
         self.assert_called('GET', '/servers/detail?limit=3')
 
+    def test_list_shard_by_tenant(self):
+        self.run_command('list --all-tenants --shard-by tenant_id '
+                         '--shards t1,t2')
+        self.assertEqual(
+            ['/servers/detail?all_tenants=1&tenant_id=t1',
+             '/servers/detail?all_tenants=1&tenant_id=t2'],
+            sorted(call[1] for call in self.shell.cs.client.callstack))
+
+    def test_list_shard_by_time_windows(self):
+        self.run_command('list --shard-by changes-since --shards 2 '
+                         '--changes-since 2016-02-29T00:00:00Z '
+                         '--changes-before 2016-03-02T00:00:00Z',
+                         api_version='2.66')
+        self.assert_called_anytime(
+            'GET', '/servers/detail?changes-before=2016-03-02T00%3A00%3A00Z'
+                   '&changes-since=2016-03-01T00%3A00%3A00%2B00%3A00')
+
+    def test_list_shard_by_with_limit(self):
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'list --shard-by host --limit 3')
+
+    def test_list_shards_without_shard_by(self):
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'list --shards h1')
+
+    def test_list_shard_by_tenant_without_shards(self):
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'list --shard-by tenant_id')
+
     def test_list_with_changes_since(self):
         self.run_command('list --changes-since 2016-02-29T06:23:22')
         self.assert_called(
@@ -2519,11 +2574,11 @@ class ShellTest(utils.TestCase):
 
     def test_show(self):
         self.run_command('show 1234')
-        self.assert_called('GET', '/servers?name=1234', pos=0)
-        self.assert_called('GET', '/servers?name=1234', pos=1)
-        self.assert_called('GET', '/servers/1234', pos=2)
-        self.assert_called('GET', '/flavors/1', pos=3)
-        self.assert_called('GET', '/v2/images/%s' % FAKE_UUID_2, pos=4)
+        self.assert_called_unordered([('GET', '/servers?name=1234'),
+                                      ('GET', '/servers/1234')], pos=0)
+        self.assert_called('GET', '/flavors/1', pos=2)
+        self.assert_called('GET', '/v2/images/%s' % FAKE_UUID_2, pos=3)
+        self.assertEqual(4, len(self.shell.cs.client.callstack))
 
     def test_show_no_image(self):
         self.run_command('show 9012')
@@ -2536,10 +2591,12 @@ class ShellTest(utils.TestCase):
 
     def test_show_unavailable_image_and_flavor(self):
         output, _ = self.run_command('show 9013')
-        self.assert_called('GET', '/servers/9013', pos=-6)
+        self.assert_called_unordered([('GET', '/servers?name=9013'),
+                                      ('GET', '/servers/9013')], pos=-5)
         self.assert_called('GET',
                            '/flavors/80645cf4-6ad3-410a-bbc8-6f3e1e291f51',
-                           pos=-5)
+                           pos=-3)
+        self.assert_called('GET', '/flavors?is_public=None', pos=-2)
         self.assert_called('GET',
                            '/v2/images/3e861307-73a6-4d1f-8d68-f68b03223032',
                            pos=-1)
@@ -2548,25 +2605,24 @@ class ShellTest(utils.TestCase):
 
     def test_show_with_name_help(self):
         output, _ = self.run_command('show help')
-        self.assert_called('GET', '/servers/9014', pos=-6)
+        self.assert_called('GET', '/servers?name=help', pos=-5)
+        self.assert_called('GET', '/servers/9014', pos=-4)
 
     def test_show_with_server_groups_in_response(self):
         # Starting microversion 2.71, the 'server_groups' is included
         # in the output (the response).
         out = self.run_command('show 1234', api_version='2.71')[0]
-        self.assert_called('GET', '/servers?name=1234', pos=0)
-        self.assert_called('GET', '/servers?name=1234', pos=1)
-        self.assert_called('GET', '/servers/1234', pos=2)
-        self.assert_called('GET', '/v2/images/%s' % FAKE_UUID_2, pos=3)
+        self.assert_called_unordered([('GET', '/servers?name=1234'),
+                                      ('GET', '/servers/1234')], pos=0)
+        self.assert_called('GET', '/v2/images/%s' % FAKE_UUID_2, pos=2)
         self.assertIn('server_groups', out)
         self.assertIn('a67359fb-d397-4697-88f1-f55e3ee7c499', out)
 
     def test_show_without_server_groups_in_response(self):
         out = self.run_command('show 1234', api_version='2.70')[0]
-        self.assert_called('GET', '/servers?name=1234', pos=0)
-        self.assert_called('GET', '/servers?name=1234', pos=1)
-        self.assert_called('GET', '/servers/1234', pos=2)
-        self.assert_called('GET', '/v2/images/%s' % FAKE_UUID_2, pos=3)
+        self.assert_called_unordered([('GET', '/servers?name=1234'),
+                                      ('GET', '/servers/1234')], pos=0)
+        self.assert_called('GET', '/v2/images/%s' % FAKE_UUID_2, pos=2)
         self.assertNotIn('server_groups', out)
         self.assertNotIn('a67359fb-d397-4697-88f1-f55e3ee7c499', out)
 
@@ -2607,31 +2663,47 @@ class ShellTest(utils.TestCase):
                            pos=2)
 
     def test_delete_two_with_two_existent(self):
+        # the servers are searched by name concurrently
         self.run_command('delete 1234 5678')
-        self.assert_called('DELETE', '/servers/1234', pos=-5)
+        self.assert_called_unordered([('GET', '/servers?name=1234'),
+                                      ('GET', '/servers?name=5678'),
+                                      ('GET', '/servers/1234'),
+                                      ('GET', '/servers/5678')], pos=0)
+        self.assert_called('DELETE', '/servers/1234', pos=-2)
         self.assert_called('DELETE', '/servers/5678', pos=-1)
         self.run_command('delete sample-server sample-server2')
-        self.assert_called('GET',
-                           '/servers?name=sample-server', pos=-6)
-        self.assert_called('GET', '/servers/1234', pos=-5)
-        self.assert_called('DELETE', '/servers/1234', pos=-4)
-        self.assert_called('GET',
-                           '/servers?name=sample-server2',
-                           pos=-3)
-        self.assert_called('GET', '/servers/5678', pos=-2)
+        self.assert_called_unordered([('GET', '/servers?name=sample-server'),
+                                      ('GET', '/servers?name=sample-server2'),
+                                      ('GET', '/servers/1234'),
+                                      ('GET', '/servers/5678')], pos=0)
+        self.assert_called('DELETE', '/servers/1234', pos=-2)
         self.assert_called('DELETE', '/servers/5678', pos=-1)
 
     def test_delete_two_with_two_existent_all_tenants(self):
         self.run_command('delete sample-server sample-server2 --all-tenants')
-        self.assert_called('GET',
-                           '/servers?all_tenants=1&name=sample-server', pos=0)
-        self.assert_called('GET', '/servers/1234', pos=1)
-        self.assert_called('DELETE', '/servers/1234', pos=2)
-        self.assert_called('GET',
-                           '/servers?all_tenants=1&name=sample-server2',
-                           pos=3)
-        self.assert_called('GET', '/servers/5678', pos=4)
-        self.assert_called('DELETE', '/servers/5678', pos=5)
+        self.assert_called_unordered(
+            [('GET', '/servers?all_tenants=1&name=sample-server'),
+             ('GET', '/servers?all_tenants=1&name=sample-server2'),
+             ('GET', '/servers/1234'),
+             ('GET', '/servers/5678')], pos=0)
+        self.assert_called('DELETE', '/servers/1234', pos=-2)
+        self.assert_called('DELETE', '/servers/5678', pos=-1)
+
+    def test_delete_reports_missing_servers_together(self):
+        out, _ = self.run_command(
+            'delete sample-server nonexistent-server1 nonexistent-server2',
+            expected_error=exceptions.CommandError)
+        self.assert_called_unordered(
+            [('GET', '/servers?name=sample-server'),
+             ('GET', '/servers?name=nonexistent-server1'),
+             ('GET', '/servers?name=nonexistent-server2'),
+             ('GET', '/servers/1234')], pos=0)
+        self.assert_called('DELETE', '/servers/1234', pos=-1)
+        self.assertEqual(5, len(self.shell.cs.client.callstack))
+        self.assertIn("No server with a name or ID of 'nonexistent-server1' "
+                      "exists.", out)
+        self.assertIn("No server with a name or ID of 'nonexistent-server2' "
+                      "exists.", out)
 
     def test_delete_two_with_one_nonexistent(self):
         cmd = 'delete 1234 123456789'
@@ -4845,10 +4917,9 @@ class ShellTest(utils.TestCase):
             stdout,
         )
         FAKE_UUID_2 = 'c99d7632-bd66-4be9-aed5-3dd14b223a76'
-        self.assert_called('GET', '/servers?name=9015', pos=0)
-        self.assert_called('GET', '/servers?name=9015', pos=1)
-        self.assert_called('GET', '/servers/9015', pos=2)
-        self.assert_called('GET', '/v2/images/%s' % FAKE_UUID_2, pos=3)
+        self.assert_called_unordered([('GET', '/servers?name=9015'),
+                                      ('GET', '/servers/9015')], pos=0)
+        self.assert_called('GET', '/v2/images/%s' % FAKE_UUID_2, pos=2)
 
     def test_list_pre_v273(self):
         exp = self.assertRaises(SystemExit,
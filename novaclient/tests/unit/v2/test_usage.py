@@ -12,6 +12,7 @@
 #    under the License.
 
 import datetime
+from unittest import mock
 
 from novaclient import api_versions
 from novaclient.tests.unit import utils
@@ -120,3 +121,28 @@ class UsageV40Test(UsageTest):
             ('end=%s&' % now.isoformat()) +
             ('limit=3&marker=some-uuid'))
         self.assertIsInstance(u, usage.Usage)
+
+    def test_usage_list_all_merges_tenants(self):
+        now = datetime.datetime.now()
+        page1 = {'tenant_usages': [
+            {'tenant_id': 't1', 'total_hours': 1, 'server_usages': ['a']},
+            {'tenant_id': 't2', 'total_hours': 2, 'server_usages': ['b']}],
+            'tenant_usages_links': [{
+                'rel': 'next',
+                'href': 'http://nova/os-simple-tenant-usage?marker=b'}]}
+        page2 = {'tenant_usages': [
+            {'tenant_id': 't2', 'total_hours': 3, 'server_usages': ['c']}]}
+        resp = utils.TestResponse({'status_code': 200,
+                                   'headers': fakes.FAKE_RESPONSE_HEADERS})
+        with mock.patch.object(self.cs.client, 'get', side_effect=[
+                (resp, page1), (resp, page2)]) as mock_get:
+            usages = self.cs.usage.list_all(now, now, detailed=True)
+
+        query = '/os-simple-tenant-usage?start=%s&end=%s&detailed=1' % (
+            now.isoformat(), now.isoformat())
+        mock_get.assert_has_calls([mock.call(query),
+                                   mock.call(query + '&marker=b')])
+        self.assertEqual(['t1', 't2'], [u.tenant_id for u in usages])
+        self.assertEqual(5, usages[1].total_hours)
+        self.assertEqual(['b', 'c'], usages[1].server_usages)
+        self.assert_request_id(usages, fakes.FAKE_REQUEST_ID_LIST)
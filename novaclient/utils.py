@@ -11,10 +11,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+from concurrent import futures
 import contextlib
+import functools
 import os
 import re
 import textwrap
+import threading
 import time
 from urllib import parse
 
@@ -29,6 +33,17 @@ from novaclient.i18n import _
 
 VALID_KEY_REGEX = re.compile(r"[\w\.\- :]+$", re.UNICODE)
 
+# Seconds the ID of an entity resolved by find_resource is cached for, the
+# cache is disabled by default
+DEFAULT_RESOLUTION_CACHE_TTL = 0
+
+# Concurrent requests of find_resources
+DEFAULT_FIND_WORKERS = 8
+
+# Names which find_resources searches one by one, when the API filters the
+# listings by name, rather than listing all the entities
+FIND_SEARCHES_MAX_NAMES = 8
+
 
 def env(*args, **kwargs):
     """Returns the first environment variable set.
@@ -236,18 +251,111 @@ def print_dict(d, dict_property="Property", dict_value="Value", wrap=0):
     print(result)
 
 
+class ResolutionCache(object):
+    """IDs of the entities recently resolved by name by :func:`find_resource`.
+
+    Repeated lookups of the same name only get the entity by its cached ID
+    for ``ttl`` seconds, instead of searching the name again. The entities
+    themselves are never cached. The cache is cleared when an entity is
+    deleted through the client.
+
+    :param ttl: seconds an ID is cached for, 0 disables the cache
+    :param max_size: number of cached IDs
+    """
+
+    def __init__(self, ttl=DEFAULT_RESOLUTION_CACHE_TTL, max_size=256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _get_resolution_cache(manager, name_or_id, find_args):
+    cache = getattr(getattr(manager, 'api', None), 'resolution_cache', None)
+    if not isinstance(cache, ResolutionCache) or not cache.ttl:
+        return None, None
+    key = (type(manager), str(manager.api_version), name_or_id,
+           tuple(sorted(find_args.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None, None
+    return cache, key
+
+
 def find_resource(manager, name_or_id, wrap_exception=True, **find_args):
-    """Helper for the _find_* methods."""
-    # for str id which is not uuid (for Flavor, Keypair and hypervsior in cells
-    # environments search currently)
-    if getattr(manager, 'is_alphanum_id_allowed', False):
-        try:
-            return manager.get(name_or_id)
-        except exceptions.NotFound:
-            pass
+    """Helper for the _find_* methods.
+
+    The name and the human_id are searched in a single listing, which runs
+    concurrently with the lookup by integer ID. The ID of an entity resolved
+    by name is kept in the resolution cache of the client, when enabled.
+    """
+    cache, cache_key = _get_resolution_cache(manager, name_or_id, find_args)
+    if cache is not None:
+        resource_id = cache.get(cache_key)
+        if resource_id is not None:
+            resource = _get_resolved(manager, name_or_id, resource_id)
+            if resource is not None:
+                return resource
+            cache.discard(cache_key)
+    resource = _find_resource(manager, name_or_id, wrap_exception, find_args)
+    if cache is not None:
+        resource_id = getattr(resource, 'id', None)
+        if resource_id is not None and str(resource_id) != str(name_or_id):
+            cache.set(cache_key, resource_id)
+    return resource
+
+
+def _get_resolved(manager, name_or_id, resource_id):
+    """Get an entity by the cached ID of its name, if it still has it."""
+    try:
+        resource = manager.get(resource_id)
+    except exceptions.NotFound:
+        return None
+    name_attr = getattr(manager.resource_class, 'NAME_ATTR', 'name')
+    if name_or_id in (getattr(resource, name_attr, None),
+                      getattr(resource, 'human_id', None)):
+        return resource
+    return None
 
-    # first try to get entity as uuid
+
+def _find_resource(manager, name_or_id, wrap_exception, find_args):
+    # first try to get entity as alphanumeric id (for str id which is not
+    # uuid: Flavor, Keypair and hypervsior in cells environments search
+    # currently) or as uuid
+    alphanum_id_allowed = getattr(manager, 'is_alphanum_id_allowed', False)
     try:
+        if alphanum_id_allowed:
+            return manager.get(name_or_id)
+
         tmp_id = encodeutils.safe_encode(name_or_id)
 
         tmp_id = tmp_id.decode()
@@ -257,41 +365,254 @@ def find_resource(manager, name_or_id, wrap_exception=True, **find_args):
     except (TypeError, exceptions.NotFound):
         pass
 
-    # then try to get entity as name
+    # then try to resolve the name from a local index of the entities
+    find_in_index = getattr(manager, 'find_in_index', None)
+    if find_in_index is not None:
+        resource = find_in_index(name_or_id, **find_args)
+        if resource is not None:
+            return resource
+
+    # then try to find entity by name or human_id, and else to get it as
+    # integer id
+    lookups = [functools.partial(manager.find_name_or_human_id, name_or_id,
+                                 **find_args)]
     try:
+        int_id = int(name_or_id)
+    except (TypeError, ValueError):
+        pass
+    else:
+        # the lookup by alphanumeric id already got the integer id
+        if not (alphanum_id_allowed and str(int_id) == str(name_or_id)):
+            lookups.append(functools.partial(manager.get, int_id))
+
+    if len(lookups) > 1:
+        # NOTE: the lookups are independent, run them concurrently and use
+        # the result of the first one which finds the entity, so that the
+        # name keeps precedence over the integer id
+        with futures.ThreadPoolExecutor(max_workers=len(lookups)) as executor:
+            lookups = [executor.submit(lookup).result for lookup in lookups]
+
+    for lookup in lookups:
         try:
-            resource = getattr(manager, 'resource_class', None)
-            name_attr = resource.NAME_ATTR if resource else 'name'
-            kwargs = {name_attr: name_or_id}
-            kwargs.update(find_args)
-            return manager.find(**kwargs)
+            return lookup()
         except exceptions.NotFound:
             pass
+        except exceptions.NoUniqueMatch:
+            msg = (_("Multiple %(class)s matches found for '%(name)s', use "
+                     "an ID to be more specific.") %
+                   {'class': manager.resource_class.__name__.lower(),
+                    'name': name_or_id})
+            if wrap_exception:
+                raise exceptions.CommandError(msg)
+            raise exceptions.NoUniqueMatch(msg)
+
+    msg = (_("No %(class)s with a name or ID of '%(name)s' exists.") %
+           {'class': manager.resource_class.__name__.lower(),
+            'name': name_or_id})
+    if wrap_exception:
+        raise exceptions.CommandError(msg)
+    raise exceptions.NotFound(404, msg)
+
+
+def find_resources(manager, names_or_ids, wrap_exception=True, errors=None,
+                   **find_args):
+    """Helper resolving many names or IDs, like find_resource.
+
+    The UUIDs are got concurrently. The other names and IDs are resolved by
+    find_resource concurrently when the API filters the listings by name
+    and there are at most ``FIND_SEARCHES_MAX_NAMES`` of them. Otherwise,
+    they are all searched in a single listing of all the pages, which is
+    not detailed when the manager supports it: the entities found in such a
+    listing load their details on first use. That listing is not bounded by
+    the names: it walks all the entities in the scope of ``find_args``,
+    e.g. the servers of every project with ``all_tenants``, so resolving
+    more names than ``FIND_SEARCHES_MAX_NAMES`` costs a listing of the
+    whole scope.
+
+    :param names_or_ids: names or IDs of the entities
+    :param errors: dict receiving the exception of each name or ID which is
+                   missing, ambiguous or failed to be resolved, instead of
+                   raising a single exception reporting all of them
+    :returns: list of the entities in the order of ``names_or_ids``, with
+              None for the names or IDs stored in ``errors``
+    """
+    found, missing, ambiguous, failures = _find_resources(
+        manager, names_or_ids, find_args)
+    if failures and errors is None:
+        raise next(iter(failures.values()))
+    class_name = manager.resource_class.__name__.lower()
+    messages = {}
+    for name_or_id in missing:
+        messages[name_or_id] = (
+            _("No %(class)s with a name or ID of '%(name)s' exists.") %
+            {'class': class_name, 'name': name_or_id})
+    for name_or_id in ambiguous:
+        messages[name_or_id] = (
+            _("Multiple %(class)s matches found for '%(name)s', use an ID "
+              "to be more specific.") %
+            {'class': class_name, 'name': name_or_id})
+
+    def error(msg, name_or_id=None):
+        if wrap_exception:
+            return exceptions.CommandError(msg)
+        if name_or_id in ambiguous or (name_or_id is None and ambiguous):
+            return exceptions.NoUniqueMatch(msg)
+        return exceptions.NotFound(404, msg)
+
+    if errors is not None:
+        errors.update(failures)
+        for name_or_id, msg in messages.items():
+            errors[name_or_id] = error(msg, name_or_id)
+    elif messages:
+        raise error('\n'.join(messages[name_or_id]
+                              for name_or_id in names_or_ids
+                              if name_or_id in messages))
+    return [found.get(name_or_id) for name_or_id in names_or_ids]
+
+
+def _find_resources(manager, names_or_ids, find_args):
+    """Get the entities found, the missing and the ambiguous names or IDs,
+    and the exceptions raised resolving the other ones.
+    """
+    names_or_ids = list(collections.OrderedDict.fromkeys(names_or_ids))
+    uuids = []
+    others = []
+    for name_or_id in names_or_ids:
+        try:
+            is_uuid = uuidutils.is_uuid_like(
+                encodeutils.safe_encode(name_or_id).decode())
+        except TypeError:
+            is_uuid = False
+        (uuids if is_uuid else others).append(name_or_id)
 
-        # then try to find entity by human_id
+    def get(name_or_id):
         try:
-            return manager.find(human_id=name_or_id, **find_args)
+            return manager.get(name_or_id)
         except exceptions.NotFound:
-            pass
-    except exceptions.NoUniqueMatch:
-        msg = (_("Multiple %(class)s matches found for '%(name)s', use an ID "
-                 "to be more specific.") %
-               {'class': manager.resource_class.__name__.lower(),
-                'name': name_or_id})
-        if wrap_exception:
-            raise exceptions.CommandError(msg)
-        raise exceptions.NoUniqueMatch(msg)
+            return None
+        except Exception as e:
+            return e
 
-    # finally try to get entity as integer id
-    try:
-        return manager.get(int(name_or_id))
-    except (TypeError, ValueError, exceptions.NotFound):
-        msg = (_("No %(class)s with a name or ID of '%(name)s' exists.") %
-               {'class': manager.resource_class.__name__.lower(),
-                'name': name_or_id})
-        if wrap_exception:
-            raise exceptions.CommandError(msg)
-        raise exceptions.NotFound(404, msg)
+    def find(name_or_id, by_name=False):
+        try:
+            if by_name:
+                # NOTE: the entity was not found by ID, do not get it again
+                return manager.find_name_or_human_id(name_or_id,
+                                                     **find_args)
+            return find_resource(manager, name_or_id, wrap_exception=False,
+                                 **find_args)
+        except exceptions.NoUniqueMatch:
+            return exceptions.NoUniqueMatch
+        except exceptions.NotFound:
+            return None
+        except Exception as e:
+            return e
+
+    searches = []
+    listing = None
+    with futures.ThreadPoolExecutor(
+            max_workers=DEFAULT_FIND_WORKERS) as executor:
+        if len(others) == 1 or (
+                len(others) <= FIND_SEARCHES_MAX_NAMES and
+                _searches_by_name(manager)):
+            # NOTE: find_resource uses a listing filtered by the name
+            searches = [(name_or_id, executor.submit(find, name_or_id))
+                        for name_or_id in others]
+        elif others:
+            listing = executor.submit(_list_candidates, manager, find_args)
+        gets = [(uuid, executor.submit(get, uuid)) for uuid in uuids]
+
+    found = {}
+    missing = []
+    ambiguous = []
+    failures = {}
+
+    def record(name_or_id, result):
+        if result is None:
+            missing.append(name_or_id)
+        elif result is exceptions.NoUniqueMatch:
+            ambiguous.append(name_or_id)
+        elif isinstance(result, Exception):
+            failures[name_or_id] = result
+        else:
+            found[name_or_id] = result
+
+    for uuid, future in gets:
+        resource = future.result()
+        if resource is not None:
+            record(uuid, resource)
+        elif listing is not None:
+            # the name of an entity may look like a uuid
+            others.append(uuid)
+        else:
+            record(uuid, find(uuid, by_name=True))
+    for name_or_id, future in searches:
+        record(name_or_id, future.result())
+    if listing is not None:
+        match = _candidates_matcher(manager, listing.result())
+        for name_or_id in others:
+            record(name_or_id, match(name_or_id))
+    return found, missing, ambiguous, failures
+
+
+def _candidates_matcher(manager, candidates):
+    """Get a function matching a name or ID with the candidates.
+
+    The function returns the single match, NoUniqueMatch or None.
+    """
+    name_attr = getattr(manager.resource_class, 'NAME_ATTR', 'name')
+    indexes = {'id': collections.defaultdict(list),
+               'name': collections.defaultdict(list),
+               'human_id': collections.defaultdict(list)}
+    for candidate in candidates:
+        indexes['id'][str(candidate.id)].append(candidate)
+        for index, attr in (('name', name_attr), ('human_id', 'human_id')):
+            value = getattr(candidate, attr, None)
+            if value is not None:
+                indexes[index][value].append(candidate)
+    # the precedence of find_resource
+    if getattr(manager, 'is_alphanum_id_allowed', False):
+        order = ('id', 'name', 'human_id')
+    else:
+        order = ('name', 'human_id', 'id')
+
+    def match(name_or_id):
+        for index in order:
+            key = str(name_or_id) if index == 'id' else name_or_id
+            matches = indexes[index].get(key)
+            if matches:
+                if len(matches) > 1:
+                    return exceptions.NoUniqueMatch
+                return matches[0]
+        return None
+
+    return match
+
+
+def _searches_by_name(manager):
+    """Whether the listings of the manager are filtered by name by the API."""
+    list_kwargs, _searches = manager._findall_query({'name': ''})
+    return 'name' in list_kwargs.get('search_opts', {})
+
+
+def _list_candidates(manager, find_args):
+    """List the entities matching find_args, without details if possible.
+
+    All the pages are listed when the manager supports it, a single listing
+    is capped by the API.
+    """
+    list_kwargs, searches = manager._findall_query(dict(find_args))
+    if 'detailed' in list_kwargs and not searches:
+        list_kwargs['detailed'] = False
+    if hasattr(manager, 'iter_pages'):
+        listing = manager.iter_all(**list_kwargs)
+    else:
+        listing = manager.list(**list_kwargs)
+    candidates = list(manager._findall_matches(listing, searches))
+    if list_kwargs.get('detailed', True):
+        return candidates
+    return [manager.resource_class(manager, candidate._info, loaded=False)
+            for candidate in candidates]
 
 
 def format_servers_list_networks(server):
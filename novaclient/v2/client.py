@@ -13,11 +13,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import logging
 
+from novaclient import base
 from novaclient import client
+from novaclient import completion_cache as cache
 from novaclient import exceptions
 from novaclient.i18n import _
+from novaclient import utils
 from novaclient.v2 import agents
 from novaclient.v2 import aggregates
 from novaclient.v2 import assisted_volume_snapshots
@@ -36,6 +40,7 @@ from novaclient.v2 import quota_classes
 from novaclient.v2 import quotas
 from novaclient.v2 import server_external_events
 from novaclient.v2 import server_groups
+from novaclient.v2 import server_index as server_index_module
 from novaclient.v2 import server_migrations
 from novaclient.v2 import servers
 from novaclient.v2 import services
@@ -58,12 +63,16 @@ class Client(object):
                  auth_url=None,
                  cacert=None,
                  cert=None,
+                 compact_resources=False,
+                 completion_cache=False,
                  direct_use=True,
                  endpoint_override=None,
                  endpoint_type='publicURL',
                  extensions=None,
                  http_log_debug=False,
+                 identity_map=False,
                  insecure=False,
+                 lazy_load=base.LAZY_LOAD_ALLOW,
                  logger=None,
                  os_cache=False,
                  password=None,
@@ -72,6 +81,8 @@ class Client(object):
                  project_id=None,
                  project_name=None,
                  region_name=None,
+                 resolution_cache_ttl=utils.DEFAULT_RESOLUTION_CACHE_TTL,
+                 server_index=False,
                  service_name=None,
                  service_type='compute',
                  session=None,
@@ -91,13 +102,29 @@ class Client(object):
         :param str auth_url: Auth URL
         :param str cacert: ca-certificate
         :param str cert: certificate
+        :param bool compact_resources: Serve the attributes of the resources
+            from their ``_info`` mapping instead of copying them to each
+            instance, which halves the memory used by large listings.
+        :param completion_cache: Populate the completion cache used for bash
+            autocompletion with the resources that are listed or created.
+            Either a bool or a
+            :class:`novaclient.completion_cache.CompletionCache` instance.
         :param bool direct_use: Inner variable of novaclient. Do not use it
             outside novaclient. It's restricted.
         :param str endpoint_override: Bypass URL
         :param str endpoint_type: Endpoint Type
         :param str extensions: Extensions
         :param bool http_log_debug: Enable debugging for HTTP connections
+        :param identity_map: Return a single object per resource: a resource
+            fetched again is merged into the object fetched first. Either a
+            bool or a :class:`novaclient.base.IdentityMap` instance.
         :param bool insecure: Allow insecure
+        :param str lazy_load: What to do when an attribute of a resource
+            which is not loaded is accessed: ``allow`` the lazy loading of
+            the resource, ``log`` a warning with a stack trace before
+            loading it, or ``raise``
+            :class:`novaclient.exceptions.LazyLoadForbidden`. The lazy loads
+            are counted by resource class in ``lazy_loads``.
         :param logging.Logger logger: Logger instance to be used for all
             logging stuff
         :param str password: User password
@@ -107,6 +134,13 @@ class Client(object):
         :param str project_id: Project/Tenant ID
         :param str project_name: Project/Tenant name
         :param str region_name: Region Name
+        :param float resolution_cache_ttl: Seconds the IDs of the entities
+            resolved by name by :func:`novaclient.utils.find_resource` are
+            cached for, 0 (the default) disables the cache.
+        :param server_index: Record the listed servers in a local index.
+            Either a bool or a
+            :class:`novaclient.v2.server_index.ServerIndex` instance, which
+            can also resolve server names.
         :param str service_name: Service Name
         :param str service_type: Service Type
         :param str session: Session
@@ -154,6 +188,22 @@ class Client(object):
         self.hypervisor_stats = hypervisors.HypervisorStatsManager(self)
         self.services = services.ServiceManager(self)
         self.os_cache = os_cache
+        if completion_cache is True:
+            completion_cache = cache.CompletionCache()
+        self.completion_cache = completion_cache or None
+        self.compact_resources = compact_resources
+        if lazy_load not in base.LAZY_LOAD_MODES:
+            raise ValueError("lazy_load must be one of %s, not %r" %
+                             (', '.join(base.LAZY_LOAD_MODES), lazy_load))
+        self.lazy_load = lazy_load
+        self.lazy_loads = collections.Counter()
+        if identity_map is True:
+            identity_map = base.IdentityMap()
+        self.identity_map = identity_map or None
+        if server_index is True:
+            server_index = server_index_module.ServerIndex()
+        self.server_index = server_index or None
+        self.resolution_cache = utils.ResolutionCache(resolution_cache_ttl)
         self.availability_zones = \
             availability_zones.AvailabilityZoneManager(self)
         self.server_groups = server_groups.ServerGroupsManager(self)
@@ -103,7 +103,8 @@ class FlavorManager(base.ManagerWithFind):
     is_alphanum_id_allowed = True
 
     def list(self, detailed=True, is_public=True, marker=None, min_disk=None,
-             min_ram=None, limit=None, sort_key=None, sort_dir=None):
+             min_ram=None, limit=None, sort_key=None, sort_dir=None,
+             fields=None):
         """Get a list of all flavors.
 
         :param detailed: Whether flavor needs to be return with details
@@ -121,20 +122,30 @@ class FlavorManager(base.ManagerWithFind):
                       default, the default limit will be used.
         :param sort_key: Flavors list sort key (optional).
         :param sort_dir: Flavors list sort direction (optional).
+        :param fields: Fields kept in the listed flavors (optional), the id
+                       is always kept. See
+                       :func:`novaclient.base.project_info`.
         :returns: list of :class:`Flavor`.
         """
+        url, qparams = self._list_query(detailed, is_public, min_disk,
+                                        min_ram, sort_key, sort_dir)
+        if marker:
+            qparams['marker'] = str(marker)
+        if limit:
+            qparams['limit'] = int(limit)
+        return self._list(url, "flavors", filters=qparams, fields=fields)
+
+    def _list_query(self, detailed=True, is_public=True, min_disk=None,
+                    min_ram=None, sort_key=None, sort_dir=None):
+        """Get the URL and the query parameters of a flavor listing."""
         qparams = {}
         # is_public is ternary - None means give all flavors.
         # By default Nova assumes True and gives admins public flavors
         # and flavors from their own projects only.
-        if marker:
-            qparams['marker'] = str(marker)
         if min_disk:
             qparams['minDisk'] = int(min_disk)
         if min_ram:
             qparams['minRam'] = int(min_ram)
-        if limit:
-            qparams['limit'] = int(limit)
         if sort_key:
             qparams['sort_key'] = str(sort_key)
         if sort_dir:
@@ -144,8 +155,22 @@ class FlavorManager(base.ManagerWithFind):
         detail = ""
         if detailed:
             detail = "/detail"
+        return "/flavors%s" % detail, qparams
 
-        return self._list("/flavors%s" % detail, "flavors", filters=qparams)
+    def iter_pages(self, detailed=True, is_public=True, marker=None,
+                   min_disk=None, min_ram=None, limit=None, sort_key=None,
+                   sort_dir=None, fields=None):
+        """Iterate over the pages of a flavor listing.
+
+        The arguments are the ones of :meth:`list`, except ``limit`` which
+        is the size of each page.
+
+        :returns: generator of lists of :class:`Flavor`.
+        """
+        url, qparams = self._list_query(detailed, is_public, min_disk,
+                                        min_ram, sort_key, sort_dir)
+        return self._paginate(url, "flavors", filters=qparams, marker=marker,
+                              limit=limit, fields=fields)
 
     def get(self, flavor):
         """Get a specific flavor.
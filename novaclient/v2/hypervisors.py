@@ -37,7 +37,8 @@ class HypervisorManager(base.ManagerWithFind):
     resource_class = Hypervisor
     is_alphanum_id_allowed = True
 
-    def _list_base(self, detailed=True, marker=None, limit=None):
+    def _list_base(self, detailed=True, marker=None, limit=None,
+                   as_columns=False, fields=None):
         path = '/os-hypervisors'
         if detailed:
             path += '/detail'
@@ -47,19 +48,26 @@ class HypervisorManager(base.ManagerWithFind):
         if marker is not None:
             params['marker'] = str(marker)
         path += utils.prepare_query_string(params)
-        return self._list(path, 'hypervisors')
+        return self._list(path, 'hypervisors', as_columns=as_columns,
+                          fields=fields)
 
     @api_versions.wraps("2.0", "2.32")
-    def list(self, detailed=True):
+    def list(self, detailed=True, as_columns=False, fields=None):
         """
         Get a list of hypervisors.
 
         :param detailed: Include a detailed response.
+        :param as_columns: Return the listing as a
+                           :class:`novaclient.base.ColumnarList` (optional).
+        :param fields: Fields kept in the listed hypervisors or
+                       columns (optional).
         """
-        return self._list_base(detailed=detailed)
+        return self._list_base(detailed=detailed, as_columns=as_columns,
+                               fields=fields)
 
     @api_versions.wraps("2.33")
-    def list(self, detailed=True, marker=None, limit=None):
+    def list(self, detailed=True, marker=None, limit=None, as_columns=False,
+             fields=None):
         """
         Get a list of hypervisors.
 
@@ -73,8 +81,46 @@ class HypervisorManager(base.ManagerWithFind):
                       Note the API server has a configurable default limit.
                       If no limit is specified here or limit is larger than
                       default, the default limit will be used.
+        :param as_columns: Return the listing as a
+                           :class:`novaclient.base.ColumnarList` (optional).
+        :param fields: Fields kept in the listed hypervisors or
+                       columns (optional).
         """
-        return self._list_base(detailed=detailed, marker=marker, limit=limit)
+        return self._list_base(detailed=detailed, marker=marker, limit=limit,
+                               as_columns=as_columns, fields=fields)
+
+    def iter_pages(self, detailed=True, marker=None, limit=None,
+                   prefetch=0, as_columns=False, fields=None):
+        """
+        Iterate over the pages of a hypervisor listing.
+
+        Listings are only paginated starting with microversion 2.33, a
+        single page is returned before.
+
+        :param detailed: Include a detailed response.
+        :param marker: Begin returning hypervisors that appear later in the
+                       hypervisors list than that represented by this
+                       hypervisor ID (optional).
+        :param limit: size of each page (optional).
+        :param prefetch: number of pages fetched by a worker thread ahead of
+                         the one being consumed (optional).
+        :param as_columns: yield :class:`novaclient.base.ColumnarList` pages
+                           (optional).
+        :param fields: fields kept in the listed hypervisors or
+                       columns (optional).
+        """
+        if ((marker is not None or limit is not None) and
+                self.api_version < api_versions.APIVersion('2.33')):
+            raise exceptions.UnsupportedAttribute(
+                'marker' if marker is not None else 'limit', '2.33')
+        path = '/os-hypervisors'
+        if detailed:
+            path += '/detail'
+        if marker is not None:
+            marker = str(marker)
+        return self._paginate(path, 'hypervisors', marker=marker,
+                              limit=limit, prefetch=prefetch,
+                              as_columns=as_columns, fields=fields)
 
     def search(self, hypervisor_match, servers=False, detailed=False):
         """
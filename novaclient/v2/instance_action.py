@@ -15,6 +15,7 @@
 
 from novaclient import api_versions
 from novaclient import base
+from novaclient import exceptions
 
 
 class InstanceAction(base.Resource):
@@ -102,3 +103,41 @@ class InstanceActionManager(base.ManagerWithFind):
             opts['changes-before'] = changes_before
         return self._list('/servers/%s/os-instance-actions' %
                           base.getid(server), 'instanceActions', filters=opts)
+
+    def iter_pages(self, server, marker=None, limit=None, changes_since=None,
+                   changes_before=None):
+        """
+        Iterate over the pages of the actions performed on a server.
+
+        Listings are only paginated starting with microversion 2.58, a
+        single page is returned before.
+
+        :param server: The :class:`Server` (or its ID)
+        :param marker: Begin returning actions that appear later in the action
+                       list than that represented by this action request id
+                       (optional).
+        :param limit: size of each page (optional).
+        :param changes_since: List only instance actions changed later or
+                              equal to a certain point of time (optional,
+                              microversion 2.58 or greater).
+        :param changes_before: List only instance actions changed earlier or
+                               equal to a certain point of time (optional,
+                               microversion 2.66 or greater).
+        """
+        for name, value, start_version in (
+                ('marker', marker, '2.58'),
+                ('limit', limit, '2.58'),
+                ('changes_since', changes_since, '2.58'),
+                ('changes_before', changes_before, '2.66')):
+            if (value and
+                    self.api_version < api_versions.APIVersion(start_version)):
+                raise exceptions.UnsupportedAttribute(name, start_version)
+        opts = {}
+        if changes_since:
+            opts['changes-since'] = changes_since
+        if changes_before:
+            opts['changes-before'] = changes_before
+        return self._paginate('/servers/%s/os-instance-actions' %
+                              base.getid(server), 'instanceActions',
+                              filters=opts, marker=marker, limit=limit,
+                              links_key='links')
@@ -0,0 +1,211 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Server inventory kept in sync with changes-since listings.
+"""
+
+import collections
+import datetime
+import threading
+import time
+
+from oslo_utils import timeutils
+
+from novaclient import base
+
+CREATED, UPDATED, DELETED = 'created', 'updated', 'deleted'
+
+# Margin applied to the time of the previous sync in the changes-since
+# filter, covering the clock skew between the client and the server. The
+# servers changed in that margin are fetched again but only yield an event
+# if they differ from the indexed ones.
+DEFAULT_CLOCK_SKEW = datetime.timedelta(seconds=60)
+
+
+ServerEvent = collections.namedtuple('ServerEvent',
+                                     ['type', 'server', 'previous'])
+ServerEvent.__doc__ = """A change of the inventory.
+
+:param type: ``CREATED``, ``UPDATED`` or ``DELETED``
+:param server: the new :class:`novaclient.v2.servers.Server`, or the deleted
+               one
+:param previous: the replaced server of an update, else None
+"""
+
+
+def _get_ips(info):
+    for addresses in (info.get('addresses') or {}).values():
+        for address in addresses:
+            if address.get('addr'):
+                yield address['addr']
+
+
+# index name -> function returning the keys of a server in that index
+_INDEXES = {
+    'name': lambda info: [info.get('name')],
+    'host': lambda info: [info.get('OS-EXT-SRV-ATTR:host')],
+    'tenant': lambda info: [info.get('tenant_id')],
+    'ip': lambda info: list(_get_ips(info)),
+}
+
+
+class ServerInventory(object):
+    """In-memory mirror of the servers of a cloud.
+
+    The first :meth:`sync` takes a full snapshot of the servers, the next
+    ones only list the servers changed since the previous sync, deleted ones
+    included, and apply them to the mirror. Lookups by id, name, host,
+    tenant and IP address are served from indexes, without any request.
+
+    The mirror can be read from other threads while it is synced.
+
+    :param client: :class:`novaclient.v2.client.Client` instance
+    :param search_opts: search options of the listings, for example
+                        ``{'all_tenants': 1}`` (optional)
+    :param clock_skew: :class:`datetime.timedelta` margin covering the clock
+                       skew between the client and the server (optional)
+    """
+
+    def __init__(self, client, search_opts=None,
+                 clock_skew=DEFAULT_CLOCK_SKEW):
+        self.client = client
+        self.search_opts = dict(search_opts or {})
+        self.clock_skew = clock_skew
+        self.last_sync = None
+        self._lock = threading.RLock()
+        self._servers = {}
+        # NOTE: the servers may be shared, e.g. by an identity map which
+        # updates them in place, so the changes and the keys of the indexes
+        # are taken from a copy of their info.
+        self._infos = {}
+        self._indexes = dict((name, collections.defaultdict(set))
+                             for name in _INDEXES)
+
+    def __len__(self):
+        return len(self._servers)
+
+    def __contains__(self, server_id):
+        return server_id in self._servers
+
+    def sync(self):
+        """Apply the changes made since the previous sync.
+
+        The first call takes a full snapshot of the servers.
+
+        :returns: list of :class:`ServerEvent`
+        """
+        started = timeutils.utcnow()
+        search_opts = dict(self.search_opts)
+        if self.last_sync is not None:
+            since = self.last_sync - self.clock_skew
+            search_opts['changes-since'] = since.isoformat()
+        servers = self.client.servers.list(search_opts=search_opts, limit=-1)
+
+        with self._lock:
+            if self.last_sync is None:
+                events = self._load(servers)
+            else:
+                events = [event for event in map(self._apply, servers)
+                          if event is not None]
+            self.last_sync = started
+        return events
+
+    def watch(self, interval=60):
+        """Sync the inventory every ``interval`` seconds, forever.
+
+        :returns: generator of :class:`ServerEvent`
+        """
+        while True:
+            for event in self.sync():
+                yield event
+            time.sleep(interval)
+
+    def get(self, server_id):
+        """Get a server by id, or None."""
+        return self._servers.get(server_id)
+
+    def list(self):
+        """Get all the servers."""
+        with self._lock:
+            return list(self._servers.values())
+
+    def find_by_name(self, name):
+        """Get the servers with the given name."""
+        return self._lookup('name', name)
+
+    def find_by_host(self, host):
+        """Get the servers running on the given host."""
+        return self._lookup('host', host)
+
+    def find_by_tenant(self, tenant_id):
+        """Get the servers of the given tenant."""
+        return self._lookup('tenant', tenant_id)
+
+    def find_by_ip(self, ip):
+        """Get the servers with the given fixed or floating IP address."""
+        return self._lookup('ip', ip)
+
+    def _lookup(self, index, key):
+        with self._lock:
+            return [self._servers[server_id]
+                    for server_id in self._indexes[index].get(key, ())]
+
+    def _load(self, servers):
+        self._servers = {}
+        self._infos = {}
+        for index in self._indexes.values():
+            index.clear()
+        events = []
+        for server in servers:
+            self._add(server)
+            events.append(ServerEvent(CREATED, server, None))
+        return events
+
+    def _apply(self, server):
+        previous = self._servers.get(server.id)
+        if server._info.get('status') == 'DELETED':
+            if previous is None:
+                return None
+            self._remove(previous)
+            return ServerEvent(DELETED, previous, None)
+        if previous is None:
+            self._add(server)
+            return ServerEvent(CREATED, server, None)
+        info = self._infos[server.id]
+        if info == server._info:
+            return None
+        if previous is server:
+            previous = server.__class__(server.manager, info, loaded=True)
+        self._remove(previous)
+        self._add(server)
+        return ServerEvent(UPDATED, server, previous)
+
+    def _add(self, server):
+        self._servers[server.id] = server
+        info = self._infos[server.id] = base.copy_info(server._info)
+        for name, get_keys in _INDEXES.items():
+            for key in get_keys(info):
+                if key is not None:
+                    self._indexes[name][key].add(server.id)
+
+    def _remove(self, server):
+        del self._servers[server.id]
+        info = self._infos.pop(server.id)
+        for name, get_keys in _INDEXES.items():
+            index = self._indexes[name]
+            for key in get_keys(info):
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(server.id)
+                    if not ids:
+                        del index[key]
@@ -19,6 +19,7 @@ Keypair interface
 
 from novaclient import api_versions
 from novaclient import base
+from novaclient import exceptions
 
 
 class Keypair(base.Resource):
@@ -215,3 +216,28 @@ class KeypairManager(base.ManagerWithFind):
             params['marker'] = str(marker)
         return self._list('/%s' % self.keypair_prefix, 'keypairs',
                           filters=params)
+
+    def iter_pages(self, user_id=None, marker=None, limit=None):
+        """
+        Iterate over the pages of a keypair listing.
+
+        Listings are only paginated starting with microversion 2.35, a
+        single page is returned before.
+
+        :param user_id: Id of key-pairs owner (Admin only).
+        :param marker: Begin returning keypairs that appear later in the
+                       keypair list than that represented by this keypair name
+                       (optional).
+        :param limit: size of each page (optional).
+        """
+        if user_id and self.api_version < api_versions.APIVersion('2.10'):
+            raise exceptions.UnsupportedAttribute('user_id', '2.10')
+        if ((marker or limit) and
+                self.api_version < api_versions.APIVersion('2.35')):
+            raise exceptions.UnsupportedAttribute(
+                'marker' if marker else 'limit', '2.35')
+        params = {}
+        if user_id:
+            params['user_id'] = user_id
+        return self._paginate('/%s' % self.keypair_prefix, 'keypairs',
+                              filters=params, marker=marker, limit=limit)
@@ -16,6 +16,7 @@ migration interface
 
 from novaclient import api_versions
 from novaclient import base
+from novaclient import exceptions
 
 
 class Migration(base.Resource):
@@ -26,10 +27,10 @@ class Migration(base.Resource):
 class MigrationManager(base.ManagerWithFind):
     resource_class = Migration
 
-    def _list_base(self, host=None, status=None, instance_uuid=None,
-                   marker=None, limit=None, changes_since=None,
-                   changes_before=None, migration_type=None,
-                   source_compute=None, user_id=None, project_id=None):
+    def _list_opts(self, host=None, status=None, instance_uuid=None,
+                   changes_since=None, changes_before=None,
+                   migration_type=None, source_compute=None, user_id=None,
+                   project_id=None):
         opts = {}
         if host:
             opts['host'] = host
@@ -37,10 +38,6 @@ class MigrationManager(base.ManagerWithFind):
             opts['status'] = status
         if instance_uuid:
             opts['instance_uuid'] = instance_uuid
-        if marker:
-            opts['marker'] = marker
-        if limit:
-            opts['limit'] = limit
         if changes_since:
             opts['changes-since'] = changes_since
         if changes_before:
@@ -53,12 +50,63 @@ class MigrationManager(base.ManagerWithFind):
             opts['user_id'] = user_id
         if project_id:
             opts['project_id'] = project_id
+        return opts
 
-        return self._list("/os-migrations", "migrations", filters=opts)
+    def _list_base(self, host=None, status=None, instance_uuid=None,
+                   marker=None, limit=None, changes_since=None,
+                   changes_before=None, migration_type=None,
+                   source_compute=None, user_id=None, project_id=None,
+                   as_columns=False, fields=None):
+        opts = self._list_opts(host=host, status=status,
+                               instance_uuid=instance_uuid,
+                               changes_since=changes_since,
+                               changes_before=changes_before,
+                               migration_type=migration_type,
+                               source_compute=source_compute,
+                               user_id=user_id, project_id=project_id)
+        if marker:
+            opts['marker'] = marker
+        if limit:
+            opts['limit'] = limit
+
+        return self._list("/os-migrations", "migrations", filters=opts,
+                          as_columns=as_columns, fields=fields)
+
+    def iter_pages(self, marker=None, limit=None, prefetch=0,
+                   as_columns=False, fields=None, **filters):
+        """
+        Iterate over the pages of a migration listing.
+
+        Listings are only paginated starting with microversion 2.59, a
+        single page is returned before.
+
+        :param marker: Begin returning migrations that appear later in the
+        migrations list than that represented by this migration UUID
+        (optional).
+        :param limit: size of each page (optional).
+        :param prefetch: number of pages fetched by a worker thread ahead of
+        the one being consumed (optional).
+        :param as_columns: yield :class:`novaclient.base.ColumnarList` pages
+        (optional).
+        :param fields: fields kept in the listed migrations or columns
+        (optional).
+        :param filters: filters of :meth:`list` for the microversion in use,
+        like host, status, instance_uuid or changes_since.
+        """
+        if ((marker or limit) and
+                self.api_version < api_versions.APIVersion('2.59')):
+            raise exceptions.UnsupportedAttribute(
+                'marker' if marker else 'limit', '2.59')
+        return self._paginate("/os-migrations", "migrations",
+                              filters=self._list_opts(**filters),
+                              marker=marker, limit=limit,
+                              prefetch=prefetch, as_columns=as_columns,
+                              fields=fields)
 
     @api_versions.wraps("2.0", "2.58")
     def list(self, host=None, status=None, instance_uuid=None,
-             migration_type=None, source_compute=None):
+             migration_type=None, source_compute=None, as_columns=False,
+             fields=None):
         """
         Get a list of migrations.
         :param host: filter migrations by host name (optional).
@@ -67,16 +115,22 @@ class MigrationManager(base.ManagerWithFind):
         :param migration_type: Filter migrations by type. Valid values are:
         evacuation, live-migration, migration (cold), resize
         :param source_compute: Filter migrations by source compute host name.
+        :param as_columns: Return the listing as a
+        :class:`novaclient.base.ColumnarList` (optional).
+        :param fields: Fields kept in the listed migrations or columns
+        (optional).
         """
         return self._list_base(host=host, status=status,
                                instance_uuid=instance_uuid,
                                migration_type=migration_type,
-                               source_compute=source_compute)
+                               source_compute=source_compute,
+                               as_columns=as_columns, fields=fields)
 
     @api_versions.wraps("2.59", "2.65")
     def list(self, host=None, status=None, instance_uuid=None,
              marker=None, limit=None, changes_since=None,
-             migration_type=None, source_compute=None):
+             migration_type=None, source_compute=None, as_columns=False,
+             fields=None):
         """
         Get a list of migrations.
         :param host: filter migrations by host name (optional).
@@ -95,18 +149,24 @@ class MigrationManager(base.ManagerWithFind):
         :param migration_type: Filter migrations by type. Valid values are:
         evacuation, live-migration, migration (cold), resize
         :param source_compute: Filter migrations by source compute host name.
+        :param as_columns: Return the listing as a
+        :class:`novaclient.base.ColumnarList` (optional).
+        :param fields: Fields kept in the listed migrations or columns
+        (optional).
         """
         return self._list_base(host=host, status=status,
                                instance_uuid=instance_uuid,
                                marker=marker, limit=limit,
                                changes_since=changes_since,
                                migration_type=migration_type,
-                               source_compute=source_compute)
+                               source_compute=source_compute,
+                               as_columns=as_columns, fields=fields)
 
     @api_versions.wraps("2.66", "2.79")
     def list(self, host=None, status=None, instance_uuid=None,
              marker=None, limit=None, changes_since=None,
-             changes_before=None, migration_type=None, source_compute=None):
+             changes_before=None, migration_type=None, source_compute=None,
+             as_columns=False, fields=None):
         """
         Get a list of migrations.
         :param host: filter migrations by host name (optional).
@@ -128,6 +188,10 @@ class MigrationManager(base.ManagerWithFind):
         :param migration_type: Filter migrations by type. Valid values are:
         evacuation, live-migration, migration (cold), resize
         :param source_compute: Filter migrations by source compute host name.
+        :param as_columns: Return the listing as a
+        :class:`novaclient.base.ColumnarList` (optional).
+        :param fields: Fields kept in the listed migrations or columns
+        (optional).
         """
         return self._list_base(host=host, status=status,
                                instance_uuid=instance_uuid,
@@ -135,13 +199,15 @@ class MigrationManager(base.ManagerWithFind):
                                changes_since=changes_since,
                                changes_before=changes_before,
                                migration_type=migration_type,
-                               source_compute=source_compute)
+                               source_compute=source_compute,
+                               as_columns=as_columns, fields=fields)
 
     @api_versions.wraps("2.80")
     def list(self, host=None, status=None, instance_uuid=None,
              marker=None, limit=None, changes_since=None,
              changes_before=None, migration_type=None,
-             source_compute=None, user_id=None, project_id=None):
+             source_compute=None, user_id=None, project_id=None,
+             as_columns=False, fields=None):
         """
         Get a list of migrations.
         :param host: filter migrations by host name (optional).
@@ -165,6 +231,10 @@ class MigrationManager(base.ManagerWithFind):
         :param source_compute: Filter migrations by source compute host name.
         :param user_id: filter migrations by user (optional).
         :param project_id: filter migrations by project (optional).
+        :param as_columns: Return the listing as a
+        :class:`novaclient.base.ColumnarList` (optional).
+        :param fields: Fields kept in the listed migrations or columns
+        (optional).
         """
         return self._list_base(host=host, status=status,
                                instance_uuid=instance_uuid,
@@ -174,4 +244,5 @@ class MigrationManager(base.ManagerWithFind):
                                migration_type=migration_type,
                                source_compute=source_compute,
                                user_id=user_id,
-                               project_id=project_id)
+                               project_id=project_id,
+                               as_columns=as_columns, fields=fields)
@@ -0,0 +1,254 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Local SQLite index of the servers, used to resolve names without listings.
+
+The index is disabled by default and enabled by passing
+``server_index=True`` to the client. Server listings and gets then record
+the servers they return. The index only holds the servers seen by the
+client, so :func:`novaclient.utils.find_resource` only takes the server
+names it resolves as candidates, when enabled with ``resolve_names``, and
+confirms them with the API.
+"""
+
+import contextlib
+import os
+import sqlite3
+
+from oslo_utils import strutils
+from oslo_utils import timeutils
+
+from novaclient import completion_cache
+from novaclient.v2 import inventory
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS servers (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    human_id TEXT,
+    host TEXT,
+    tenant_id TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS servers_name ON servers (name);
+CREATE INDEX IF NOT EXISTS servers_human_id ON servers (human_id);
+CREATE INDEX IF NOT EXISTS servers_host ON servers (host);
+CREATE INDEX IF NOT EXISTS servers_tenant_id ON servers (tenant_id);
+CREATE TABLE IF NOT EXISTS addresses (
+    server_id TEXT NOT NULL,
+    addr TEXT NOT NULL,
+    type TEXT
+);
+CREATE INDEX IF NOT EXISTS addresses_addr ON addresses (addr);
+CREATE INDEX IF NOT EXISTS addresses_server_id ON addresses (server_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# columns of the servers table, with the key of the server they are read from
+_COLUMNS = (
+    ('host', 'OS-EXT-SRV-ATTR:host'),
+    ('tenant_id', 'tenant_id'),
+    ('status', 'status'),
+)
+
+# NOTE: the columns of a server already indexed are only updated when their
+# flag, given after the values, is set: the servers only hold some fields.
+_UPSERT = """
+INSERT INTO servers (id, name, human_id, host, tenant_id, status)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    name = CASE WHEN ? THEN excluded.name ELSE name END,
+    human_id = CASE WHEN ? THEN excluded.human_id ELSE human_id END,
+    host = CASE WHEN ? THEN excluded.host ELSE host END,
+    tenant_id = CASE WHEN ? THEN excluded.tenant_id ELSE tenant_id END,
+    status = CASE WHEN ? THEN excluded.status ELSE status END
+"""
+
+
+def get_index_path():
+    """Returns the default path of the index of the current user."""
+    return os.path.join(completion_cache.get_cache_dir(), 'servers.sqlite')
+
+
+class ServerIndex(object):
+    """SQLite index of servers by id, name, human_id, IP, host and tenant.
+
+    Each operation uses its own connection, so an index can be shared
+    between threads, and SQLite locking makes it safe to share it between
+    processes.
+
+    :param path: path of the database, see :func:`get_index_path`
+    :param timeout: seconds to wait for a lock held by another connection
+    :param resolve_names: resolve the server names from the index. A name
+                          held by a single indexed server is confirmed with
+                          a single detailed listing of the servers with
+                          that name, rather than a listing and a get.
+    """
+
+    def __init__(self, path=None, timeout=5.0, resolve_names=False):
+        self.path = path or get_index_path()
+        self.timeout = timeout
+        self.resolve_names = resolve_names
+        self._initialized = False
+
+    @contextlib.contextmanager
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), 0o755,
+                        exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            if not self._initialized:
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def update(self, servers):
+        """Record servers returned by the API.
+
+        Servers with the DELETED status are removed. Only the fields held
+        by the servers are updated, e.g. servers of a listing which is not
+        detailed only update the name of the indexed servers.
+        """
+        with self._connect() as conn:
+            for server in servers:
+                self._update(conn, server._info)
+
+    def _update(self, conn, info):
+        server_id = info.get('id')
+        if server_id is None:
+            return
+        if info.get('status') == 'DELETED':
+            self._remove(conn, [server_id])
+            return
+        # NOTE: only the fields held by the server are updated, e.g. the
+        # listings which are not detailed only hold the name, and the host
+        # is only shown to administrators.
+        name = info.get('name')
+        values = [server_id, name, strutils.to_slug(name) if name else None]
+        values.extend(info.get(key) for column, key in _COLUMNS)
+        updated = ['name' in info] * 2
+        updated.extend(key in info for column, key in _COLUMNS)
+        conn.execute(_UPSERT, values + updated)
+        if 'addresses' not in info:
+            return
+        conn.execute("DELETE FROM addresses WHERE server_id = ?",
+                     (server_id,))
+        conn.executemany(
+            "INSERT INTO addresses (server_id, addr, type) VALUES (?, ?, ?)",
+            [(server_id, address['addr'], address.get('OS-EXT-IPS:type'))
+             for addresses in (info['addresses'] or {}).values()
+             for address in addresses if address.get('addr')])
+
+    def remove(self, server_ids):
+        """Remove servers from the index."""
+        with self._connect() as conn:
+            self._remove(conn, server_ids)
+
+    def _remove(self, conn, server_ids):
+        params = [(server_id,) for server_id in server_ids]
+        conn.executemany("DELETE FROM servers WHERE id = ?", params)
+        conn.executemany("DELETE FROM addresses WHERE server_id = ?", params)
+
+    def replace(self, servers):
+        """Replace the content of the index with a full listing."""
+        with self._connect() as conn:
+            self._clear(conn)
+            for server in servers:
+                self._update(conn, server._info)
+
+    def _clear(self, conn):
+        conn.execute("DELETE FROM servers")
+        conn.execute("DELETE FROM addresses")
+
+    def find(self, name=None, human_id=None, ip=None, host=None,
+             tenant_id=None):
+        """Get the IDs of the servers matching all the given criteria.
+
+        :param name: exact name of the servers
+        :param human_id: human-friendly ID of the servers
+        :param ip: fixed or floating IP address of the servers
+        :param host: host running the servers
+        :param tenant_id: tenant owning the servers
+        :returns: sorted list of server IDs
+        """
+        query = "SELECT DISTINCT servers.id FROM servers"
+        where = []
+        params = []
+        if ip is not None:
+            query += " JOIN addresses ON addresses.server_id = servers.id"
+            where.append("addresses.addr = ?")
+            params.append(ip)
+        for column, value in (('name', name), ('human_id', human_id),
+                              ('host', host), ('tenant_id', tenant_id)):
+            if value is not None:
+                where.append("servers.%s = ?" % column)
+                params.append(value)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY servers.id"
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(query, params)]
+
+    def lookup(self, name_or_human_id):
+        """Get the IDs of the servers with the given name, or human_id.
+
+        The human_id is only used when no server has the given name, like
+        :func:`novaclient.utils.find_resource` does.
+        """
+        return (self.find(name=name_or_human_id) or
+                self.find(human_id=name_or_human_id))
+
+    @property
+    def last_sync(self):
+        """Time of the last :meth:`sync`, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?",
+                               ('last_sync',)).fetchone()
+        if row is None:
+            return None
+        return timeutils.normalize_time(timeutils.parse_isotime(row[0]))
+
+    def sync(self, manager, search_opts=None,
+             clock_skew=inventory.DEFAULT_CLOCK_SKEW):
+        """Bring the index up to date.
+
+        The first sync replaces the index with a full listing, the next
+        ones only list the servers changed since the previous sync.
+
+        :param manager: :class:`novaclient.v2.servers.ServerManager`
+        :param search_opts: search options of the listings (optional)
+        :param clock_skew: :class:`datetime.timedelta` margin covering the
+                           clock skew between the client and the server
+        """
+        started = timeutils.utcnow()
+        last_sync = self.last_sync
+        search_opts = dict(search_opts or {})
+        if last_sync is not None:
+            since = last_sync - clock_skew
+            search_opts['changes-since'] = since.isoformat()
+        servers = manager.list(search_opts=search_opts, limit=-1)
+        with self._connect() as conn:
+            if last_sync is None:
+                self._clear(conn)
+            for server in servers:
+                self._update(conn, server._info)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) "
+                         "VALUES (?, ?)", ('last_sync', started.isoformat()))
+        return servers
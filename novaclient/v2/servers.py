@@ -21,8 +21,15 @@ Server interface.
 
 import base64
 import collections
+from concurrent import futures
+import datetime
+import heapq
+import itertools
+import sqlite3
 from urllib import parse
 
+from oslo_utils import timeutils
+
 from novaclient import api_versions
 from novaclient import base
 from novaclient import crypto
@@ -50,6 +57,62 @@ CONSOLE_TYPE_PROTOCOL_MAPPING = {
     'webmks': 'mks'
 }
 
+# Keys a server listing can be sharded by, see ServerManager.list
+SHARD_KEYS = ('host', 'tenant_id', 'availability_zone', 'changes-since')
+DEFAULT_SHARD_WORKERS = 8
+
+# Attributes of the servers holding the value of the sort keys which are not
+# named after them
+SORT_KEY_ATTRS = {
+    'uuid': 'id',
+    'display_name': 'name',
+    'display_description': 'description',
+    'created_at': 'created',
+    'updated_at': 'updated',
+    'project_id': 'tenant_id',
+    'access_ip_v4': 'accessIPv4',
+    'access_ip_v6': 'accessIPv6',
+    'availability_zone': 'OS-EXT-AZ:availability_zone',
+    'host': 'OS-EXT-SRV-ATTR:host',
+    'hostname': 'OS-EXT-SRV-ATTR:hostname',
+    'node': 'OS-EXT-SRV-ATTR:hypervisor_hostname',
+    'launch_index': 'OS-EXT-SRV-ATTR:launch_index',
+    'kernel_id': 'OS-EXT-SRV-ATTR:kernel_id',
+    'ramdisk_id': 'OS-EXT-SRV-ATTR:ramdisk_id',
+    'reservation_id': 'OS-EXT-SRV-ATTR:reservation_id',
+    'root_device_name': 'OS-EXT-SRV-ATTR:root_device_name',
+    'vm_state': 'OS-EXT-STS:vm_state',
+    'task_state': 'OS-EXT-STS:task_state',
+    'power_state': 'OS-EXT-STS:power_state',
+    'launched_at': 'OS-SRV-USG:launched_at',
+    'terminated_at': 'OS-SRV-USG:terminated_at',
+}
+
+
+class _SortKey(object):
+    """Orders servers like Nova does for the given sort directions."""
+
+    __slots__ = ('values', 'reverse')
+
+    def __init__(self, values, reverse):
+        self.values = values
+        self.reverse = reverse
+
+    def __lt__(self, other):
+        for value, other_value, reverse in zip(self.values, other.values,
+                                               self.reverse):
+            if value == other_value:
+                continue
+            # NOTE: NULL values come first in ascending order
+            if value is None:
+                less = True
+            elif other_value is None:
+                less = False
+            else:
+                less = value < other_value
+            return less != reverse
+        return False
+
 
 class Server(base.Resource):
     HUMAN_ID = True
@@ -785,6 +848,90 @@ class SecurityGroup(base.Resource):
 class ServerManager(base.BootingManagerWithFind):
     resource_class = Server
 
+    # NOTE: the attributes which are also matched locally cover the
+    # filters the API ignores, like the admin-only ones for other users
+    findall_filters = {
+        'status': ('status', '2.0', 'status'),
+        'tenant_id': ('tenant_id', '2.0', 'tenant_id'),
+        'user_id': ('user_id', '2.0', 'user_id'),
+        'host': ('host', '2.0', 'OS-EXT-SRV-ATTR:host'),
+        'flavor': ('flavor', '2.0', None),
+        'image': ('image', '2.0', None),
+        'tags': ('tags', '2.26', None),
+        'locked': ('locked', '2.73', 'locked'),
+    }
+
+    def _get_server_index(self):
+        return getattr(self.api, 'server_index', None)
+
+    def _index_servers(self, servers):
+        index = self._get_server_index()
+        if not index:
+            return
+        try:
+            index.update(servers)
+        except (sqlite3.Error, OSError):
+            # NOTE: the index is an optimisation, a database which can't be
+            # written must not fail the API calls.
+            pass
+
+    def _build_list(self, resp, body, response_key, obj_class=None,
+                    replace_cache=False, as_columns=False, fields=None):
+        items = super(ServerManager, self)._build_list(
+            resp, body, response_key, obj_class, replace_cache=replace_cache,
+            as_columns=as_columns, fields=fields)
+        # NOTE: projected servers lack the fields of the index, they would
+        # wipe the ones of the indexed servers.
+        if (not as_columns and fields is None and
+                obj_class in (None, self.resource_class)):
+            self._index_servers(items)
+        return items
+
+    def find_in_index(self, name_or_id, **find_args):
+        """
+        Find a server by name or human_id from the server index.
+
+        The index is only used when it resolves names, see the
+        ``resolve_names`` argument of
+        :class:`novaclient.v2.server_index.ServerIndex`. The index misses
+        the servers created by other clients since it was synced, so a
+        single indexed server holding the name is only a candidate: the
+        detailed listing of the servers with that name confirms the name is
+        still unique, and returns the matching server without another get.
+
+        :param name_or_id: name or human_id of the server
+        :param find_args: arguments of :meth:`find`, the index is not used
+                          when any is given, as it doesn't know their scope
+        :returns: :class:`Server`, or None if the index doesn't resolve
+                  names, or if the index or the API do not hold a single
+                  matching server.
+        """
+        index = self._get_server_index()
+        if not index or not index.resolve_names or find_args:
+            return None
+        try:
+            server_ids = index.lookup(name_or_id)
+        except (sqlite3.Error, OSError):
+            return None
+        if len(server_ids) != 1:
+            return None
+        listing = self.list(search_opts={'name': name_or_id})
+        # like find, the names take precedence over the human_ids
+        matches = [s for s in listing if s._info.get('name') == name_or_id]
+        if not matches:
+            matches = [s for s in listing if s.human_id == name_or_id]
+        if not matches:
+            self._remove_from_index(server_ids)
+        if len(matches) != 1:
+            return None
+        return matches[0]
+
+    def _remove_from_index(self, server_ids):
+        try:
+            self._get_server_index().remove(server_ids)
+        except (sqlite3.Error, OSError):
+            pass
+
     @staticmethod
     def transform_userdata(userdata):
         if hasattr(userdata, 'read'):
@@ -967,17 +1114,27 @@ class ServerManager(base.BootingManagerWithFind):
             '/servers', body, response_key, return_raw=return_raw,
         )
 
-    def get(self, server):
+    def get(self, server, raw=None):
         """
         Get a server.
 
         :param server: ID of the :class:`Server` to get.
+        :param raw: Return the response body rather than a server
+                    (optional): ``base.RAW_BODY`` for the decoded body,
+                    ``base.RAW_BYTES`` for the undecoded one as a
+                    :class:`novaclient.base.RawResponse`.
         :rtype: :class:`Server`
         """
-        return self._get("/servers/%s" % base.getid(server), "server")
+        if raw:
+            return self._get("/servers/%s" % base.getid(server), "server",
+                             raw=raw)
+        server = self._get("/servers/%s" % base.getid(server), "server")
+        self._index_servers([server])
+        return server
 
     def list(self, detailed=True, search_opts=None, marker=None, limit=None,
-             sort_keys=None, sort_dirs=None):
+             sort_keys=None, sort_dirs=None, shard_by=None, shards=None,
+             max_workers=None, as_columns=False, fields=None, raw=None):
         """
         Get a list of servers.
 
@@ -993,9 +1150,35 @@ class ServerManager(base.BootingManagerWithFind):
                       Note the API server has a configurable default limit.
                       If no limit is specified here or limit is larger than
                       default, the default limit will be used.
-                      If limit == -1, all servers will be returned.
+                      If limit == -1, all servers will be returned, see
+                      :meth:`iter_pages` to walk them page by page instead.
         :param sort_keys: List of sort keys
         :param sort_dirs: List of sort directions
+        :param shard_by: List all the servers as several listings fetched
+                         concurrently, one per value of this key (optional).
+                         One of ``SHARD_KEYS``, see :meth:`list_sharded`.
+                         It can't be combined with marker and limit.
+        :param shards: Values of the shard key (optional), see
+                       :meth:`list_sharded`.
+        :param max_workers: Maximum number of shards fetched concurrently
+                            (optional).
+        :param as_columns: Return the listing as a
+                           :class:`novaclient.base.ColumnarList` rather than
+                           a list of servers (optional). It can't be combined
+                           with shard_by.
+        :param fields: Fields kept in the listed servers, or in the columns
+                       with as_columns (optional). All the fields are kept
+                       by default. Nested fields are selected with dotted
+                       paths like ``flavor.original_name``, and the id is
+                       always kept. The other fields are dropped before the
+                       servers are built, and are not lazy-loaded.
+        :param raw: Return the response body rather than a list of servers
+                    (optional): ``base.RAW_BODY`` for the decoded body,
+                    ``base.RAW_BYTES`` for the undecoded one as a
+                    :class:`novaclient.base.RawResponse`. With limit == -1,
+                    a list of the bodies of the pages is returned. It
+                    can't be combined with shard_by, as_columns and fields
+                    are ignored.
 
         :rtype: list of :class:`Server`
 
@@ -1008,7 +1191,54 @@ class ServerManager(base.BootingManagerWithFind):
 
         client.servers.list(limit=10) - returns only 10 servers
 
-        """
+        client.servers.list(search_opts={'all_tenants': 1},
+                            shard_by='host') -
+        returns the servers of all tenants, listed host by host in parallel
+
+        """
+        if shard_by is not None:
+            if marker or limit not in (None, -1):
+                raise ValueError("marker and limit can't be used with "
+                                 "shard_by")
+            if as_columns:
+                raise ValueError("as_columns can't be used with shard_by")
+            if raw:
+                raise ValueError("raw can't be used with shard_by")
+            return self.list_sharded(shard_by, shards=shards,
+                                     detailed=detailed,
+                                     search_opts=search_opts,
+                                     sort_keys=sort_keys, sort_dirs=sort_dirs,
+                                     max_workers=max_workers, fields=fields)
+
+        if limit == -1:
+            return self.list_all(detailed=detailed, search_opts=search_opts,
+                                 marker=marker, sort_keys=sort_keys,
+                                 sort_dirs=sort_dirs, as_columns=as_columns,
+                                 fields=fields, raw=raw)
+
+        url, params = self._list_query(detailed, search_opts, sort_keys,
+                                       sort_dirs)
+        if marker:
+            params.append(('marker', marker))
+        if limit:
+            params.append(('limit', limit))
+
+        # Transform the dict to a sequence of two-element tuples in fixed
+        # order, then the encoded string will be consistent in Python 2&3.
+        query_string = ""
+        if params:
+            # sort keys and directions are unique since the same parameter
+            # key is repeated for each associated value
+            # (ie, &sort_key=key1&sort_key=key2&sort_key=key3)
+            new_qparams = sorted(params, key=lambda x: x[0])
+            query_string = "?%s" % parse.urlencode(new_qparams)
+
+        return self._list("%s%s" % (url, query_string), "servers",
+                          as_columns=as_columns, fields=fields, raw=raw)
+
+    def _list_query(self, detailed=True, search_opts=None, sort_keys=None,
+                    sort_dirs=None):
+        """Get the URL and the query parameters of a server listing."""
         if search_opts is None:
             search_opts = {}
 
@@ -1016,7 +1246,7 @@ class ServerManager(base.BootingManagerWithFind):
         # In microversion 2.73 we added ``locked`` filtering option
         # for listing server details.
         if ('locked' in search_opts and
-                self.api_version < api_versions.APIVersion('2.73')):
+                self.api_version < api_versions.V2_73):
             raise exceptions.UnsupportedAttribute("locked", "2.73")
         for opt, val in search_opts.items():
             # support locked=False from 2.73 microversion
@@ -1030,45 +1260,216 @@ class ServerManager(base.BootingManagerWithFind):
             if opt == 'config_drive' and val is not None:
                 qparams[opt] = str(val)
 
+        params = list(qparams.items())
+        if sort_keys:
+            params.extend(('sort_key', sort_key) for sort_key in sort_keys)
+        if sort_dirs:
+            params.extend(('sort_dir', sort_dir) for sort_dir in sort_dirs)
+
         detail = ""
         if detailed:
             detail = "/detail"
+        return "/servers%s" % detail, params
+
+    def iter_pages(self, detailed=True, search_opts=None, marker=None,
+                   limit=None, sort_keys=None, sort_dirs=None, prefetch=0,
+                   as_columns=False, fields=None, raw=None):
+        """
+        Iterate over the pages of a server listing.
+
+        Pages are fetched one at a time, following the next links returned
+        by the server, so memory stays flat however large the listing is.
+        The arguments are the ones of :meth:`list`, except ``limit`` which
+        is the size of each page (the server default limit is used if it is
+        not provided), and:
+
+        :param prefetch: number of pages fetched by a worker thread ahead of
+                         the one being consumed (optional). Pages are
+                         fetched on demand by default.
+        :rtype: generator of lists of :class:`Server`, of
+                :class:`novaclient.base.ColumnarList` with as_columns, or
+                of response bodies with raw
+        """
+        url, params = self._list_query(detailed, search_opts, sort_keys,
+                                       sort_dirs)
+        return self._paginate(url, "servers", filters=params, marker=marker,
+                              limit=limit, prefetch=prefetch,
+                              as_columns=as_columns, fields=fields, raw=raw)
+
+    def list_sharded(self, shard_by, shards=None, detailed=True,
+                     search_opts=None, sort_keys=None, sort_dirs=None,
+                     max_workers=None, fields=None):
+        """
+        List all the servers with one listing per shard, run concurrently.
+
+        The listing is partitioned by a filter of the servers, each
+        partition is walked page by page as with ``limit=-1`` and the
+        partitions are walked concurrently. The results are merged in shard
+        order, or with a k-way merge in the order of ``sort_keys`` when they
+        are given. A server found in several shards, e.g. because it moved
+        while being listed, is only returned once.
+
+        Shard keys, and their default shards:
+
+        * ``host``: the hosts of the compute services. Servers not
+          scheduled to a host are not listed.
+        * ``tenant_id``: no default, the project IDs must be given. The
+          ``all_tenants`` search option should be set.
+        * ``availability_zone``: all the availability zones. Servers not
+          scheduled to a zone are not listed.
+        * ``changes-since``: time windows, given either as a list of their
+          boundaries or as a number of windows splitting the range from
+          the ``changes-since`` search option to the ``changes-before``
+          one, or to now. The last window is left open when
+          ``changes-before`` is not given. Like any listing filtered by
+          ``changes-since``, deleted servers are included. Requires
+          microversion 2.66 or greater.
+
+        Filtering by the host or the availability zone is restricted to
+        administrators by default policy.
+
+        :param shard_by: One of ``SHARD_KEYS``
+        :param shards: Values of the shard key (optional for ``host`` and
+                       ``availability_zone``)
+        :param detailed: Whether to return detailed server info (optional).
+        :param search_opts: Search options, applied to every shard
+                            (optional). See :meth:`list`.
+        :param sort_keys: List of sort keys (optional). Sorted listings need
+                          ``detailed`` unless only sorted by ``uuid`` or
+                          ``display_name``.
+        :param sort_dirs: List of sort directions (optional).
+        :param max_workers: Maximum number of shards fetched concurrently,
+                            ``DEFAULT_SHARD_WORKERS`` by default.
+        :param fields: Fields kept in the listed servers (optional), see
+                       :meth:`list`. The fields of the sort keys are kept
+                       too, to merge the shards.
+        :rtype: list of :class:`Server`
+        """
+        shard_opts = self._shard_search_opts(shard_by, shards,
+                                             search_opts or {})
+        if (sort_keys and not detailed and
+                set(sort_keys) - {'uuid', 'display_name'}):
+            raise ValueError("Sorted sharded listings need detailed=True")
+        max_workers = min(max_workers or DEFAULT_SHARD_WORKERS,
+                          len(shard_opts) or 1)
+        if fields is not None and sort_keys:
+            fields = list(fields)
+            fields.extend(SORT_KEY_ATTRS.get(k, k) for k in sort_keys
+                          if SORT_KEY_ATTRS.get(k, k) not in fields)
+
+        def list_shard(opts):
+            return self.list_all(detailed=detailed, search_opts=opts,
+                                 sort_keys=sort_keys, sort_dirs=sort_dirs,
+                                 fields=fields)
+
+        executor = futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='novaclient-shard')
+        try:
+            results = list(executor.map(list_shard, shard_opts))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
-        result = base.ListWithMeta([], None)
-        while True:
-            if marker:
-                qparams['marker'] = marker
-
-            if limit and limit != -1:
-                qparams['limit'] = limit
-
-            # Transform the dict to a sequence of two-element tuples in fixed
-            # order, then the encoded string will be consistent in Python 2&3.
-            if qparams or sort_keys or sort_dirs:
-                # sort keys and directions are unique since the same parameter
-                # key is repeated for each associated value
-                # (ie, &sort_key=key1&sort_key=key2&sort_key=key3)
-                items = list(qparams.items())
-                if sort_keys:
-                    items.extend(('sort_key', sort_key)
-                                 for sort_key in sort_keys)
-                if sort_dirs:
-                    items.extend(('sort_dir', sort_dir)
-                                 for sort_dir in sort_dirs)
-                new_qparams = sorted(items, key=lambda x: x[0])
-                query_string = "?%s" % parse.urlencode(new_qparams)
+        if sort_keys:
+            key = self._sort_key_getter(sort_keys, sort_dirs)
+            merged = heapq.merge(*results, key=key)
+        else:
+            merged = itertools.chain.from_iterable(results)
+
+        servers = base.ListWithMeta([], None)
+        seen = set()
+        for server in merged:
+            if server.id not in seen:
+                seen.add(server.id)
+                servers.append(server)
+        for result in results:
+            servers.append_request_ids(result.request_ids)
+        return servers
+
+    def _shard_search_opts(self, shard_by, shards, search_opts):
+        """Get the search options of each shard of a listing."""
+        if shard_by not in SHARD_KEYS:
+            raise ValueError("shard_by must be one of %s, not %r" %
+                             (', '.join(SHARD_KEYS), shard_by))
+
+        if shard_by == 'changes-since':
+            windows = self._shard_windows(shards, search_opts)
+            shard_opts = []
+            for since, before in windows:
+                opts = dict(search_opts)
+                opts['changes-since'] = since
+                opts.pop('changes-before', None)
+                if before is not None:
+                    opts['changes-before'] = before
+                shard_opts.append(opts)
+            return shard_opts
+
+        if search_opts.get(shard_by):
+            raise ValueError("The %s search option can't be used when "
+                             "sharding by %s" % (shard_by, shard_by))
+        if shards is None:
+            if shard_by == 'host':
+                services = self.api.services.list(binary='nova-compute')
+                shards = [service.host for service in services]
+            elif shard_by == 'availability_zone':
+                zones = self.api.availability_zones.list(detailed=True)
+                shards = [zone.zoneName for zone in zones]
             else:
-                query_string = ""
-
-            servers = self._list("/servers%s%s" % (detail, query_string),
-                                 "servers")
-            result.extend(servers)
-            result.append_request_ids(servers.request_ids)
+                raise ValueError("Shards must be given when sharding by %s" %
+                                 shard_by)
+        shard_opts = []
+        for shard in dict.fromkeys(shards):
+            opts = dict(search_opts)
+            opts[shard_by] = shard
+            shard_opts.append(opts)
+        return shard_opts
+
+    def _shard_windows(self, shards, search_opts):
+        """Get the (changes-since, changes-before) time windows."""
+        if isinstance(shards, int):
+            if not search_opts.get('changes-since'):
+                raise ValueError("The changes-since search option is "
+                                 "required to split it in %d windows" %
+                                 shards)
+            start = timeutils.parse_isotime(search_opts['changes-since'])
+            end = search_opts.get('changes-before')
+            end = (timeutils.parse_isotime(end) if end else
+                   datetime.datetime.now(datetime.timezone.utc))
+            step = (end - start) / max(shards, 1)
+            boundaries = [(start + step * i).isoformat()
+                          for i in range(shards)]
+            boundaries.append(search_opts.get('changes-before'))
+        else:
+            if not shards or len(shards) < 2:
+                raise ValueError("At least two boundaries are required to "
+                                 "shard by changes-since")
+            if (search_opts.get('changes-since') or
+                    search_opts.get('changes-before')):
+                raise ValueError("The changes-since and changes-before "
+                                 "search options can't be used with time "
+                                 "window boundaries")
+            boundaries = [b.isoformat() if isinstance(b, datetime.datetime)
+                          else b for b in shards]
+        windows = list(zip(boundaries[:-1], boundaries[1:]))
+        if (any(before is not None for _since, before in windows) and
+                self.api_version < api_versions.APIVersion('2.66')):
+            raise exceptions.UnsupportedAttribute('changes-before', '2.66')
+        return windows
 
-            if not servers or limit != -1:
-                break
-            marker = result[-1].id
-        return result
+    @staticmethod
+    def _sort_key_getter(sort_keys, sort_dirs):
+        """Get the key function merging listings sorted by Nova."""
+        sort_dirs = list(sort_dirs or [])
+        # NOTE: like Nova, missing directions default to the first one given
+        # or to descending
+        default_dir = sort_dirs[0] if sort_dirs else 'desc'
+        sort_dirs += [default_dir] * (len(sort_keys) - len(sort_dirs))
+        attrs = [SORT_KEY_ATTRS.get(k, k) for k in sort_keys]
+        reverse = [d == 'desc' for d in sort_dirs]
+
+        def key(server):
+            return _SortKey([getattr(server, attr, None) for attr in attrs],
+                            reverse)
+        return key
 
     def get_vnc_console(self, server, console_type):
         """
@@ -1065,10 +1065,11 @@ def _expand_dict_attr(collection, attr):
 
 def _translate_keys(collection, convert):
     for item in collection:
-        keys = item.__dict__.keys()
+        # NOTE: read the keys from the info, the attributes of the compact
+        # resources are not copied to the instance
         item_dict = item.to_dict()
         for from_key, to_key in convert:
-            if from_key in keys and to_key not in keys:
+            if from_key in item_dict and to_key not in item_dict:
                 setattr(item, to_key, item_dict[from_key])
                 item.set_info(to_key, item_dict[from_key])
 
@@ -1549,6 +1550,26 @@ def _print_flavor(flavor):
            "will be displayed. If limit is bigger than 'CONF.api.max_limit' "
            "option of Nova API, limit 'CONF.api.max_limit' will be used "
            "instead."))
+@utils.arg(
+    '--shard-by',
+    dest='shard_by',
+    metavar='<key>',
+    choices=servers.SHARD_KEYS,
+    default=None,
+    help=_("List all the servers with one listing per value of the given "
+           "key, fetched concurrently: 'host', 'tenant_id', "
+           "'availability_zone' or 'changes-since' time windows. Hosts and "
+           "availability zones default to all of them. Can't be used with "
+           "--marker and --limit. (Admin only)"))
+@utils.arg(
+    '--shards',
+    dest='shards',
+    metavar='<shards>',
+    default=None,
+    help=_("Comma-separated list of the values of the --shard-by key. With "
+           "'changes-since', either the boundaries of the time windows or a "
+           "number of windows splitting the range from --changes-since to "
+           "--changes-before, or to now."))
 @utils.arg(
     '--availability-zone',
     dest='availability_zone',
@@ -1717,7 +1738,7 @@ def do_list(cs, args):
 
     # In microversion 2.47 we started embedding flavor info in server details.
     have_embedded_flavor_info = (
-        cs.api_version >= api_versions.APIVersion('2.47'))
+        cs.api_version >= api_versions.V2_47)
     # If we don't have embedded flavor info then we only report the flavor id
     # rather than looking up the rest of the information.
     if not have_embedded_flavor_info:
@@ -1750,7 +1771,7 @@ def do_list(cs, args):
     # In microversion 2.66 we added ``changes-before`` option
     # in server details.
     have_added_changes_before = (
-        cs.api_version >= api_versions.APIVersion('2.66'))
+        cs.api_version >= api_versions.V2_66)
     if have_added_changes_before and args.changes_before:
         search_opts['changes-before'] = args.changes_before
         try:
@@ -1760,16 +1781,33 @@ def do_list(cs, args):
                                           % search_opts['changes-before'])
 
     # In microversion 2.73 we added ``locked`` option in server details.
-    have_added_locked = cs.api_version >= api_versions.APIVersion('2.73')
+    have_added_locked = cs.api_version >= api_versions.V2_73
     if have_added_locked and args.locked:
         search_opts['locked'] = args.locked
 
-    servers = cs.servers.list(detailed=detailed,
-                              search_opts=search_opts,
-                              sort_keys=sort_keys,
-                              sort_dirs=sort_dirs,
-                              marker=args.marker,
-                              limit=args.limit)
+    shard_kwargs = {}
+    if args.shard_by:
+        if args.marker or args.limit not in (None, -1):
+            raise exceptions.CommandError(_(
+                "--shard-by can't be used with --marker and --limit"))
+        shards = args.shards.split(',') if args.shards else None
+        if (args.shard_by == 'changes-since' and shards and
+                len(shards) == 1 and shards[0].isdigit()):
+            shards = int(shards[0])
+        shard_kwargs = {'shard_by': args.shard_by, 'shards': shards}
+    elif args.shards:
+        raise exceptions.CommandError(_("--shards requires --shard-by"))
+
+    try:
+        servers = cs.servers.list(detailed=detailed,
+                                  search_opts=search_opts,
+                                  sort_keys=sort_keys,
+                                  sort_dirs=sort_dirs,
+                                  marker=args.marker,
+                                  limit=args.limit,
+                                  **shard_kwargs)
+    except ValueError as e:
+        raise exceptions.CommandError(str(e))
     convert = [('OS-EXT-SRV-ATTR:host', 'host'),
                ('OS-EXT-STS:task_state', 'task_state'),
                ('OS-EXT-SRV-ATTR:instance_name', 'instance_name'),
@@ -1785,7 +1823,7 @@ def do_list(cs, args):
     # For detailed lists, if we have embedded flavor information then replace
     # the "flavor" attribute with more detailed information.
     if detailed and have_embedded_flavor_info:
-        if cs.api_version >= api_versions.APIVersion('2.69'):
+        if cs.api_version >= api_versions.V2_69:
             # NOTE(tssurya): From 2.69, we will have the key 'flavor' missing
             # in the server response during infrastructure failure situations.
             # For those servers with partial constructs we just skip the
@@ -1926,7 +1964,7 @@ def _get_list_table_columns_and_formatters(fields, objs, exclude_fields=(),
     help=_('Poll until reboot is complete.'))
 def do_reboot(cs, args):
     """Reboot a server."""
-    servers = [_find_server(cs, s) for s in args.server]
+    servers = utils.find_resources(cs.servers, args.server)
     utils.do_action_on_many(
         lambda s: s.reboot(args.reboot_type),
         servers,
@@ -2274,10 +2312,9 @@ def do_unpause(cs, args):
     help=_('Name or ID of server(s).'))
 def do_stop(cs, args):
     """Stop the server(s)."""
-    find_args = {'all_tenants': args.all_tenants}
-    utils.do_action_on_many(
-        lambda s: _find_server(cs, s, **find_args).stop(),
-        args.server,
+    _servers_action_on_many(
+        cs, args,
+        lambda s: s.stop(),
         _("Request to stop server %s has been accepted."),
         _("Unable to stop the specified server(s)."))
 
@@ -2294,10 +2331,9 @@ def do_stop(cs, args):
     help=_('Name or ID of server(s).'))
 def do_start(cs, args):
     """Start the server(s)."""
-    find_args = {'all_tenants': args.all_tenants}
-    utils.do_action_on_many(
-        lambda s: _find_server(cs, s, **find_args).start(),
-        args.server,
+    _servers_action_on_many(
+        cs, args,
+        lambda s: s.start(),
         _("Request to start server %s has been accepted."),
         _("Unable to start the specified server(s)."))
 
@@ -2564,7 +2600,7 @@ def _print_server(cs, args, server=None, wrap=0):
         info['%s network' % network_label] = ', '.join(address_list)
 
     flavor = info.get('flavor', {})
-    if cs.api_version >= api_versions.APIVersion('2.47'):
+    if cs.api_version >= api_versions.V2_47:
         # The "flavor" field is a JSON representation of a dict containing the
         # flavor information used at boot.
         if minimal:
@@ -2644,14 +2680,33 @@ def do_show(cs, args):
     help=_('Name or ID of server(s).'))
 def do_delete(cs, args):
     """Immediately shut down and delete specified server(s)."""
-    find_args = {'all_tenants': args.all_tenants}
-    utils.do_action_on_many(
-        lambda s: _find_server(cs, s, **find_args).delete(),
-        args.server,
+    _servers_action_on_many(
+        cs, args,
+        lambda s: s.delete(),
         _("Request to delete server %s has been accepted."),
         _("Unable to delete the specified server(s)."))
 
 
+def _servers_action_on_many(cs, args, action, success_msg, error_msg):
+    """Run an action on the servers given by name or ID.
+
+    The servers are resolved together, with at most one listing, and the
+    missing or ambiguous ones are reported as failures of the action.
+    """
+    errors = {}
+    servers = dict(zip(args.server,
+                       utils.find_resources(cs.servers, args.server,
+                                            errors=errors,
+                                            all_tenants=args.all_tenants)))
+
+    def run(server):
+        if server in errors:
+            raise errors[server]
+        action(servers[server])
+
+    utils.do_action_on_many(run, args.server, success_msg, error_msg)
+
+
 def _find_server(cs, server, raise_if_notfound=True, **find_args):
     """Get a server by name or ID.
 
@@ -15,10 +15,13 @@
 Usage interface.
 """
 
+import collections
+
 import oslo_utils
 
 from novaclient import api_versions
 from novaclient import base
+from novaclient import exceptions
 
 
 class Usage(base.Resource):
@@ -42,6 +45,15 @@ class Usage(base.Resource):
                 self.append_request_ids(new.request_ids)
 
 
+def _merge_usage(usage, next_usage):
+    usage.server_usages = (getattr(usage, 'server_usages', []) +
+                           getattr(next_usage, 'server_usages', []))
+    for key in ('total_hours', 'total_memory_mb_usage', 'total_vcpus_usage',
+                'total_local_gb_usage'):
+        setattr(usage, key, getattr(usage, key, 0) +
+                getattr(next_usage, key, 0))
+
+
 class UsageManager(base.ManagerWithFind):
     """
     Manage :class:`Usage` resources.
@@ -96,6 +108,57 @@ class UsageManager(base.ManagerWithFind):
         url = '/%s%s' % (self.usage_prefix, query_string)
         return self._list(url, 'tenant_usages')
 
+    def iter_pages(self, start, end, detailed=False, marker=None,
+                   limit=None):
+        """
+        Iterate over the pages of the usage of all tenants.
+
+        Listings are only paginated starting with microversion 2.40, a
+        single page is returned before. Pages are split by instances, so the
+        usage of a tenant may be spread over several pages; use
+        :meth:`list_all` to get it merged.
+
+        :param start: :class:`datetime.datetime` Start date in UTC
+        :param end: :class:`datetime.datetime` End date in UTC
+        :param detailed: Whether to include information about each
+                         instance whose usage is part of the report
+        :param marker: Begin returning usage data for instances that appear
+                       later in the instance list than that represented by
+                       this instance UUID (optional).
+        :param limit: Maximum number of instances to include in each page
+                      (optional).
+        """
+        if ((marker or limit) and
+                self.api_version < api_versions.APIVersion('2.40')):
+            raise exceptions.UnsupportedAttribute(
+                'marker' if marker else 'limit', '2.40')
+        url = '/%s%s' % (self.usage_prefix,
+                         self._usage_query(start, end, detailed=detailed))
+        return self._paginate(url, 'tenant_usages', marker=marker,
+                              limit=limit)
+
+    def list_all(self, *args, **kwargs):
+        """
+        Get the usage of all tenants, following every page.
+
+        The arguments are the ones of :meth:`iter_pages`. The usage of a
+        tenant spread over several pages is merged into a single
+        :class:`Usage`.
+
+        :rtype: list of :class:`Usage`.
+        """
+        usages = collections.OrderedDict()
+        result = base.ListWithMeta([], None)
+        for page in self.iter_pages(*args, **kwargs):
+            result.append_request_ids(page.request_ids)
+            for usage in page:
+                if usage.tenant_id in usages:
+                    _merge_usage(usages[usage.tenant_id], usage)
+                else:
+                    usages[usage.tenant_id] = usage
+        result.extend(usages.values())
+        return result
+
     @api_versions.wraps("2.0", "2.39")
     def get(self, tenant_id, start, end):
         """
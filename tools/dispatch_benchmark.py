@@ -0,0 +1,66 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the overhead of calling methods decorated with api_versions.wraps.
+
+The variant of the versioned methods of the server manager which have the
+most variants is resolved for an API version the way a call does it, and
+compared with the scan of all the variants of the method which each call did
+before the variants were cached. Usage::
+
+    python tools/dispatch_benchmark.py --number 100000
+    python tools/dispatch_benchmark.py --os-compute-api-version 2.30
+"""
+
+import argparse
+import timeit
+
+import novaclient
+from novaclient import api_versions
+from novaclient.v2 import servers
+
+METHODS = ('live_migrate', 'evacuate', 'unshelve', 'update')
+
+
+def scan(name, api_version):
+    """Resolve the variant of a method the way it is done without cache."""
+    return api_versions.get_substitutions(name, api_version)[-1].func
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=100000,
+                        help='number of calls of each measure')
+    parser.add_argument('--os-compute-api-version',
+                        default=novaclient.API_MAX_VERSION.get_string(),
+                        help='API version of the calls')
+    args = parser.parse_args()
+
+    version = api_versions.get_api_version(args.os_compute_api_version)
+    for method in METHODS:
+        name = getattr(servers.ServerManager, method).__id__
+        count = len(api_versions.get_substitutions(name))
+        cached = timeit.timeit(
+            lambda: api_versions.get_dispatch(name, version),
+            number=args.number)
+        scanned = timeit.timeit(lambda: scan(name, version),
+                                number=args.number)
+        print('%-13s %2d variants: cached %6.3f us, scanned %6.3f us, '
+              '%5.1fx faster' % (method, count,
+                                 cached * 1e6 / args.number,
+                                 scanned * 1e6 / args.number,
+                                 scanned / cached))
+
+
+if __name__ == '__main__':
+    main()
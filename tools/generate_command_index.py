@@ -0,0 +1,42 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Generate the index of the shell subcommands used by help and completion.
+
+The index has to be generated again when the subcommands, their options or
+the maximum API version change. Usage::
+
+    python tools/generate_command_index.py
+"""
+
+import argparse
+
+from novaclient import command_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--major', type=int, default=2,
+                        help='major API version of the index')
+    parser.add_argument('--output',
+                        help='path of the index, defaults to '
+                             'novaclient/v<major>/command_index.json')
+    args = parser.parse_args()
+
+    data = command_index.write_index(args.major, args.output)
+    print('%d subcommands indexed up to API version %s' % (
+        len(data['commands']), data['api_max_version']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the time taken to import novaclient modules.
+
+Each module is imported in a new interpreter run with ``-X importtime``, and
+the cumulative import time the interpreter reports for it is kept. The
+dependencies shared by the modules, e.g. keystoneauth1 and oslo, are imported
+first, so only the time of the novaclient modules is measured. Usage::
+
+    python tools/import_time_benchmark.py --repeat 20
+    python tools/import_time_benchmark.py novaclient.v2.servers
+"""
+
+import argparse
+import re
+import statistics
+import subprocess  # nosec: B404
+import sys
+
+MODULES = ('novaclient.v2', 'novaclient.shell')
+PRELOAD = ('keystoneauth1.session', 'oslo_utils.strutils', 'prettytable')
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)$')
+
+
+def measure(module):
+    """Get the cumulative microseconds taken to import a module."""
+    code = ';'.join(['import %s' % name for name in PRELOAD] +
+                    ['import %s' % module])
+    # no shell: the current interpreter imports the modules given to the
+    # benchmark by its own user
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            stderr=subprocess.PIPE, universal_newlines=True,
+                            check=True)  # nosec: B603
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match and match.group(2) == module:
+            return int(match.group(1))
+    raise RuntimeError('%s was not imported' % module)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('modules', nargs='*', default=MODULES,
+                        help='modules to import')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='number of imports of each module')
+    args = parser.parse_args()
+
+    for module in args.modules:
+        times = [measure(module) for _ in range(args.repeat)]
+        print('%-25s median %7.2f ms, min %7.2f ms' % (
+            module, statistics.median(times) / 1000.0, min(times) / 1000.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the throughput of listings sharing a manager across threads.
+
+Each thread lists resources from a fake endpoint answering after a fixed
+latency, through a single manager. With listings running in parallel, the
+throughput grows linearly with the number of threads. Usage::
+
+    python tools/list_threads_benchmark.py --threads 1,2,4,8
+    python tools/list_threads_benchmark.py --latency 0.1 --count 1000
+"""
+
+import argparse
+import threading
+import time
+
+from novaclient import api_versions
+from novaclient import base
+
+
+class FakeAPI(object):
+    """Fake endpoint answering listings after a fixed latency."""
+
+    def __init__(self, latency, count):
+        self.client = self
+        self.api_version = api_versions.APIVersion('2.1')
+        self.latency = latency
+        self.body = {'items': [{'id': i} for i in range(count)]}
+
+    def get(self, url):
+        time.sleep(self.latency)
+        return None, self.body
+
+
+def measure(manager, threads, calls):
+    """Get the listings per second of threads sharing a manager."""
+    def list_items():
+        for _ in range(calls):
+            manager._list('/items', 'items')
+
+    workers = [threading.Thread(target=list_items) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', default='1,2,4,8',
+                        help='comma separated numbers of threads')
+    parser.add_argument('--calls', type=int, default=10,
+                        help='number of listings of each thread')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='seconds the endpoint takes to answer')
+    parser.add_argument('--count', type=int, default=100,
+                        help='number of resources of each listing')
+    args = parser.parse_args()
+
+    manager = base.Manager(FakeAPI(args.latency, args.count))
+    manager.resource_class = base.Resource
+    single = None
+    for threads in [int(t) for t in args.threads.split(',')]:
+        throughput = measure(manager, threads, args.calls)
+        if single is None:
+            single = throughput
+        print('%3d threads %8.1f listings/s, %5.1fx' % (
+            threads, throughput, throughput / single))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compare the memory used by a server listing in default and compact mode.
+
+A synthetic detailed listing is encoded in pages of JSON, then each page is
+decoded and turned into :class:`novaclient.v2.servers.Server` resources the
+way a listing does, and the memory is measured with tracemalloc. With
+``--fields``, a projected listing is measured too. Usage::
+
+    python tools/resource_memory_benchmark.py --count 100000
+    python tools/resource_memory_benchmark.py --fields id,name,status
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from novaclient import base
+from novaclient.v2 import servers
+
+
+def make_listing(count, extra_keys):
+    """Build the body of a synthetic detailed server listing."""
+    listing = []
+    for i in range(count):
+        server_id = '%08d-0000-0000-0000-000000000000' % i
+        info = {
+            'id': server_id,
+            'name': 'server-%d' % i,
+            'status': 'ACTIVE',
+            'tenant_id': 'tenant-%d' % (i % 100),
+            'user_id': 'user-%d' % (i % 1000),
+            'OS-EXT-SRV-ATTR:host': 'compute-%d' % (i % 500),
+            'addresses': {'private': [{'addr': '10.%d.%d.%d' % (
+                i >> 16 & 255, i >> 8 & 255, i & 255), 'version': 4}]},
+            'metadata': {},
+            'links': [{'rel': 'self', 'href': '/servers/%s' % server_id}],
+        }
+        for k in range(extra_keys):
+            info['attribute-%d' % k] = 'value-%d' % k
+        listing.append(info)
+    return listing
+
+
+def measure(pages, compact=False, fields=None):
+    """Get the bytes allocated to list the pages, held and at the peak."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        resources = []
+        for page in pages:
+            data = json.loads(page)
+            if fields is not None:
+                data = [base.project_info(info, fields) for info in data]
+            resources.extend(servers.Server(None, info, loaded=True,
+                                            compact=compact)
+                             for info in data)
+            del data
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resources
+    return current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=100000,
+                        help='number of servers of the listing')
+    parser.add_argument('--keys', type=int, default=60,
+                        help='number of attributes of each server')
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help='number of servers of each page')
+    parser.add_argument('--fields',
+                        help='comma separated fields of a projected listing')
+    args = parser.parse_args()
+
+    listing = make_listing(args.count, max(args.keys - 9, 0))
+    pages = [json.dumps(listing[i:i + args.page_size])
+             for i in range(0, len(listing), args.page_size)]
+    print('%d servers, %d attributes each' % (args.count, len(listing[0])))
+    del listing
+    modes = [('default', False, None), ('compact', True, None)]
+    if args.fields:
+        fields = args.fields.split(',')
+        modes.append(('fields', False, fields))
+        modes.append(('compact+fields', True, fields))
+    default = None
+    for mode, compact, fields in modes:
+        current, peak = measure(pages, compact, fields)
+        if default is None:
+            default = current
+        print('%-15s %8.1f MiB held, %8.1f MiB peak, %5.1f%% of default' % (
+            mode, current / 2 ** 20, peak / 2 ** 20,
+            100.0 * current / default))
+
+
+if __name__ == '__main__':
+    main()
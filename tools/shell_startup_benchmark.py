@@ -0,0 +1,72 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compare the time the nova shell takes to build its parser and parse a command.
+
+The parser of every subcommand is built in eager mode, only the parser of the
+requested subcommand in lazy mode, the way the shell does. The modules are
+imported before the measures, so only the parser construction and the parsing
+are timed. Usage::
+
+    python tools/shell_startup_benchmark.py --repeat 20
+    python tools/shell_startup_benchmark.py --os-compute-api-version 2.1
+"""
+
+import argparse
+import time
+
+import novaclient
+from novaclient import api_versions
+from novaclient import shell
+
+COMMANDS = (['list'], ['show', 'server-1'])
+
+
+def measure(version, argv, lazy, repeat):
+    """Get the mean seconds to build the parser and parse a command."""
+    elapsed = 0.0
+    for _ in range(repeat):
+        nova = shell.OpenStackComputeShell()
+        nova.extensions = []
+        start = time.perf_counter()
+        parser = nova.get_subcommand_parser(
+            version, argv=argv, command=argv[0] if lazy else None)
+        parser.parse_args(argv)
+        elapsed += time.perf_counter() - start
+    return elapsed / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='number of runs of each measure')
+    parser.add_argument('--os-compute-api-version', default='2.latest',
+                        help='API version of the commands')
+    args = parser.parse_args()
+
+    version = api_versions.get_api_version(args.os_compute_api_version)
+    if version.is_latest():
+        version = api_versions.APIVersion(
+            '%s.%s' % (version.ver_major,
+                       novaclient.API_MAX_VERSION.ver_minor))
+    # import the action modules before measuring
+    measure(version, COMMANDS[0], False, 1)
+    for argv in COMMANDS:
+        eager = measure(version, argv, False, args.repeat)
+        lazy = measure(version, argv, True, args.repeat)
+        print('nova %-18s eager %7.2f ms, lazy %7.2f ms, %5.1fx faster' % (
+            ' '.join(argv), eager * 1000, lazy * 1000, eager / lazy))
+
+
+if __name__ == '__main__':
+    main()